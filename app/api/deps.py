@@ -1,10 +1,6 @@
 # app/api/deps.py
-from typing import Generator
-from app.db.session import SessionLocal
+from app.db.session import get_db  # noqa: F401 (endpoint'ler buradan import ediyor)
+from app.core.http_pool import HTTPClientPool, get_http_pool
 
-def get_db() -> Generator:
-    try:
-        db = SessionLocal()
-        yield db
-    finally:
-        db.close()
\ No newline at end of file
+def get_http_client() -> HTTPClientPool:
+    return get_http_pool()
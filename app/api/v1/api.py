@@ -1,11 +1,12 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import listings, analyze, shop_import, keywords, tag_spy, generate, webhooks, visual_architect
+from app.api.v1.endpoints import listings, analyze, shop_import, keywords, tag_spy, generate, webhooks, visual_architect, metrics, admin, pricing, analysis_jobs, chat
 
 api_router = APIRouter()
 
 # Mevcut rotalar
 api_router.include_router(listings.router, prefix="/listings", tags=["listings"])
 api_router.include_router(analyze.router, prefix="/analysis", tags=["analysis"])
+api_router.include_router(analysis_jobs.router, prefix="/analysis", tags=["analysis"])
 api_router.include_router(shop_import.router, prefix="/import", tags=["import"])
 api_router.include_router(keywords.router, prefix="/keywords", tags=["keywords"])
 api_router.include_router(tag_spy.router, prefix="/spy", tags=["spy"])
@@ -13,4 +14,8 @@ api_router.include_router(tag_spy.router, prefix="/spy", tags=["spy"])
 # EKSİK OLAN VE ŞİMDİ EKLENEN ROTA:
 api_router.include_router(generate.router, prefix="/generate", tags=["generate"])
 api_router.include_router(webhooks.router, prefix="/webhooks", tags=["webhooks"])
-api_router.include_router(visual_architect.router, prefix="/visual-architect", tags=["visual-architect"])
\ No newline at end of file
+api_router.include_router(visual_architect.router, prefix="/visual-architect", tags=["visual-architect"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
+api_router.include_router(pricing.router, prefix="/pricing", tags=["pricing"])
+api_router.include_router(chat.router, prefix="/chat", tags=["chat"])
\ No newline at end of file
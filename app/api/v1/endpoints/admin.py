@@ -0,0 +1,39 @@
+from typing import Optional
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_db
+from app.services.snapshot_compaction import compact_snapshots
+from app.services.lqs_rescore import rescore_all_listings
+from app.services.keyword_metrics import refresh_keyword_metrics
+
+router = APIRouter()
+
+@router.post("/snapshots/compact")
+async def compact_snapshot_history(
+    keep_full_days: Optional[int] = None,
+    keep_latest: Optional[int] = None,
+    weekly_after_days: Optional[int] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Eski analiz snapshot'larını günlük/haftalık puan özetlerine sıkıştırır.
+    Parametre verilmezse config'teki SNAPSHOT_* değerleri kullanılır.
+    """
+    return await compact_snapshots(db, keep_full_days, keep_latest, weekly_after_days)
+
+@router.post("/lqs/rescore")
+async def rescore_lqs(db: AsyncSession = Depends(get_db)):
+    """
+    Tüm analiz edilmiş ürünlerin LQS puanını kayıtlı verilerden toplu (NumPy) olarak yeniden hesaplar.
+    Ağırlıklar değiştiğinde kullanılır; Gemini'ye istek atılmaz.
+    """
+    return await rescore_all_listings(db)
+
+@router.post("/keywords/metrics/refresh")
+async def refresh_keyword_metric_table(db: AsyncSession = Depends(get_db)):
+    """
+    keyword_metrics tablosunu ürün ve snapshot etiket istatistiklerinden yeniden hesaplar (toplu upsert).
+    /keywords/explore ve Tag Spy metrikleri bu tablodan okur.
+    """
+    return await refresh_keyword_metrics(db)
@@ -0,0 +1,127 @@
+import asyncio
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_db
+from app.api.v1.endpoints.analyze import check_api_key
+from app.core.sse import format_sse, SSE_HEADERS
+from app.db.session import async_session_maker
+from app.models import AnalysisJob, Listing
+from app.services.analysis_pipeline import AnalysisResult
+from app.services.job_queue import enqueue_job, TERMINAL_STATUSES
+
+router = APIRouter()
+
+SSE_POLL_SECONDS = 0.5
+SSE_KEEPALIVE_SECONDS = 15.0
+
+class AnalysisJobRequest(BaseModel):
+    id: str
+    image_url: Optional[str] = None  # Boşsa ürünün kayıtlı görseli
+    product_title: Optional[str] = None  # Boşsa ürünün başlığı
+    force_refresh: bool = False
+
+class AnalysisJobStatus(BaseModel):
+    id: str
+    listing_id: str
+    status: str
+    stage: str
+    attempts: int
+    max_attempts: int
+    error: Optional[str] = None
+    result: Optional[AnalysisResult] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    next_attempt_at: Optional[datetime] = None
+
+def job_to_status(job: AnalysisJob) -> AnalysisJobStatus:
+    return AnalysisJobStatus(
+        id=job.id,
+        listing_id=job.listing_id,
+        status=job.status,
+        stage=job.stage,
+        attempts=job.attempts,
+        max_attempts=job.max_attempts,
+        error=job.error or None,
+        result=job.result,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+        finished_at=job.finished_at,
+        next_attempt_at=job.run_after if job.status == "queued" else None,
+    )
+
+@router.post("/jobs", status_code=202)
+async def create_analysis_job(request: AnalysisJobRequest, db: AsyncSession = Depends(get_db)):
+    """
+    Analizi kuyruğa alır ve hemen iş kimliğini döner; analiz arka planda worker'larda çalışır.
+    İlerleme GET /analysis/jobs/{id} veya SSE akışı /analysis/jobs/{id}/events ile izlenir.
+    """
+    db_listing = await db.get(Listing, request.id)
+    if not db_listing:
+        raise HTTPException(status_code=404, detail="Listing not found")
+    check_api_key()
+
+    job = await enqueue_job(
+        listing_id=db_listing.id,
+        image_url=request.image_url or db_listing.image_url,
+        product_title=request.product_title or db_listing.title,
+        force_refresh=request.force_refresh,
+    )
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/api/v1/analysis/jobs/{job.id}",
+        "events_url": f"/api/v1/analysis/jobs/{job.id}/events",
+    }
+
+@router.get("/jobs/{job_id}", response_model=AnalysisJobStatus)
+async def get_analysis_job(job_id: str, db: AsyncSession = Depends(get_db)):
+    job = await db.get(AnalysisJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_to_status(job)
+
+@router.get("/jobs/{job_id}/events")
+async def stream_analysis_job(job_id: str, request: Request):
+    """
+    İşin aşama değişikliklerini Server-Sent Events olarak akıtır (queued -> download -> model -> lqs -> pricing -> persist -> done).
+    Durum DB'den okunur; böylece iş başka bir süreçteki worker'da çalışsa da izlenebilir.
+    """
+    async with async_session_maker() as db:
+        if not await db.get(AnalysisJob, job_id):
+            raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        last_key = None
+        idle = 0.0
+        while True:
+            async with async_session_maker() as db:
+                job = await db.get(AnalysisJob, job_id)
+            if job is None:
+                yield format_sse("error", {"detail": "Job not found"})
+                return
+
+            key = (job.status, job.stage, job.attempts)
+            if key != last_key:
+                last_key = key
+                idle = 0.0
+                status = job_to_status(job)
+                if job.status in TERMINAL_STATUSES:
+                    yield format_sse(job.status, status.model_dump(mode="json"))
+                    return
+                yield format_sse("progress", status.model_dump(mode="json", exclude={"result"}))
+            elif idle >= SSE_KEEPALIVE_SECONDS:
+                idle = 0.0
+                yield ": keep-alive\n\n"
+
+            if await request.is_disconnected():
+                return
+            await asyncio.sleep(SSE_POLL_SECONDS)
+            idle += SSE_POLL_SECONDS
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
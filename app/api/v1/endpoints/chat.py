@@ -1,10 +1,19 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-import httpx
 import os
+import json
+
+from app.api.deps import get_http_client
+from app.core.http_pool import HTTPClientPool
+from app.core.sse import format_sse, SSE_HEADERS
 
 router = APIRouter()
 
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta/models"
+TARGET_MODEL = "gemini-flash-latest"
+FALLBACK_REPLY = "Üzgünüm, şu an cevap veremiyorum."
+
 class ChatRequest(BaseModel):
     message: str
     context: str = ""
@@ -12,41 +21,86 @@ class ChatRequest(BaseModel):
 class ChatResponse(BaseModel):
     response: str
 
-@router.post("/", response_model=ChatResponse)
-async def chat(request: ChatRequest):
-    # API Key check
+def get_api_key() -> str:
     my_api_key = os.getenv("GEMINI_API_KEY")
     if not my_api_key:
         raise HTTPException(status_code=500, detail="API Key configuration error")
-        
-    target_model = "gemini-flash-latest"
-    
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/{target_model}:generateContent"
-    params = {"key": my_api_key}
-    headers = {"Content-Type": "application/json"}
+    return my_api_key
 
+def build_payload(request: ChatRequest) -> dict:
     full_prompt = f"{request.context}\n\nKullanıcı: {request.message}"
-
-    payload = {
+    return {
         "contents": [{"parts": [{"text": full_prompt}]}],
         "generationConfig": {"temperature": 0.7, "topP": 0.8, "topK": 40}
     }
 
+def extract_text(result_json: dict) -> str:
+    """Gemini yanıtındaki (veya akış parçasındaki) metin parçalarını birleştirir."""
+    parts = result_json["candidates"][0]["content"]["parts"]
+    return "".join(part.get("text", "") for part in parts)
+
+@router.post("/", response_model=ChatResponse)
+async def chat(request: ChatRequest, http: HTTPClientPool = Depends(get_http_client)):
+    # API Key check
+    my_api_key = get_api_key()
+
+    url = f"{GEMINI_BASE_URL}/{TARGET_MODEL}:generateContent"
+    params = {"key": my_api_key}
+    headers = {"Content-Type": "application/json"}
+
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, params=params, headers=headers, json=payload, timeout=30.0)
-            
-            if response.status_code != 200:
-                print(f"Gemini API Error: {response.text}")
-                raise HTTPException(status_code=500, detail="AI servisine ulaşılamadı. (API Key hatası olabilir)")
-                
-            result_json = response.json()
-            try:
-                candidate = result_json["candidates"][0]["content"]["parts"][0]["text"]
-                return ChatResponse(response=candidate.strip())
-            except (KeyError, IndexError):
-                return ChatResponse(response="Üzgünüm, şu an cevap veremiyorum.")
-                
+        response = await http.post(url, params=params, headers=headers, json=build_payload(request), timeout=30.0)
+
+        if response.status_code != 200:
+            print(f"Gemini API Error: {response.text}")
+            raise HTTPException(status_code=500, detail="AI servisine ulaşılamadı. (API Key hatası olabilir)")
+
+        result_json = response.json()
+        try:
+            return ChatResponse(response=extract_text(result_json).strip())
+        except (KeyError, IndexError):
+            return ChatResponse(response=FALLBACK_REPLY)
+
     except Exception as e:
         print(f"Chat Error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/stream")
+async def chat_stream(request: ChatRequest, http: HTTPClientPool = Depends(get_http_client)):
+    """
+    Cevabı Gemini'nin akış API'si (streamGenerateContent, alt=sse) üzerinden parça parça iletir.
+    Olaylar: "delta" {"text"} her parçada, sonunda "done" {"response"} veya "error" {"detail"}.
+    """
+    my_api_key = get_api_key()
+
+    url = f"{GEMINI_BASE_URL}/{TARGET_MODEL}:streamGenerateContent"
+    params = {"key": my_api_key, "alt": "sse"}
+    headers = {"Content-Type": "application/json"}
+    payload = build_payload(request)
+
+    async def events():
+        chunks = []
+        try:
+            async with http.stream("POST", url, params=params, headers=headers, json=payload, timeout=30.0) as response:
+                if response.status_code != 200:
+                    print(f"Gemini API Error: {(await response.aread()).decode(errors='replace')}")
+                    yield format_sse("error", {"detail": "AI servisine ulaşılamadı. (API Key hatası olabilir)"})
+                    return
+
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    try:
+                        text = extract_text(json.loads(line[5:].strip()))
+                    except (json.JSONDecodeError, KeyError, IndexError):
+                        continue
+                    if text:
+                        chunks.append(text)
+                        yield format_sse("delta", {"text": text})
+
+            yield format_sse("done", {"response": "".join(chunks).strip() or FALLBACK_REPLY})
+        except Exception as e:
+            print(f"Chat Stream Error: {str(e)}")
+            yield format_sse("error", {"detail": str(e)})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
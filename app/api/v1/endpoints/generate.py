@@ -1,50 +1,129 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-import google.generativeai as genai
-import os
 import json
 import re
 from dotenv import load_dotenv
 
+from app.core.sse import format_sse, SSE_HEADERS
+from app.services.model_registry import get_model_registry
+
 load_dotenv()
 
 router = APIRouter()
 
 # Güvenli Model Seçimi
 def get_model():
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
-        print("🛑 API Key bulunamadı!")
-        return None
-    
-    genai.configure(api_key=api_key)
+    # Model listesi her istekte değil, registry'de periyodik olarak yenilenir
+    return get_model_registry().get_model()
+
+class GenerateRequest(BaseModel):
+    description: str
+
+def build_listing_prompt(description: str) -> str:
+    # ZENGİNLEŞTİRİLMİŞ & EVRENSEL SİSTEM TALİMATI
+    return f"""
+    YOU ARE AN ELITE AI ART DIRECTOR & SEO EXPERT. Your task is to take a simple product concept and convert it into professional, high-converting assets for Etsy.
+
+    INPUT PRODUCT (Turkish): "{description}"
+
+    INSTRUCTIONS:
+    1.  **TRANSLATE FIRST:** Translate the input concept into English mentally.
+    2.  **SEO CONTENT (English):** Create optimization titles, tags, and a persuasive description.
+    3.  **PRICING STRATEGY (Neuro-Pricing):** ANALYZE PRODUCT TYPE FOR PRICING: If it's a digital/impulse product, use 'Charm Pricing' (ending in .90, .95, .99). If it's luxury/art, use whole numbers. Provide a range.
+    4.  **IMAGE PROMPTS (English - CRITICAL):**
+        * **NEVER** write simple prompts. You must hallucinate details.
+        * **Style A (Photorealistic):** Describe a high-end commercial photoshoot. Mention camera type (e.g., Sony A7IV), lens (e.g., 50mm f/1.4), lighting (e.g., softbox, natural window light), textures, and background setting explicitly.
+        * **Style B (Lifestyle Mockup):** Describe a cozy, aspirational real-life setting. Place the product naturally in a beautiful home. Mention vibes (e.g., "hygge", "minimalist", "boho"), time of day, and atmospheric details.
+        * **ASPECT RATIO:** Do NOT use `--ar 4:3`. Instead, write exactly "The image is a horizontal photograph with a 4:3 aspect ratio." at the end of each prompt sentence.
+    5.  **COMPETITOR SIMULATION:** Generate 3 REALISTIC competitor listings. Include shop name, price, and monthly sales estimate.
+
+    OUTPUT FORMAT (Strict JSON):
+    {{
+        "seo_title": "SEO Optimized English Title (Max 140 chars)",
+        "tags": ["tag1", "tag2", "tag3", ... 13 tags total],
+        "description": "Sales oriented description in English...",
+        "pricing": {{
+            "suggested": "9.99",
+            "min": "7.00",
+            "max": "12.00",
+            "currency": "$"
+        }},
+        "competitors": [
+            {{
+                "shop_name": "ShopName",
+                "title": "Short Title...",
+                "price": "$15.00",
+                "sales_estimate": "120 sales/mo",
+                "tags": ["tag1", "tag2"]
+            }},
+            ... (Total 3 items)
+        ],
+        "image_prompt": {{
+            "image_prompt_a": "A detailed, professional studio photograph of [ENGLISH OBJECT] with [SPECIFIC DETAILS, LIGHTING, CAMERA INFO]. The image is a horizontal photograph with a 4:3 aspect ratio.",
+            "image_prompt_b": "A warm, candid lifestyle photograph of [ENGLISH OBJECT] placed in a [SPECIFIC SETTING, VIBE, ATMOSPHERE]. The image is a horizontal photograph with a 4:3 aspect ratio."
+        }}
+    }}
+    """
+
+def parse_model_json(raw_text: str) -> dict:
+    # TEMİZLİK (Sanitizer)
+    raw_text = raw_text.replace("```json", "").replace("```", "").strip()
     
+    # JSON PARSING (Güvenli Blok)
     try:
-        # 1. Google'dan mevcut modelleri iste
-        available_models = [m.name for m in genai.list_models() if 'generateContent' in m.supported_generation_methods]
-        print(f"📋 Mevcut Modeller: {available_models}")
-
-        # 2. Tercih sırasına göre kontrol et
-        preferences = ['gemini-1.5-flash', 'gemini-1.5-pro', 'gemini-1.0-pro', 'gemini-pro']
-        
-        for pref in preferences:
-            for model_name in available_models:
-                if pref in model_name:
-                    print(f"✅ Seçilen Model: {model_name}")
-                    return genai.GenerativeModel(model_name)
-        
-        # 3. Hiçbiri yoksa listedeki ilkini al
-        if available_models:
-            return genai.GenerativeModel(available_models[0])
-            
-    except Exception as e:
-        print(f"⚠️ Model listeleme hatası: {e}. Fallback 'gemini-pro' deneniyor.")
+        start = raw_text.find('{')
+        end = raw_text.rfind('}') + 1
+        json_str = raw_text[start:end]
+        data = json.loads(json_str)
+    except:
+        # Eğer JSON bozuksa manuel düzeltme dene veya hata fırlat
+        print(f"JSON Parse Hatası. Ham metin: {raw_text}")
+        raise ValueError("AI geçerli JSON üretmedi.")
+    return data
+
+def build_final_data(data: dict) -> dict:
+    # KEY MAPPING (Hata Toleransı)
+    # AI bazen farklı key isimleri kullanabilir, hepsini yakala.
     
-    # 4. En kötü durum senaryosu
-    return genai.GenerativeModel('gemini-pro')
+    # Fiyat verisi güvenliği
+    price_data = data.get("pricing") or {}
+
+    # Fallback Competitors (Eğer AI üretmezse)
+    default_competitors = [
+        {"shop_name": "MarketLeader", "title": "Similar Product Example A", "price": "$15.00", "sales_estimate": "High Demand", "tags": ["example"]},
+        {"shop_name": "TrendSetter", "title": "Similar Product Example B", "price": "$12.50", "sales_estimate": "Medium Demand", "tags": ["example"]},
+        {"shop_name": "BestValue", "title": "Similar Product Example C", "price": "$9.99", "sales_estimate": "Rising Star", "tags": ["example"]}
+    ]
+
+    final_data = {
+        "seo_title": data.get("seo_title") or data.get("title") or "AI Title Generated",
+        "tags": data.get("tags") or data.get("keywords") or [],
+        "description": data.get("description") or "Description generated.",
+        "price_info": {
+            "suggested": price_data.get("suggested") or "10.00",
+            "min": price_data.get("min") or "8.00",
+            "max": price_data.get("max") or "12.00",
+            "currency": price_data.get("currency") or "$"
+        },
+        "competitors": data.get("competitors") or default_competitors,
+        "image_prompt": data.get("image_prompt") or {
+            "image_prompt_a": "Error creating prompt A",
+            "image_prompt_b": "Error creating prompt B"
+        }
+    }
 
-class GenerateRequest(BaseModel):
-    description: str
+    return final_data
+
+def error_result(error: Exception) -> dict:
+    # Frontend'in çökmemesi için hata mesajını JSON olarak dön
+    return {
+        "seo_title": f"Hata: {str(error)}",
+        "tags": ["error"],
+        "description": "Lütfen tekrar deneyin.",
+        "price_suggestion": "$0",
+        "image_prompt": {"image_prompt_a": "Error", "image_prompt_b": "Error"}
+    }
 
 @router.post("/")
 async def generate_listing(request: GenerateRequest):
@@ -53,106 +132,43 @@ async def generate_listing(request: GenerateRequest):
         if not model:
             raise HTTPException(status_code=500, detail="API Key Missing")
 
-        # ZENGİNLEŞTİRİLMİŞ & EVRENSEL SİSTEM TALİMATI
-        prompt = f"""
-        YOU ARE AN ELITE AI ART DIRECTOR & SEO EXPERT. Your task is to take a simple product concept and convert it into professional, high-converting assets for Etsy.
-
-        INPUT PRODUCT (Turkish): "{request.description}"
-
-        INSTRUCTIONS:
-        1.  **TRANSLATE FIRST:** Translate the input concept into English mentally.
-        2.  **SEO CONTENT (English):** Create optimization titles, tags, and a persuasive description.
-        3.  **PRICING STRATEGY (Neuro-Pricing):** ANALYZE PRODUCT TYPE FOR PRICING: If it's a digital/impulse product, use 'Charm Pricing' (ending in .90, .95, .99). If it's luxury/art, use whole numbers. Provide a range.
-        4.  **IMAGE PROMPTS (English - CRITICAL):**
-            * **NEVER** write simple prompts. You must hallucinate details.
-            * **Style A (Photorealistic):** Describe a high-end commercial photoshoot. Mention camera type (e.g., Sony A7IV), lens (e.g., 50mm f/1.4), lighting (e.g., softbox, natural window light), textures, and background setting explicitly.
-            * **Style B (Lifestyle Mockup):** Describe a cozy, aspirational real-life setting. Place the product naturally in a beautiful home. Mention vibes (e.g., "hygge", "minimalist", "boho"), time of day, and atmospheric details.
-            * **ASPECT RATIO:** Do NOT use `--ar 4:3`. Instead, write exactly "The image is a horizontal photograph with a 4:3 aspect ratio." at the end of each prompt sentence.
-        5.  **COMPETITOR SIMULATION:** Generate 3 REALISTIC competitor listings. Include shop name, price, and monthly sales estimate.
-
-        OUTPUT FORMAT (Strict JSON):
-        {{
-            "seo_title": "SEO Optimized English Title (Max 140 chars)",
-            "tags": ["tag1", "tag2", "tag3", ... 13 tags total],
-            "description": "Sales oriented description in English...",
-            "pricing": {{
-                "suggested": "9.99",
-                "min": "7.00",
-                "max": "12.00",
-                "currency": "$"
-            }},
-            "competitors": [
-                {{
-                    "shop_name": "ShopName",
-                    "title": "Short Title...",
-                    "price": "$15.00",
-                    "sales_estimate": "120 sales/mo",
-                    "tags": ["tag1", "tag2"]
-                }},
-                ... (Total 3 items)
-            ],
-            "image_prompt": {{
-                "image_prompt_a": "A detailed, professional studio photograph of [ENGLISH OBJECT] with [SPECIFIC DETAILS, LIGHTING, CAMERA INFO]. The image is a horizontal photograph with a 4:3 aspect ratio.",
-                "image_prompt_b": "A warm, candid lifestyle photograph of [ENGLISH OBJECT] placed in a [SPECIFIC SETTING, VIBE, ATMOSPHERE]. The image is a horizontal photograph with a 4:3 aspect ratio."
-            }}
-        }}
-        """
-
-        response = model.generate_content(prompt)
-        
-        # TEMİZLİK (Sanitizer)
-        raw_text = response.text.replace("```json", "").replace("```", "").strip()
-        
-        # JSON PARSING (Güvenli Blok)
-        try:
-            start = raw_text.find('{')
-            end = raw_text.rfind('}') + 1
-            json_str = raw_text[start:end]
-            data = json.loads(json_str)
-        except:
-            # Eğer JSON bozuksa manuel düzeltme dene veya hata fırlat
-            print(f"JSON Parse Hatası. Ham metin: {raw_text}")
-            raise ValueError("AI geçerli JSON üretmedi.")
-
-        # KEY MAPPING (Hata Toleransı)
-        # AI bazen farklı key isimleri kullanabilir, hepsini yakala.
-        
-        # Fiyat verisi güvenliği
-        price_data = data.get("pricing") or {}
-
-        # Fallback Competitors (Eğer AI üretmezse)
-        default_competitors = [
-            {"shop_name": "MarketLeader", "title": "Similar Product Example A", "price": "$15.00", "sales_estimate": "High Demand", "tags": ["example"]},
-            {"shop_name": "TrendSetter", "title": "Similar Product Example B", "price": "$12.50", "sales_estimate": "Medium Demand", "tags": ["example"]},
-            {"shop_name": "BestValue", "title": "Similar Product Example C", "price": "$9.99", "sales_estimate": "Rising Star", "tags": ["example"]}
-        ]
-
-        final_data = {
-            "seo_title": data.get("seo_title") or data.get("title") or "AI Title Generated",
-            "tags": data.get("tags") or data.get("keywords") or [],
-            "description": data.get("description") or "Description generated.",
-            "price_info": {
-                "suggested": price_data.get("suggested") or "10.00",
-                "min": price_data.get("min") or "8.00",
-                "max": price_data.get("max") or "12.00",
-                "currency": price_data.get("currency") or "$"
-            },
-            "competitors": data.get("competitors") or default_competitors,
-            "image_prompt": data.get("image_prompt") or {
-                "image_prompt_a": "Error creating prompt A",
-                "image_prompt_b": "Error creating prompt B"
-            }
-        }
-
-        return final_data
+        response = await get_model_registry().generate(model, build_listing_prompt(request.description))
+        return build_final_data(parse_model_json(response.text))
 
     except Exception as e:
         print(f"🛑 CRITICAL ERROR: {str(e)}")
-        # Frontend'in çökmemesi için hata mesajını JSON olarak dön
-        return {
-            "seo_title": f"Hata: {str(e)}",
-            "tags": ["error"],
-            "description": "Lütfen tekrar deneyin.",
-            "price_suggestion": "$0",
-            "image_prompt": {"image_prompt_a": "Error", "image_prompt_b": "Error"}
-        }
+        return error_result(e)
+
+@router.post("/stream")
+async def generate_listing_stream(request: GenerateRequest):
+    """
+    Aynı üretimi Gemini'nin akış API'si ile yapar ve Server-Sent Events olarak iletir.
+    Olaylar: "delta" {"text"} her parçada; sonunda tam metin birleştirilip doğrulanır ve
+    /generate/ ile aynı yapıda "result" gönderilir. Hata durumunda "error" (yine aynı yapıda) gelir.
+    """
+    model = get_model()
+    if not model:
+        raise HTTPException(status_code=500, detail="API Key Missing")
+    prompt = build_listing_prompt(request.description)
+
+    async def events():
+        chunks = []
+        try:
+            async with get_model_registry().slot(model):
+                response = await model.generate_content_async(prompt, stream=True)
+                async for chunk in response:
+                    try:
+                        text = chunk.text
+                    except ValueError:
+                        # Metin içermeyen parça (ör. sadece finish_reason)
+                        continue
+                    if text:
+                        chunks.append(text)
+                        yield format_sse("delta", {"text": text})
+
+            yield format_sse("result", build_final_data(parse_model_json("".join(chunks))))
+        except Exception as e:
+            print(f"🛑 CRITICAL ERROR (stream): {str(e)}")
+            yield format_sse("error", error_result(e))
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
@@ -1,8 +1,14 @@
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Query, Depends
 from pydantic import BaseModel
-from typing import List
-import requests
-import random
+from typing import List, Literal
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_db, get_http_client
+from app.core.config import settings
+from app.core.http_pool import HTTPClientPool
+from app.services.keyword_suggestions import get_suggestions
+from app.services.keyword_metrics import get_keyword_metrics
+from app.services.tag_graph import get_tag_graph, is_tag_graph_ready
 
 router = APIRouter()
 
@@ -17,66 +23,52 @@ class KeywordExploreResponse(BaseModel):
     keyword: str
     results: List[KeywordResult]
 
+class RelatedTag(BaseModel):
+    tag: str
+    count: int
+    lift: float
+    pmi: float
+
+class KeywordRelatedResponse(BaseModel):
+    tag: str
+    ready: bool
+    documents: int
+    tag_count: int
+    related: List[RelatedTag]
+
 @router.get("/explore", response_model=KeywordExploreResponse)
-def explore_keywords(query: str = Query(..., min_length=1)):
+async def explore_keywords(query: str = Query(..., min_length=1),
+                           http: HTTPClientPool = Depends(get_http_client),
+                           db: AsyncSession = Depends(get_db)):
     """
-    Fetch search suggestions from Etsy and enrich with mock metrics including Trend.
-    Falls back to smart mock generation if API fails.
+    Suggest terms from the local prefix index (our own listing/snapshot tags and title
+    n-grams, ranked by frequency), topped up with Etsy suggestions, and enrich with precomputed metrics.
+    Etsy lists are cached per normalized query; a circuit breaker skips the
+    (currently unstable/deprecated) endpoint while it keeps failing.
     """
-    # Try Etsy API first (currently unstable/deprecated)
-    url = f"https://api.etsy.com/v0.1/public/guest/search_suggestions?q={query}"
-    etsy_results = []
-    
-    try:
-        response = requests.get(url, timeout=3)
-        if response.status_code == 200:
-            data = response.json()
-            etsy_results = data.get("results", [])
-    except Exception:
-        pass # Fallback to mock
+    etsy_results = await get_suggestions(http, query)
 
-    # If API returned nothing, generate smart mocks
-    if not etsy_results:
-        suffixes = ["ideas", "gift", "art", "decor", "print", "svg", "pattern", "handmade", "vintage", "jewelry", "design", "template"]
-        prefixes = ["custom", "personalized", "unique", "minimalist", "boho", "rustic", "modern", "cute"]
-        
-        # Generate variations
-        etsy_results = [
-            f"{query}",
-            f"{query} for sale",
-            f"{query} ideas"
-        ]
-        
-        for s in suffixes:
-            etsy_results.append(f"{query} {s}")
-        
-        for p in prefixes:
-            etsy_results.append(f"{p} {query}")
-            
-        # Shuffle and limit
-        random.shuffle(etsy_results)
-        etsy_results = etsy_results[:12]
+    # Metrikler keyword_metrics tablosundan (toplu işle hesaplanır); aynı terim her seferinde aynı değerleri alır
+    metrics = await get_keyword_metrics(db, etsy_results)
+    enriched_results = [KeywordResult(term=term, **metrics[term]) for term in etsy_results]
 
-    enriched_results = []
-    for item in etsy_results:
-        term = item.get("term") if isinstance(item, dict) else str(item)
-        
-        # Mock Metrics
-        volume = random.randint(500, 50000)
-        competition = random.choice(["High", "Medium", "Low"])
-        ctr = round(random.uniform(0.01, 0.05), 3) # 1% to 5%
-        
-        # Mock Trend
-        trend_val = random.randint(-10, 35)
-        trend_sign = "+" if trend_val > 0 else ""
-        trend = f"{trend_sign}{trend_val}%"
-        
-        enriched_results.append(KeywordResult(
-            term=term,
-            volume=volume,
-            competition=competition,
-            ctr=ctr,
-            trend=trend
-        ))
-        
     return KeywordExploreResponse(keyword=query, results=enriched_results)
+
+@router.get("/related", response_model=KeywordRelatedResponse)
+async def related_keywords(tag: str = Query(..., min_length=1),
+                           limit: int = Query(20, ge=1, le=100),
+                           min_count: int = Query(settings.TAG_GRAPH_MIN_PAIR_COUNT, ge=1),
+                           sort: Literal["pmi", "lift", "count"] = "pmi"):
+    """
+    Tags that travel with `tag` across our own and competitor listings and analysis snapshots,
+    served from the in-memory co-occurrence graph (no DB query). Scored by lift/PMI;
+    min_count drops rare pairs whose PMI is inflated. ready=False until the first build finishes.
+    """
+    graph = get_tag_graph()
+    return KeywordRelatedResponse(
+        tag=tag,
+        ready=is_tag_graph_ready(),
+        documents=graph.documents,
+        tag_count=graph.count(tag),
+        related=[RelatedTag(**item) for item in graph.related(tag, limit=limit, min_count=min_count, sort=sort)],
+    )
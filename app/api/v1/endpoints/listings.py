@@ -1,16 +1,20 @@
 # app/api/v1/endpoints/listings.py
 from typing import List, Optional, Dict, Any
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Query, Response
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, field_validator
 from uuid import uuid4
+import base64
 import shutil
 import os
 import json
 
-from app.models import Listing, ListingSnapshot
+from app.models import Listing, ListingSnapshot, ListingScoreRollup
+from app.models.listing import TAG_LIST_FIELDS, to_tag_list
 from app.api.deps import get_db 
+from app.services.listing_documents import record_listing_documents, forget_listing_documents
 
 # --- Şemalar ---
 class ListingSnapshotBase(BaseModel):
@@ -33,6 +37,24 @@ class ListingSnapshotBase(BaseModel):
     class Config:
         from_attributes = True
 
+class ListingScoreRollupBase(BaseModel):
+    listing_id: str
+    granularity: str
+    bucket_start: datetime
+    snapshot_count: int
+    lqs_avg: float
+    lqs_min: float
+    lqs_max: float
+    lqs_visual_avg: Optional[float] = 0.0
+    lqs_seo_avg: Optional[float] = 0.0
+    lqs_zeitgeist_avg: Optional[float] = 0.0
+    price_min_avg: Optional[float] = 0.0
+    price_max_avg: Optional[float] = 0.0
+    trend_avg: Optional[float] = 0.0
+
+    class Config:
+        from_attributes = True
+
 class ListingBase(BaseModel):
     id: str
     title: str
@@ -72,6 +94,19 @@ class ListingBase(BaseModel):
     
     traffic_data: Optional[Dict[str, Any]] = None
 
+    # Kolonlar native JSON; API sözleşmesi (virgüllü metin) korunuyor
+    @field_validator('tags_focus', 'tags_long_tail', 'tags_aesthetic', 'tags_creative', mode='before')
+    def join_tag_lists(cls, v):
+        if isinstance(v, list):
+            return ",".join(v)
+        return v
+
+    @field_validator('monthly_popularity', mode='before')
+    def dump_monthly_popularity(cls, v):
+        if isinstance(v, list):
+            return json.dumps(v)
+        return v
+
     @field_validator('traffic_data', mode='before')
     def parse_traffic_data(cls, v):
         if isinstance(v, str):
@@ -84,6 +119,35 @@ class ListingBase(BaseModel):
     class Config:
         from_attributes = True 
 
+class ListingSummary(BaseModel):
+    """Dashboard grid'i için hafif projeksiyon (uzun metin alanları yok)."""
+    id: str
+    title: str
+    price: float
+    image_url: str
+    listing_type: str = "mine"
+    is_analyzed: bool
+    lqs_score: float
+    last_analyzed_at: Optional[datetime] = None
+    predicted_price_min: Optional[float] = 0.0
+    predicted_price_max: Optional[float] = 0.0
+    trend_score: Optional[float] = 0.0
+    tags: List[str] = []
+
+    @field_validator('tags', mode='before')
+    def split_tags(cls, v):
+        if isinstance(v, str):
+            return [tag.strip() for tag in v.split(",")] if v else []
+        return v or []
+
+    class Config:
+        from_attributes = True
+
+class ListingIndexResponse(BaseModel):
+    items: List[Any]
+    next_cursor: Optional[str] = None
+    has_more: bool = False
+
 class NewListingRequest(BaseModel):
     title: str
     price: float
@@ -120,12 +184,113 @@ async def upload_image(file: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/", response_model=List[ListingBase])
-async def list_listings(db: Session = Depends(get_db)):
-    listings = db.query(Listing).all()
+async def list_listings(db: AsyncSession = Depends(get_db)):
+    listings = (await db.execute(select(Listing))).scalars().all()
     return listings
 
+# Keyset sayfalama için sıralanabilir alanlar; her biri (kolon, id) indeksiyle desteklenir.
+# Ham kolon üzerinde karşılaştırılır (coalesce indeksi devre dışı bırakır); NULL'lar her iki yönde sona kalır.
+SORT_FIELDS = {
+    "last_analyzed_at": Listing.last_analyzed_at,
+    "lqs_score": Listing.lqs_score,
+    "price": Listing.price,
+    "title": Listing.title,
+}
+
+SUMMARY_COLUMNS = [
+    Listing.id, Listing.title, Listing.price, Listing.image_url, Listing.listing_type,
+    Listing.is_analyzed, Listing.lqs_score, Listing.last_analyzed_at,
+    Listing.predicted_price_min, Listing.predicted_price_max, Listing.trend_score,
+    Listing._tags.label("tags"),
+]
+
+def encode_cursor(sort: str, value: Any, listing_id: str) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps({"s": sort, "v": value, "id": listing_id})
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str, sort: str):
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        if data["s"] != sort:
+            raise ValueError("sort mismatch")
+        value = data["v"]
+        if value is not None and sort in ("last_analyzed_at", "created_at"):
+            value = datetime.fromisoformat(value)
+        return value, data["id"]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Geçersiz cursor")
+
+@router.get("/index", response_model=ListingIndexResponse)
+async def list_listings_index(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    sort: str = Query("last_analyzed_at", pattern="^(last_analyzed_at|lqs_score|price|title)$"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    listing_type: Optional[str] = None,
+    is_analyzed: Optional[bool] = None,
+    lqs_min: Optional[float] = None,
+    lqs_max: Optional[float] = None,
+    view: str = Query("summary", pattern="^(summary|full)$"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Keyset (cursor) sayfalamalı, filtrelenebilir ürün listesi.
+    view=summary sadece grid kolonlarını seçer; view=full tüm ListingBase alanlarını döner.
+    """
+    column = SORT_FIELDS[sort]
+
+    query = select(*SUMMARY_COLUMNS) if view == "summary" else select(Listing)
+    if listing_type:
+        query = query.where(Listing.listing_type == listing_type)
+    if is_analyzed is not None:
+        query = query.where(Listing.is_analyzed == is_analyzed)
+    if lqs_min is not None:
+        query = query.where(Listing.lqs_score >= lqs_min)
+    if lqs_max is not None:
+        query = query.where(Listing.lqs_score <= lqs_max)
+
+    # İki dal: önce dolu değerler (kolon, id) sırasıyla, sonra NULL kuyruğu id sırasıyla.
+    # Her dal indeksi doğrudan kullanır; NULL sıralaması veritabanına göre değişmez.
+    descending = order == "desc"
+    id_order = Listing.id.desc() if descending else Listing.id.asc()
+    cursor_value, cursor_id = decode_cursor(cursor, sort) if cursor else (None, None)
+    in_null_tail = cursor is not None and cursor_value is None
+
+    rows = []
+    if not in_null_tail:
+        valued = query.where(column.isnot(None))
+        if cursor:
+            # Satır karşılaştırması (kolon, id) > (v, id) indekste doğrudan aralık taramasına dönüşür
+            key, bound = tuple_(column, Listing.id), tuple_(cursor_value, cursor_id)
+            valued = valued.where(key < bound if descending else key > bound)
+        valued = valued.order_by(column.desc() if descending else column.asc(), id_order)
+        result = await db.execute(valued.limit(limit + 1))
+        rows = list(result.all() if view == "summary" else result.scalars().all())
+
+    if len(rows) <= limit:
+        null_tail = query.where(column.is_(None))
+        if in_null_tail:
+            null_tail = null_tail.where(Listing.id < cursor_id if descending else Listing.id > cursor_id)
+        result = await db.execute(null_tail.order_by(id_order).limit(limit + 1 - len(rows)))
+        rows += result.all() if view == "summary" else result.scalars().all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    schema = ListingSummary if view == "summary" else ListingBase
+    items = [schema.model_validate(row) for row in rows]
+
+    next_cursor = None
+    if has_more and rows:
+        last = rows[-1]
+        next_cursor = encode_cursor(sort, getattr(last, sort), last.id)
+
+    return ListingIndexResponse(items=items, next_cursor=next_cursor, has_more=has_more)
+
 @router.post("/", response_model=ListingBase)
-async def create_new_listing(new_listing: NewListingRequest, db: Session = Depends(get_db)):
+async def create_new_listing(new_listing: NewListingRequest, db: AsyncSession = Depends(get_db)):
     db_listing = Listing(
         id=str(uuid4()), 
         title=new_listing.title,
@@ -140,39 +305,76 @@ async def create_new_listing(new_listing: NewListingRequest, db: Session = Depen
         suggested_occasions="", suggested_recipients="",
         suggested_faqs="", predicted_price_min=0.0, predicted_price_max=0.0, price_reason="",
         trend_score=0.0, trend_reason="", best_selling_months="",
-        monthly_popularity="", tags_focus="", tags_long_tail="", tags_aesthetic="", tags_creative="",
-        traffic_data="{}"
+        monthly_popularity=[], tags_focus=[], tags_long_tail=[], tags_aesthetic=[], tags_creative=[],
+        traffic_data={}
     )
     db.add(db_listing)
-    db.commit()
-    db.refresh(db_listing)
+    await db.commit()
+    await db.refresh(db_listing)
+    record_listing_documents(db_listing)
     return db_listing
 
 @router.delete("/{id}")
-async def delete_listing(id: str, db: Session = Depends(get_db)):
-    listing = db.query(Listing).filter(Listing.id == id).first()
+async def delete_listing(id: str, db: AsyncSession = Depends(get_db)):
+    listing = await db.get(Listing, id)
     if not listing: raise HTTPException(status_code=404, detail="Ürün bulunamadı")
-    db.delete(listing)
-    db.commit()
+    await db.delete(listing)
+    await db.commit()
+    forget_listing_documents(id)
     return {"status": "deleted", "id": id}
 
 @router.put("/{id}", response_model=ListingBase)
-async def update_listing(id: str, update_data: UpdateListingRequest, db: Session = Depends(get_db)):
-    listing = db.query(Listing).filter(Listing.id == id).first()
+async def update_listing(id: str, update_data: UpdateListingRequest, db: AsyncSession = Depends(get_db)):
+    listing = await db.get(Listing, id)
     if not listing: raise HTTPException(status_code=404, detail="Ürün bulunamadı")
     
     update_dict = update_data.model_dump(exclude_unset=True)
     for key, value in update_dict.items():
         if key == "tags" and value:
             listing.tags = value
+        elif key in TAG_LIST_FIELDS:
+            setattr(listing, key, to_tag_list(value))
         else:
             setattr(listing, key, value)
 
-    db.commit()
-    db.refresh(listing)
+    await db.commit()
+    await db.refresh(listing)
+    record_listing_documents(listing)
     return listing
 
 @router.get("/{id}/history", response_model=List[ListingSnapshotBase])
-async def get_listing_history(id: str, db: Session = Depends(get_db)):
-    history = db.query(ListingSnapshot).filter(ListingSnapshot.listing_id == id).order_by(ListingSnapshot.created_at.desc()).all()
-    return history
\ No newline at end of file
+async def get_listing_history(
+    id: str,
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    before: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Son analizler (yeniden eskiye), (created_at, id) keyset sayfalamasıyla.
+    Sonraki sayfa varsa cursor X-Next-Cursor başlığında döner; aynı created_at'i paylaşan kayıtlar atlanmaz.
+    'before' eski istemciler için korunur (sadece created_at < before).
+    """
+    query = select(ListingSnapshot).where(ListingSnapshot.listing_id == id)
+    if cursor:
+        cursor_value, cursor_id = decode_cursor(cursor, "created_at")
+        query = query.where(tuple_(ListingSnapshot.created_at, ListingSnapshot.id) < tuple_(cursor_value, cursor_id))
+    elif before:
+        query = query.where(ListingSnapshot.created_at < before)
+    query = query.order_by(ListingSnapshot.created_at.desc(), ListingSnapshot.id.desc()).limit(limit + 1)
+    history = (await db.execute(query)).scalars().all()
+
+    if len(history) > limit:
+        last = history[limit - 1]
+        response.headers["X-Next-Cursor"] = encode_cursor("created_at", last.created_at, last.id)
+    return history[:limit]
+
+@router.get("/{id}/history/rollups", response_model=List[ListingScoreRollupBase])
+async def get_listing_history_rollups(id: str, granularity: Optional[str] = None, db: AsyncSession = Depends(get_db)):
+    """Sıkıştırılmış eski analizlerin günlük/haftalık puan özetleri."""
+    query = select(ListingScoreRollup).where(ListingScoreRollup.listing_id == id)
+    if granularity:
+        query = query.where(ListingScoreRollup.granularity == granularity)
+    rollups = (await db.execute(query.order_by(ListingScoreRollup.bucket_start.desc()))).scalars().all()
+    return rollups
\ No newline at end of file
@@ -0,0 +1,36 @@
+from fastapi import APIRouter
+
+from app.core.http_pool import get_http_pool
+from app.core.traffic_engine import get_ga4_cache_stats
+from app.services.image_cache import get_image_cache
+from app.services.image_processing import get_processing_stats
+from app.services.traffic_refresh import get_traffic_refresh_stats
+from app.services.job_queue import get_job_queue_stats
+from app.services.model_registry import get_model_registry
+from app.services.keyword_suggestions import get_keyword_suggestion_stats
+from app.services.suggestion_index import get_suggestion_index_stats
+from app.services.tag_graph import get_tag_graph_stats
+from app.services.etsy_client import get_etsy_rate_limit_stats
+from app.services.tag_spy import get_tag_spy_stats
+
+router = APIRouter()
+
+@router.get("/")
+async def get_metrics():
+    """
+    Çalışma zamanı metrikleri (bağlantı havuzu doluluğu vb.).
+    """
+    return {
+        "http_pool": get_http_pool().get_stats(),
+        "image_cache": get_image_cache().get_stats(),
+        "image_processing": get_processing_stats(),
+        "ga4_cache": get_ga4_cache_stats(),
+        "traffic_refresh": get_traffic_refresh_stats(),
+        "analysis_jobs": get_job_queue_stats(),
+        "model_registry": get_model_registry().get_stats(),
+        "keyword_suggestions": get_keyword_suggestion_stats(),
+        "suggestion_index": get_suggestion_index_stats(),
+        "tag_graph": get_tag_graph_stats(),
+        "etsy_rate_limit": get_etsy_rate_limit_stats(),
+        "tag_spy": get_tag_spy_stats(),
+    }
@@ -0,0 +1,34 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_db
+from app.services.repricing import reprice_listings
+
+router = APIRouter()
+
+class RepriceRequest(BaseModel):
+    category_min: Optional[float] = None
+    category_max: Optional[float] = None
+    listing_ids: Optional[List[str]] = None
+    listing_type: Optional[str] = None
+    dry_run: bool = False
+
+@router.post("/reprice")
+async def reprice(request: RepriceRequest, db: AsyncSession = Depends(get_db)):
+    """
+    Analiz edilmiş ürünlerin fiyat aralığını (min/max/strateji) toplu olarak yeniden hesaplar.
+    Kategori sınırları veya mevsimsellik kuralları değiştiğinde kullanılır; Gemini'ye istek atılmaz.
+    dry_run=true ise hiçbir şey yazılmaz, sadece değişecek kayıt sayısı ve örnekler döner.
+    """
+    if request.category_min is not None and request.category_max is not None and request.category_min > request.category_max:
+        raise HTTPException(status_code=400, detail="category_min, category_max'tan büyük olamaz.")
+    return await reprice_listings(
+        db,
+        category_min=request.category_min,
+        category_max=request.category_max,
+        listing_ids=request.listing_ids,
+        listing_type=request.listing_type,
+        dry_run=request.dry_run,
+    )
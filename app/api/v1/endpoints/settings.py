@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.deps import get_db
 from app.models.settings import Settings
 from app.schemas.settings import SettingsUpdate, SettingsResponse
@@ -7,19 +8,19 @@ from app.schemas.settings import SettingsUpdate, SettingsResponse
 router = APIRouter()
 
 @router.get("/", response_model=SettingsResponse)
-def get_settings(db: Session = Depends(get_db)):
-    settings = db.query(Settings).first()
+async def get_settings(db: AsyncSession = Depends(get_db)):
+    settings = (await db.execute(select(Settings))).scalars().first()
     if not settings:
         # Create default settings if not exists
         settings = Settings()
         db.add(settings)
-        db.commit()
-        db.refresh(settings)
+        await db.commit()
+        await db.refresh(settings)
     return settings
 
 @router.put("/", response_model=SettingsResponse)
-def update_settings(settings_in: SettingsUpdate, db: Session = Depends(get_db)):
-    settings = db.query(Settings).first()
+async def update_settings(settings_in: SettingsUpdate, db: AsyncSession = Depends(get_db)):
+    settings = (await db.execute(select(Settings))).scalars().first()
     if not settings:
         settings = Settings()
         db.add(settings)
@@ -38,6 +39,6 @@ def update_settings(settings_in: SettingsUpdate, db: Session = Depends(get_db)):
     if settings_in.ga4_client_secret is not None:
         settings.ga4_client_secret = settings_in.ga4_client_secret
         
-    db.commit()
-    db.refresh(settings)
+    await db.commit()
+    await db.refresh(settings)
     return settings
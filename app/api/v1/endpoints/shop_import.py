@@ -1,14 +1,22 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional
+import asyncio
 import random
 
+from app.core.config import settings
+from app.core.sse import format_sse, SSE_HEADERS
+from app.services.etsy_client import EtsyAPIError
+from app.services.shop_import import import_shop, parse_shop_name, ShopNotFoundError
+from app.services.sync_service import sync_shop
+
 router = APIRouter()
 
 class ShopImportRequest(BaseModel):
     url: str
 
-class MockProduct(BaseModel):
+class ImportedProduct(BaseModel):
     listing_id: int
     title: str
     price: float
@@ -21,28 +29,36 @@ class MockProduct(BaseModel):
 class ShopImportResponse(BaseModel):
     status: str
     shop_name: str
-    products: List[MockProduct]
+    products: List[ImportedProduct]
+    total: Optional[int] = None
+    seconds: Optional[float] = None
 
-@router.post("/fetch-shop", response_model=ShopImportResponse)
-async def fetch_shop(request: ShopImportRequest):
+class ShopSyncResponse(BaseModel):
+    status: str
+    shop_name: str
+    full_scan: bool
+    fetched: int
+    new: int
+    changed: int
+    touched: int
+    unchanged: int
+    reanalyze: int
+    seconds: float
+    products: List[ImportedProduct]
+
+def resolve_shop_name(url: str) -> str:
     # Basic validation
-    if "etsy.com" not in request.url:
+    if "etsy.com" not in url:
         raise HTTPException(status_code=400, detail="Invalid Etsy URL")
+    shop_name = parse_shop_name(url)
+    if not shop_name:
+        raise HTTPException(status_code=400, detail="Shop name could not be detected from URL")
+    return shop_name
 
-    # Extract shop name (mock extraction)
-    try:
-        # Simple logic: take the part after /shop/ or the last part of the path
-        if "/shop/" in request.url:
-            shop_name = request.url.split("/shop/")[1].split("?")[0].split("/")[0]
-        else:
-            shop_name = "DetectedShop"
-    except:
-        shop_name = "UnknownShop"
-
-    # Generate Mock Data
-    mock_products = []
-    for i in range(5):
-        mock_products.append(MockProduct(
+def mock_products(shop_name: str) -> List[ImportedProduct]:
+    # ETSY_KEY_STRING tanımlı değilse (lokal geliştirme) örnek veri döner
+    return [
+        ImportedProduct(
             listing_id=random.randint(100000, 999999),
             title=f"Sample Product {i+1} from {shop_name}",
             price=round(random.uniform(10.0, 100.0), 2),
@@ -51,10 +67,98 @@ async def fetch_shop(request: ShopImportRequest):
             tags=[f"tag{k}" for k in range(random.randint(3, 8))],
             views=random.randint(50, 500),
             favorites=random.randint(5, 50)
-        ))
+        )
+        for i in range(5)
+    ]
+
+def import_error_detail(e: Exception) -> tuple:
+    if isinstance(e, ShopNotFoundError):
+        return 404, f"Shop not found: {e}"
+    if isinstance(e, EtsyAPIError):
+        return 502, f"Etsy API error ({e.status_code})"
+    return 500, str(e)
+
+@router.post("/fetch-shop", response_model=ShopImportResponse)
+async def fetch_shop(request: ShopImportRequest):
+    """
+    Mağazanın tüm aktif ürünlerini Etsy'den çeker ve listings tablosuna kaydeder.
+    İlerleme görmek için /fetch-shop/stream kullanılabilir.
+    """
+    shop_name = resolve_shop_name(request.url)
+
+    if not settings.ETSY_KEY_STRING:
+        print("⚠️ ETSY_KEY_STRING tanımlı değil, örnek ürünler döndürülüyor.")
+        return ShopImportResponse(status="success", shop_name=shop_name, products=mock_products(shop_name))
+
+    try:
+        result = await import_shop(shop_name)
+    except Exception as e:
+        status_code, detail = import_error_detail(e)
+        print(f"🛑 Shop Import Error: {e}")
+        raise HTTPException(status_code=status_code, detail=detail)
+
+    return ShopImportResponse(status="success", shop_name=result["shop_name"], products=result["products"],
+                              total=result["total"], seconds=result["seconds"])
+
+@router.post("/fetch-shop/stream")
+async def fetch_shop_stream(request: ShopImportRequest):
+    """
+    /fetch-shop ile aynı içe aktarma; ilerleme Server-Sent Events olarak iletilir.
+    Olaylar: her sayfada "progress" {"fetched", "imported", "total"}; sonunda /fetch-shop yanıtıyla
+    aynı yapıda "done" veya "error" {"status_code", "detail"}.
+    """
+    shop_name = resolve_shop_name(request.url)
+
+    async def events():
+        if not settings.ETSY_KEY_STRING:
+            products = [p.model_dump() for p in mock_products(shop_name)]
+            yield format_sse("done", {"status": "success", "shop_name": shop_name, "products": products})
+            return
+
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def on_progress(progress):
+            await queue.put(("progress", progress))
+
+        async def run():
+            try:
+                result = await import_shop(shop_name, on_progress=on_progress)
+                await queue.put(("done", {"status": "success", **result}))
+            except Exception as e:
+                status_code, detail = import_error_detail(e)
+                print(f"🛑 Shop Import Error: {e}")
+                await queue.put(("error", {"status_code": status_code, "detail": detail}))
+
+        task = asyncio.create_task(run())
+        try:
+            while True:
+                event, data = await queue.get()
+                yield format_sse(event, data)
+                if event != "progress":
+                    break
+        finally:
+            # İstemci bağlantıyı koparırsa içe aktarma iptal edilir (kaydedilen sayfalar kalır)
+            task.cancel()
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+@router.post("/sync-shop", response_model=ShopSyncResponse)
+async def sync_shop_listings(request: ShopImportRequest):
+    """
+    Daha önce içe aktarılmış mağazayı artımlı senkronlar: sadece son senkrondan beri Etsy'de
+    güncellenmiş ürünler çekilir; başlığı veya görseli değişen analizli ürünler yeniden analize alınır.
+    products sadece yeni ve değişen ürünleri içerir.
+    """
+    shop_name = resolve_shop_name(request.url)
+
+    if not settings.ETSY_KEY_STRING:
+        raise HTTPException(status_code=503, detail="ETSY_KEY_STRING is not configured")
+
+    try:
+        result = await sync_shop(shop_name)
+    except Exception as e:
+        status_code, detail = import_error_detail(e)
+        print(f"🛑 Shop Sync Error: {e}")
+        raise HTTPException(status_code=status_code, detail=detail)
 
-    return ShopImportResponse(
-        status="success",
-        shop_name=shop_name,
-        products=mock_products
-    )
+    return ShopSyncResponse(status="success", **{k: v for k, v in result.items() if k in ShopSyncResponse.model_fields})
@@ -1,9 +1,17 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
-from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Dict, Any
 import random
 import re
 
+from app.api.deps import get_db
+from app.core.config import settings
+from app.services.etsy_client import EtsyAPIError
+from app.services.keyword_metrics import get_keyword_metrics
+from app.services.shop_import import ShopNotFoundError
+from app.services.tag_spy import TagAggregator, analyze_competitor_shop
+
 router = APIRouter()
 
 class TagSpyRequest(BaseModel):
@@ -15,25 +23,20 @@ class TagStat(BaseModel):
     volume: int
     competition: str
 
+class TagPair(BaseModel):
+    tags: List[str]
+    count: int
+
 class TagSpyResponse(BaseModel):
     shop_name: str
     analyzed_product_count: int
     top_tags: List[TagStat]
+    top_pairs: List[TagPair] = []
+    approximate: bool = False
+    cached: bool = False
 
-@router.post("/analyze", response_model=TagSpyResponse)
-def analyze_shop_tags(request: TagSpyRequest):
-    """
-    Analyze competitor shop tags.
-    Extracts shop name from URL and generates mock tag frequency data.
-    """
-    # Extract shop name (Mock logic)
-    # Expected format: https://www.etsy.com/shop/ShopName or similar
-    match = re.search(r"shop/([^/?]+)", request.url)
-    shop_name = match.group(1) if match else "CompetitorShop"
-    
-    # Mock Data Generation
-    # We want to simulate 20 products and aggregate tags
-    
+def mock_shop_listings() -> List[Dict[str, Any]]:
+    """ETSY_KEY_STRING tanımlı değilse (lokal geliştirme) 20 örnek ürün üretir."""
     common_tags = [
         "digital planner", "goodnotes", "ipad planner", "printable", 
         "minimalist", "boho", "wall art", "svg", "sticker", "template"
@@ -43,54 +46,58 @@ def analyze_shop_tags(request: TagSpyRequest):
         "wedding invitation", "baby shower", "custom portrait", "logo design",
         "resume template", "budget planner", "fitness tracker", "meal planner"
     ]
-    
-    # Generate a pool of tags from 20 products
-    all_tags = []
-    
+
+    listings = []
     # Product 1-10: Heavily focused on "digital planner" niche
     for _ in range(10):
-        all_tags.extend(["digital planner", "goodnotes", "ipad planner", "productivity"])
-        all_tags.extend(random.sample(common_tags, 2))
-        
+        listings.append({"tags": ["digital planner", "goodnotes", "ipad planner", "productivity"] + random.sample(common_tags, 2)})
     # Product 11-15: Mixed with "printable"
     for _ in range(5):
-        all_tags.extend(["printable", "wall art", "decor"])
-        all_tags.extend(random.sample(common_tags, 2))
-        
+        listings.append({"tags": ["printable", "wall art", "decor"] + random.sample(common_tags, 2)})
     # Product 16-20: Random niche
     for _ in range(5):
-        all_tags.extend(random.sample(niche_tags, 3))
-        all_tags.extend(random.sample(common_tags, 1))
+        listings.append({"tags": random.sample(niche_tags, 3) + random.sample(common_tags, 1)})
+    return listings
+
+@router.post("/analyze", response_model=TagSpyResponse)
+async def analyze_shop_tags(request: TagSpyRequest, db: AsyncSession = Depends(get_db)):
+    """
+    Analyze competitor shop tags.
+    Rakip mağazanın tüm aktif ürünleri EtsyClient ile sayfa sayfa taranır; etiket frekansı ve
+    birlikte kullanılan etiket çiftleri bellek sınırlı sayaçlarla toplanır (mağaza başına TTL önbellekli).
+    """
+    # Expected format: https://www.etsy.com/shop/ShopName or similar
+    match = re.search(r"shop/([^/?#]+)", request.url)
+    if not match:
+        raise HTTPException(status_code=400, detail="Shop name could not be detected from URL")
+    shop_name = match.group(1)
 
-    # Aggregate counts
-    tag_counts = {}
-    for tag in all_tags:
-        tag_counts[tag] = tag_counts.get(tag, 0) + 1
-        
-    # Create response objects
-    top_tags = []
-    for tag, count in tag_counts.items():
-        # Mock metrics for volume/competition
-        volume = random.randint(1000, 50000)
-        competition = "High" if volume > 20000 else "Medium" if volume > 5000 else "Low"
-        
-        # Adjust competition based on frequency for realism (high freq usually means high comp)
-        if count > 10:
-            competition = "High"
-            volume = random.randint(20000, 100000)
+    if settings.ETSY_KEY_STRING:
+        try:
+            result = await analyze_competitor_shop(shop_name)
+        except ShopNotFoundError:
+            raise HTTPException(status_code=404, detail=f"Shop not found: {shop_name}")
+        except EtsyAPIError as e:
+            print(f"🛑 Tag Spy Error: {e}")
+            raise HTTPException(status_code=502, detail=f"Etsy API error ({e.status_code})")
+    else:
+        print("⚠️ ETSY_KEY_STRING tanımlı değil, örnek ürünler analiz ediliyor.")
+        aggregator = TagAggregator()
+        aggregator.add_page(mock_shop_listings())
+        result = {"shop_name": shop_name, **aggregator.result(), "cached": False}
+
+    # Metrikler keyword_metrics tablosundan (istek başına rastgele değil)
+    metrics = await get_keyword_metrics(db, [tag for tag, _ in result["top_tags"]])
+    top_tags = [
+        TagStat(tag=tag, frequency=count, volume=metrics[tag]["volume"], competition=metrics[tag]["competition"])
+        for tag, count in result["top_tags"]
+    ]
 
-        top_tags.append(TagStat(
-            tag=tag,
-            frequency=count,
-            volume=volume,
-            competition=competition
-        ))
-        
-    # Sort by frequency desc
-    top_tags.sort(key=lambda x: x.frequency, reverse=True)
-    
     return TagSpyResponse(
-        shop_name=shop_name,
-        analyzed_product_count=20,
-        top_tags=top_tags
+        shop_name=result["shop_name"],
+        analyzed_product_count=result["analyzed_product_count"],
+        top_tags=top_tags,
+        top_pairs=[TagPair(tags=pair, count=count) for pair, count in result["top_pairs"]],
+        approximate=result["approximate"],
+        cached=result["cached"],
     )
@@ -3,7 +3,7 @@ import hmac
 import hashlib
 import os
 import json
-from app.db.session import SessionLocal
+from app.db.session import async_session_maker
 from sqlalchemy import text
 
 router = APIRouter()
@@ -77,24 +77,22 @@ async def update_user_subscription(user_id: str, sub_id: str, cust_id: str, stat
     
     try:
         # Using raw SQL for simplicity with Supabase connection
-        db = SessionLocal()
-        sql = text("""
-            UPDATE public.profiles 
-            SET subscription_status = :status, 
-                subscription_id = :sub_id, 
-                customer_id = :cust_id
-            WHERE id = :user_id
-        """)
+        async with async_session_maker() as db:
+            sql = text("""
+                UPDATE public.profiles 
+                SET subscription_status = :status, 
+                    subscription_id = :sub_id, 
+                    customer_id = :cust_id
+                WHERE id = :user_id
+            """)
         
-        db.execute(sql, {
-            "status": internal_status,
-            "sub_id": sub_id,
-            "cust_id": cust_id,
-            "user_id": user_id
-        })
-        db.commit()
-        print("✅ User subscription updated successfully")
+            await db.execute(sql, {
+                "status": internal_status,
+                "sub_id": sub_id,
+                "cust_id": cust_id,
+                "user_id": user_id
+            })
+            await db.commit()
+            print("✅ User subscription updated successfully")
     except Exception as e:
         print(f"❌ Database Update Error: {e}")
-    finally:
-        db.close()
@@ -0,0 +1,89 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Süreç içi, thread-safe TTL önbelleği (LRU sınırlı). ttl_seconds=None: süresiz.
+
+    get_or_set aynı anahtar için eşzamanlı ıskalamalarda factory'yi tek sefer çalıştırır;
+    diğer çağıranlar sonucu bekler. Factory hata fırlatırsa hiçbir şey önbelleğe yazılmaz.
+    """
+
+    def __init__(self, ttl_seconds: Optional[float], max_entries: int = 256, clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.clock = clock
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+
+    def _lookup(self, key: Hashable):
+        """Kilit altında çağrılır. (bulundu, değer) döner."""
+        item = self._data.get(key)
+        if item is None:
+            return False, None
+        expires_at, value = item
+        if expires_at is not None and self.clock() >= expires_at:
+            del self._data[key]
+            self.stats["expired"] += 1
+            return False, None
+        self._data.move_to_end(key)
+        return True, value
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            found, value = self._lookup(key)
+            self.stats["hits" if found else "misses"] += 1
+            return value if found else default
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None):
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._data[key] = (None if ttl is None else self.clock() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def get_or_set(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self.stats["hits"] += 1
+                return value
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # Beklerken başka bir thread doldurmuş olabilir
+            with self._lock:
+                found, value = self._lookup(key)
+                if found:
+                    self.stats["hits"] += 1
+                    return value
+                self.stats["misses"] += 1
+            try:
+                value = factory()
+                self.set(key, value)
+                return value
+            finally:
+                with self._lock:
+                    self._key_locks.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "size": len(self._data),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0,
+            }
@@ -0,0 +1,56 @@
+import time
+from typing import Any, Callable, Dict
+
+
+class CircuitBreaker:
+    """
+    Basit devre kesici: üst üste failure_threshold hatadan sonra devre açılır ve
+    reset_timeout_seconds boyunca upstream hiç denenmez (çağıran anında fallback'e geçer).
+    Süre dolunca tek bir deneme (half-open) yapılır; başarılıysa devre kapanır, değilse tekrar açılır.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout_seconds: float = 300.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self.stats = {"allowed": 0, "short_circuited": 0, "successes": 0, "failures": 0, "opens": 0}
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if self.clock() - self.opened_at >= self.reset_timeout_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        # half-open'da aynı anda yalnızca bir deneme isteği geçer
+        if state == "closed" or (state == "half_open" and not self._probing):
+            self._probing = state == "half_open"
+            self.stats["allowed"] += 1
+            return True
+        self.stats["short_circuited"] += 1
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self.stats["successes"] += 1
+
+    def record_failure(self):
+        self.failures += 1
+        self.stats["failures"] += 1
+        if self._probing or self.failures >= self.failure_threshold:
+            if self.opened_at is None or self._probing:
+                self.stats["opens"] += 1
+            self.opened_at = self.clock()
+        self._probing = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "state": self.state, "consecutive_failures": self.failures}
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import List, Optional
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "Etsy SEO Tool"
@@ -24,6 +24,98 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Veritabanı bağlantı havuzu (Postgres)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+
+    # Toplu analiz (/analysis/batch)
+    ANALYSIS_BATCH_CONCURRENCY: int = 4
+    ANALYSIS_BATCH_MAX_CONCURRENCY: int = 8
+    ANALYSIS_BATCH_MAX_ITEMS: int = 500
+
+    # Paylaşılan HTTP istemci havuzu
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_PER_HOST_LIMIT: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP2_ENABLED: bool = True
+
+    # Analiz görselleri için disk önbelleği
+    IMAGE_CACHE_DIR: str = "cache/images"
+    IMAGE_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+    IMAGE_CACHE_FRESH_SECONDS: int = 300
+
+    # Vision modeline gitmeden önce küçültme
+    IMAGE_MAX_EDGE: int = 1024
+    IMAGE_OUTPUT_FORMAT: str = "JPEG"  # JPEG | WEBP
+    IMAGE_QUALITY: int = 85
+
+    # Snapshot geçmişi sıkıştırma
+    SNAPSHOT_KEEP_FULL_DAYS: int = 30
+    SNAPSHOT_KEEP_LATEST: int = 5
+    SNAPSHOT_WEEKLY_AFTER_DAYS: int = 180
+
+    # Analiz sonucu önbelleği (0 = kapalı)
+    ANALYSIS_CACHE_TTL_HOURS: float = 24.0
+
+    # GA4 kanal raporu önbelleği (property + tarih aralığı başına)
+    GA4_REPORT_CACHE_TTL_SECONDS: int = 3600
+    GA4_CLIENT_CACHE_MAX: int = 8
+    # Analiz sonrası arka planda trafik verisi yenileme
+    TRAFFIC_REFRESH_TIMEOUT_SECONDS: float = 10.0
+
+    # Kalıcı analiz kuyruğu (/analysis/jobs); 0 worker = bu süreç iş almaz
+    ANALYSIS_JOB_WORKERS: int = 2
+    ANALYSIS_JOB_MAX_ATTEMPTS: int = 3
+    ANALYSIS_JOB_POLL_SECONDS: float = 1.0
+    ANALYSIS_JOB_RETRY_BASE_SECONDS: float = 5.0
+    ANALYSIS_JOB_RETRY_MAX_SECONDS: float = 300.0
+    ANALYSIS_JOB_STALE_SECONDS: int = 300
+
+    # Gemini model keşfi (list_models) başlangıçta ve bu aralıkla arka planda yapılır
+    GEMINI_MODEL_PREFERENCES: List[str] = ['gemini-1.5-flash', 'gemini-1.5-pro', 'gemini-1.0-pro', 'gemini-pro']
+    GEMINI_MODEL_REFRESH_SECONDS: float = 3600.0
+    # Aynı modele aynı anda gidebilecek en fazla istek (fazlası sırada bekler)
+    GEMINI_MAX_CONCURRENCY_PER_MODEL: int = 8
+
+    # /keywords/explore öneri önbelleği ve Etsy öneri servisi için devre kesici
+    KEYWORD_SUGGEST_CACHE_TTL_SECONDS: float = 6 * 3600
+    KEYWORD_SUGGEST_FALLBACK_TTL_SECONDS: float = 300
+    KEYWORD_SUGGEST_CACHE_MAX: int = 5000
+    KEYWORD_SUGGEST_TIMEOUT_SECONDS: float = 1.5
+    KEYWORD_SUGGEST_FAILURE_THRESHOLD: int = 3
+    KEYWORD_SUGGEST_COOLDOWN_SECONDS: float = 600
+    # Yerel öneri indeksi (etiket + başlık öbekleri); ürün yazımlarıyla (analiz, import, senkron, düzenleme)
+    # artımlı güncellenir, periyodik baştan kurulur. Her worker süreci kendi kopyasını tutar; diğer
+    # süreçlerdeki değişiklikler en geç bu aralıkta yansır
+    SUGGESTION_INDEX_REBUILD_SECONDS: float = 6 * 3600
+    # Etiket birlikte-kullanım grafiği (/keywords/related); öneri indeksi gibi ürün yazımlarıyla artımlı
+    # güncellenir, periyodik baştan kurulur (worker süreçleri arası fark en geç bu aralıkta kapanır)
+    TAG_GRAPH_REBUILD_SECONDS: float = 6 * 3600
+    TAG_GRAPH_MIN_PAIR_COUNT: int = 2
+    # keyword_metrics toplu işi: kullanım başına hacim tahmini ve trend penceresi
+    KEYWORD_VOLUME_PER_USE: int = 450
+    KEYWORD_TREND_WINDOW_DAYS: int = 30
+
+    # Etsy v3 istemcisi: uygulama anahtarı başına saniyelik kota, tekrar deneme ve mağaza içe aktarma
+    ETSY_RATE_PER_SECOND: float = 10.0
+    ETSY_RATE_BURST: float = 10.0
+    ETSY_MAX_RETRIES: int = 4
+    ETSY_RETRY_BASE_SECONDS: float = 0.5
+    ETSY_TIMEOUT_SECONDS: float = 15.0
+    ETSY_IMPORT_CONCURRENCY: int = 8
+
+    # Tag Spy: rakip mağaza etiket analizi (mağaza başına önbellek, bellek sınırlı sayaçlar)
+    TAG_SPY_CACHE_TTL_SECONDS: float = 6 * 3600
+    TAG_SPY_CACHE_MAX: int = 200
+    TAG_SPY_TOP_TAGS: int = 30
+    TAG_SPY_TOP_PAIRS: int = 20
+    TAG_SPY_TAG_CAPACITY: int = 2000
+    TAG_SPY_PAIR_CAPACITY: int = 5000
+
     class Config:
         env_file = ".env"
         extra = "ignore"
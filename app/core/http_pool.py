@@ -0,0 +1,143 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.core.config import settings
+
+# HTTP/2 için 'h2' paketi gerekiyor (httpx[http2]); yoksa HTTP/1.1 keep-alive ile devam
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class HTTPClientPool:
+    """
+    Uygulama genelinde paylaşılan httpx.AsyncClient.
+    Tek bağlantı havuzu (keep-alive + HTTP/2) ve host başına eşzamanlı istek limiti sağlar.
+    """
+
+    def __init__(self,
+                 max_connections: int = 100,
+                 max_keepalive_connections: int = 20,
+                 per_host_limit: int = 20,
+                 keepalive_expiry: float = 30.0,
+                 http2: bool = True):
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.per_host_limit = per_host_limit
+        self.max_connections = max_connections
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            http2=self.http2,
+            timeout=httpx.Timeout(30.0),
+            follow_redirects=True,
+        )
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._host_stats: Dict[str, Dict[str, int]] = {}
+
+    def _stats_for(self, host: str) -> Dict[str, int]:
+        if host not in self._host_stats:
+            self._host_stats[host] = {"in_flight": 0, "peak_in_flight": 0, "waiting": 0, "requests": 0, "errors": 0}
+        return self._host_stats[host]
+
+    @asynccontextmanager
+    async def _host_slot(self, url):
+        host = urlsplit(str(url)).netloc
+        semaphore = self._host_semaphores.setdefault(host, asyncio.Semaphore(self.per_host_limit))
+        stats = self._stats_for(host)
+
+        stats["waiting"] += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            stats["waiting"] -= 1
+
+        stats["in_flight"] += 1
+        stats["requests"] += 1
+        stats["peak_in_flight"] = max(stats["peak_in_flight"], stats["in_flight"])
+        try:
+            yield
+        except Exception:
+            stats["errors"] += 1
+            raise
+        finally:
+            stats["in_flight"] -= 1
+            semaphore.release()
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        async with self._host_slot(url):
+            return await self.client.request(method, url, **kwargs)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs):
+        """Yanıtı parça parça okumak için (SSE vb.)."""
+        async with self._host_slot(url):
+            async with self.client.stream(method, url, **kwargs) as response:
+                yield response
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Havuz doluluk metrikleri (metrics endpoint'i için)."""
+        connections = []
+        try:
+            # httpx'in iç transport'u; sürüm değişirse sadece bu alan boş kalır
+            connections = list(self.client._transport._pool.connections)
+        except Exception:
+            pass
+
+        idle = sum(1 for c in connections if c.is_idle())
+        return {
+            "http2": self.http2,
+            "max_connections": self.max_connections,
+            "per_host_limit": self.per_host_limit,
+            "open_connections": len(connections),
+            "idle_connections": idle,
+            "active_connections": len(connections) - idle,
+            "utilization": round((len(connections) - idle) / self.max_connections, 3) if self.max_connections else 0.0,
+            "hosts": {host: dict(stats) for host, stats in self._host_stats.items()},
+        }
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+_pool: Optional[HTTPClientPool] = None
+
+
+def init_http_pool() -> HTTPClientPool:
+    """lifespan başında çağrılır."""
+    global _pool
+    if _pool is None:
+        _pool = HTTPClientPool(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            per_host_limit=settings.HTTP_PER_HOST_LIMIT,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+            http2=settings.HTTP2_ENABLED,
+        )
+    return _pool
+
+
+def get_http_pool() -> HTTPClientPool:
+    """Paylaşılan havuzu döner; lifespan dışında (script'ler) ilk çağrıda oluşturur."""
+    return _pool or init_http_pool()
+
+
+async def close_http_pool():
+    global _pool
+    if _pool is not None:
+        await _pool.aclose()
+        _pool = None
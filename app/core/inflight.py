@@ -0,0 +1,28 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class InFlight:
+    """
+    Aynı anahtar için eşzamanlı ıskalamalar tek bir işi (future) paylaşır.
+
+    İş bitince kayıt sadece anahtar hâlâ o işe aitse silinir; aynı anahtar için sonradan kaydedilmiş
+    yeni bir iş eski işin callback'i ile düşürülmez. Bekleyenlerden biri iptal edilirse iş sürer (shield).
+    """
+
+    def __init__(self):
+        self._futures: Dict[Hashable, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._futures)
+
+    def _forget(self, key: Hashable, future: asyncio.Future):
+        if self._futures.get(key) is future:
+            del self._futures[key]
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._futures.get(key)
+        if future is None:
+            future = self._futures[key] = asyncio.ensure_future(factory())
+            future.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(future)
@@ -0,0 +1,130 @@
+import heapq
+import re
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Dict, Any, Iterable, List, Tuple
+
+MAX_TERM_LENGTH = 60
+TOP_K = 25  # Önek başına önbelleğe alınan en popüler terim sayısı
+WARM_PREFIX_LENGTH = 2  # Bu uzunluğa kadar olan önekler build sonrası hazır hesaplanır
+MAX_CACHED_PREFIXES = 50000
+
+_WORD_RE = re.compile(r"[^\W_]+(?:['&-][^\W_]+)*")
+STOPWORDS = frozenset({
+    "a", "an", "and", "the", "for", "with", "of", "in", "on", "to", "by", "or", "at", "from", "your", "my", "is",
+})
+
+
+def normalize_term(value: Any) -> str:
+    return " ".join(str(value or "").lower().split())[:MAX_TERM_LENGTH].strip()
+
+
+def title_ngrams(title: str, max_n: int = 3) -> List[str]:
+    """Başlıktaki 1-3 kelimelik öbekler. Tek kelimelerde durak kelimeleri ve 3 harften kısalar atlanır."""
+    words = _WORD_RE.findall(str(title or "").lower())
+    grams = []
+    for n in range(1, max_n + 1):
+        for i in range(len(words) - n + 1):
+            gram = words[i:i + n]
+            if gram[0] in STOPWORDS or gram[-1] in STOPWORDS:
+                continue
+            if n == 1 and len(gram[0]) < 3:
+                continue
+            grams.append(" ".join(gram))
+    return grams
+
+
+class PrefixIndex:
+    """
+    Sıralı terim dizisi + bisect ile önek araması (trie'ye göre çok daha az bellek).
+    Her önek için frekansa göre ilk TOP_K terim önbelleğe alınır; güncellemelerde sadece
+    değişen terimlerin önekleri geçersiz kılınır. Kısa önekler (en pahalı aralıklar) build sonrası ısıtılır.
+    """
+
+    def __init__(self):
+        self._counts: Dict[str, int] = {}
+        self._terms: List[str] = []
+        self._top: Dict[str, List[Tuple[str, int]]] = {}
+        self.stats = {"lookups": 0, "cache_hits": 0, "updates": 0, "builds": 0}
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def build(self, counts: Dict[str, int]):
+        """Tüm indeksi verilen frekanslarla değiştirir."""
+        self._counts = {term: count for term, count in counts.items() if term and count > 0}
+        self._terms = sorted(self._counts)
+        self._top = {}
+        self.stats["builds"] += 1
+        self._warm()
+
+    def update(self, delta: Dict[str, int]):
+        """Artımlı güncelleme: pozitif değerler ekler, negatifler düşer; sayısı 0'a inen terim silinir."""
+        for term, change in delta.items():
+            if not term or not change:
+                continue
+            old = self._counts.get(term, 0)
+            new = old + change
+            if new > 0:
+                self._counts[term] = new
+                if old <= 0:
+                    insort(self._terms, term)
+            elif old > 0:
+                del self._counts[term]
+                i = bisect_left(self._terms, term)
+                if i < len(self._terms) and self._terms[i] == term:
+                    del self._terms[i]
+            for end in range(1, len(term) + 1):
+                self._top.pop(term[:end], None)
+        self.stats["updates"] += 1
+
+    def count(self, term: str) -> int:
+        return self._counts.get(normalize_term(term), 0)
+
+    def _range(self, prefix: str) -> Iterable[str]:
+        lo = bisect_left(self._terms, prefix)
+        hi = bisect_left(self._terms, prefix + "\U0010ffff", lo)
+        return self._terms[lo:hi]
+
+    def _top_for(self, prefix: str) -> List[Tuple[str, int]]:
+        top = self._top.get(prefix)
+        if top is not None:
+            self.stats["cache_hits"] += 1
+            return top
+        counts = self._counts
+        # Frekans azalan, eşitlikte kısa ve alfabetik önce
+        top = [(term, counts[term]) for term in
+               heapq.nsmallest(TOP_K, self._range(prefix), key=lambda t: (-counts[t], len(t), t))]
+        if len(self._top) >= MAX_CACHED_PREFIXES:
+            self._top.clear()
+        self._top[prefix] = top
+        return top
+
+    def _warm(self):
+        prefixes = {term[:end] for term in self._terms for end in range(1, min(WARM_PREFIX_LENGTH, len(term)) + 1)}
+        for prefix in prefixes:
+            self._top_for(prefix)
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Tuple[str, int]]:
+        """Önekle başlayan terimler, frekansa göre sıralı (term, count)."""
+        normalized = normalize_term(prefix)
+        if not normalized:
+            return []
+        # "vintage " yazan kullanıcı bir sonraki kelimeyi bekliyor; sondaki boşluk korunur
+        prefix = normalized + " " if prefix[-1:].isspace() else normalized
+        self.stats["lookups"] += 1
+        top = self._top_for(prefix)
+        if limit > TOP_K:
+            top = [(t, self._counts[t]) for t in
+                   heapq.nsmallest(limit, self._range(prefix), key=lambda t: (-self._counts[t], len(t), t))]
+        return top[:limit]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "terms": len(self._terms), "cached_prefixes": len(self._top)}
+
+
+def count_terms(term_lists: Iterable[Iterable[str]]) -> Counter:
+    counts = Counter()
+    for terms in term_lists:
+        counts.update(t for t in (normalize_term(term) for term in terms) if t)
+    return counts
@@ -0,0 +1,167 @@
+from typing import List, Dict, Any, Optional, Sequence
+
+import numpy as np
+
+from app.core import lqs_engine as lqs
+from app.core.numeric import py_round
+
+
+def extract_visual_columns(visual_data: Sequence[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """
+    visual_data sözlüklerini kolon dizilerine çevirir.
+    Varsayılanlar (simplicity/texture yoksa is_centered/high_contrast) skaler motorla birebir aynıdır.
+    """
+    is_sharp, simplicity, texture, lifestyle, core_objects = [], [], [], [], []
+    for v in visual_data:
+        if not isinstance(v, dict): v = {}
+        is_sharp.append(bool(v.get("is_sharp", True)))
+        if "simplicity_score" in v:
+            simplicity.append(float(v.get("simplicity_score", 0)))
+        else:
+            simplicity.append(lqs.SIMPLICITY_CENTERED if v.get("is_centered", False) else lqs.SIMPLICITY_DEFAULT)
+        if "texture_aesthetics" in v:
+            texture.append(float(v.get("texture_aesthetics", 0)))
+        else:
+            texture.append(lqs.TEXTURE_HIGH_CONTRAST if v.get("high_contrast", False) else lqs.TEXTURE_DEFAULT)
+        lifestyle.append(bool(v.get("has_lifestyle", False)))
+        core_objects.append(str(v.get("core_object", "")).lower())
+
+    return {
+        "is_sharp": np.array(is_sharp, dtype=bool),
+        "simplicity": np.array(simplicity, dtype=np.float64),
+        "texture": np.array(texture, dtype=np.float64),
+        "has_lifestyle": np.array(lifestyle, dtype=bool),
+        "core_object": np.array(core_objects, dtype=str),
+    }
+
+
+def _str_array(values: Sequence[str]) -> np.ndarray:
+    # Boş listede np.array(..., dtype=str) '<U1' verir; np.char fonksiyonları için sorun değil
+    return np.array(list(values), dtype=str)
+
+
+def compute_lqs_columns(titles: Sequence[str],
+                        tag_lists: Sequence[Sequence[str]],
+                        visual: Dict[str, np.ndarray],
+                        image_counts: Optional[Sequence[int]] = None,
+                        has_video: Optional[Sequence[bool]] = None) -> Dict[str, np.ndarray]:
+    """
+    LQS v3.2'nin vektörel hali: tüm katalog tek geçişte puanlanır.
+    İşlem sırası skaler fonksiyonla aynı tutulur, böylece float sonuçlar bit bit eşleşir.
+    Dönen değerler yuvarlanmamıştır.
+    """
+    n = len(titles)
+    image_counts = np.ones(n, dtype=np.int64) if image_counts is None else np.asarray(image_counts, dtype=np.int64)
+    has_video = np.zeros(n, dtype=bool) if has_video is None else np.asarray(has_video, dtype=bool)
+
+    # --- MODULE 1: VISUAL IMPULSE (Max 35) ---
+    tech = np.where(visual["is_sharp"], lqs.TECH_SHARP_POINTS, 0.0)
+    simplicity = visual["simplicity"]
+    texture = visual["texture"]
+    life = np.where(visual["has_lifestyle"], lqs.LIFESTYLE_POINTS, 0.0)
+    visual_score = np.minimum(((tech + simplicity) + texture) + life, lqs.VISUAL_MAX)
+
+    # --- MODULE 2: SEO FOUNDATION (Max 35) ---
+    core = visual["core_object"]
+    title_arr = _str_array(titles)
+    title_head = np.array([t.lower()[:lqs.PARETO_CORE_WINDOW] for t in titles], dtype=str)
+
+    pareto = np.full(n, lqs.PARETO_BASE)
+    pareto -= np.where((np.char.str_len(core) > 0) & (np.char.find(title_head, core) < 0), lqs.PARETO_CORE_MISSING_PENALTY, 0.0)
+    pareto -= np.where(np.char.str_len(title_arr) < lqs.PARETO_MIN_TITLE_LENGTH, lqs.PARETO_SHORT_TITLE_PENALTY, 0.0)
+    pareto -= np.where(np.char.isupper(title_arr), lqs.PARETO_ALL_CAPS_PENALTY, 0.0)
+    seo_score = np.maximum(0.0, pareto)
+
+    # Etiketler düzleştirilip satır indeksine göre sayılır (satır başına Python döngüsü yok)
+    tag_counts = np.array([len(tags) for tags in tag_lists], dtype=np.int64)
+    row_index = np.repeat(np.arange(n), tag_counts)
+    flat_tags = _str_array([t for tags in tag_lists for t in tags])
+    if flat_tags.size:
+        matches = np.char.find(np.char.lower(flat_tags), core[row_index]) >= 0
+        long_tail = np.char.find(np.char.strip(flat_tags), " ") >= 0
+        match_c = np.bincount(row_index, weights=matches, minlength=n)
+        long_t = np.bincount(row_index, weights=long_tail, minlength=n)
+    else:
+        match_c = np.zeros(n)
+        long_t = np.zeros(n)
+
+    has_tags = tag_counts > 0
+    ratio = np.divide(match_c, tag_counts, out=np.zeros(n), where=has_tags)
+
+    tag_s = np.minimum(lqs.TAG_DENSITY_MAX, (tag_counts / lqs.TAG_TARGET_COUNT) * lqs.TAG_DENSITY_MAX)  # Density
+    tag_s = tag_s + np.where(has_tags & (ratio > lqs.RELEVANCE_HIGH_RATIO), lqs.RELEVANCE_HIGH_POINTS,
+                             np.where(has_tags & (ratio >= lqs.RELEVANCE_LOW_RATIO), lqs.RELEVANCE_LOW_POINTS, 0.0))
+    tag_s = tag_s + np.where(long_t >= lqs.LONG_TAIL_HIGH_COUNT, lqs.LONG_TAIL_HIGH_POINTS,
+                             np.where(long_t >= lqs.LONG_TAIL_LOW_COUNT, lqs.LONG_TAIL_LOW_POINTS, 0.0))
+    seo_score = seo_score + tag_s
+
+    seo_score = seo_score + np.where(image_counts >= lqs.IMAGES_RICH_COUNT, lqs.IMAGES_RICH_POINTS,
+                                     np.where(image_counts >= lqs.IMAGES_MULTI_COUNT, lqs.IMAGES_MULTI_POINTS, 0.0))
+    seo_score = seo_score + np.where(has_video, lqs.VIDEO_POINTS, 0.0)
+
+    # --- MODULE 3: ZEITGEIST (Max 30) ---
+    z_score = (visual_score / lqs.VISUAL_MAX) * lqs.BEST_SELLER_SIMILARITY_MAX
+    z_score = z_score + lqs.ZEITGEIST_VELOCITY
+    z_score = z_score + lqs.ZEITGEIST_IN_SEASON
+
+    # Trendsetter Protocol
+    is_trendsetter = (lqs.ZEITGEIST_VELOCITY < lqs.TRENDSETTER_MAX_VELOCITY) & (visual_score > lqs.TRENDSETTER_MIN_VISUAL)
+    z_score = np.where(is_trendsetter, lqs.TRENDSETTER_SCORE, z_score)
+
+    total = np.minimum(lqs.TOTAL_MAX, (visual_score + seo_score) + z_score)
+
+    return {
+        "total": total,
+        "visual": visual_score,
+        "seo": seo_score,
+        "zeitgeist": z_score,
+        "simplicity": simplicity,
+        "texture": texture,
+        "tech": tech,
+        "life": life,
+        "is_trendsetter": is_trendsetter,
+    }
+
+
+def calculate_lqs_batch(titles: Sequence[str],
+                        tag_lists: Sequence[Sequence[str]],
+                        visual_data: Sequence[Dict[str, Any]],
+                        image_counts: Optional[Sequence[int]] = None,
+                        has_video: Optional[Sequence[bool]] = None) -> List[Dict[str, Any]]:
+    """
+    calculate_lqs_3_1'in toplu versiyonu; her satır için aynı sözlük yapısını döner.
+    Yuvarlama Python round() ile birebir aynıdır (py_round; np.round bazı .x5 değerlerinde farklı sonuç verir).
+    """
+    cols = compute_lqs_columns(titles, tag_lists, extract_visual_columns(visual_data), image_counts, has_video)
+
+    total = py_round(cols["total"], 1).tolist()
+    visual = py_round(cols["visual"], 1).tolist()
+    seo = py_round(cols["seo"], 1).tolist()
+    zeitgeist = py_round(cols["zeitgeist"], 1).tolist()
+    simplicity = cols["simplicity"].tolist()
+    texture = cols["texture"].tolist()
+    tech = cols["tech"].tolist()
+    life = cols["life"].tolist()
+    trendsetter = cols["is_trendsetter"].tolist()
+
+    results = []
+    for i in range(len(total)):
+        feedback = []
+        if tech[i] < lqs.TECH_SHARP_POINTS: feedback.append(lqs.FEEDBACK_NOT_SHARP)
+        if simplicity[i] < lqs.SIMPLICITY_WARN_BELOW: feedback.append(lqs.FEEDBACK_COMPLEX)
+        if texture[i] < lqs.TEXTURE_WARN_BELOW: feedback.append(lqs.FEEDBACK_WEAK_TEXTURE)
+        if life[i] < lqs.LIFESTYLE_WARN_BELOW: feedback.append(lqs.FEEDBACK_NO_LIFESTYLE)
+        if trendsetter[i]: feedback.append(lqs.FEEDBACK_TRENDSETTER)
+
+        results.append({
+            "total_score": total[i],
+            "breakdown": {
+                "visual_impulse_score": visual[i],
+                "seo_foundation_score": seo[i],
+                "zeitgeist_score": zeitgeist[i],
+                "visual_details": {"simplicity": simplicity[i], "texture": texture[i]}
+            },
+            "is_trendsetter": trendsetter[i],
+            "feedback": feedback
+        })
+    return results
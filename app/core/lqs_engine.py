@@ -1,6 +1,50 @@
 from typing import List, Dict, Any
 from pydantic import BaseModel
 
+# LQS v3.2 ağırlıkları ve eşikleri; skaler motor ve vektörel motor (lqs_batch) aynı sabitleri kullanır
+# --- Visual Impulse ---
+VISUAL_MAX = 35.0
+TECH_SHARP_POINTS = 5.0
+SIMPLICITY_CENTERED, SIMPLICITY_DEFAULT = 10.0, 5.0  # simplicity_score yoksa
+TEXTURE_HIGH_CONTRAST, TEXTURE_DEFAULT = 10.0, 4.0  # texture_aesthetics yoksa
+LIFESTYLE_POINTS = 10.0
+SIMPLICITY_WARN_BELOW = 7
+TEXTURE_WARN_BELOW = 7
+LIFESTYLE_WARN_BELOW = 5
+
+# --- SEO Foundation ---
+PARETO_BASE = 15.0
+PARETO_CORE_WINDOW = 40  # Ana nesne başlığın ilk 40 karakterinde olmalı
+PARETO_CORE_MISSING_PENALTY = 8.0
+PARETO_MIN_TITLE_LENGTH = 80
+PARETO_SHORT_TITLE_PENALTY = 4.0
+PARETO_ALL_CAPS_PENALTY = 3.0
+TAG_TARGET_COUNT = 13
+TAG_DENSITY_MAX = 2.0
+RELEVANCE_HIGH_RATIO, RELEVANCE_HIGH_POINTS = 0.4, 6.0
+RELEVANCE_LOW_RATIO, RELEVANCE_LOW_POINTS = 0.1, 3.0
+LONG_TAIL_HIGH_COUNT, LONG_TAIL_HIGH_POINTS = 7, 7.0
+LONG_TAIL_LOW_COUNT, LONG_TAIL_LOW_POINTS = 4, 3.5
+IMAGES_RICH_COUNT, IMAGES_RICH_POINTS = 5, 4.0
+IMAGES_MULTI_COUNT, IMAGES_MULTI_POINTS = 2, 2.0
+VIDEO_POINTS = 1.0
+
+# --- Zeitgeist (piyasa verisi simülasyonu) ---
+BEST_SELLER_SIMILARITY_MAX = 15.0
+ZEITGEIST_VELOCITY = 8.0  # Stable
+ZEITGEIST_IN_SEASON = 5.0
+TRENDSETTER_MAX_VELOCITY = 6
+TRENDSETTER_MIN_VISUAL = 30
+TRENDSETTER_SCORE = 25.0
+
+TOTAL_MAX = 100.0
+
+FEEDBACK_NOT_SHARP = "Görsel netliği düşük."
+FEEDBACK_COMPLEX = "Kompozisyon karmaşık (Simplicity Principle)."
+FEEDBACK_WEAK_TEXTURE = "Doku ve estetik zayıf."
+FEEDBACK_NO_LIFESTYLE = "Lifestyle görsel eksik."
+FEEDBACK_TRENDSETTER = "TRENDSETTER: Trend düşük ama Görsel mükemmel."
+
 class LQSInput(BaseModel):
     image_url: str
     title: str
@@ -23,32 +67,32 @@ def calculate_lqs_3_1(data: LQSInput) -> Dict[str, Any]:
     v_data = data.visual_data
     
     # 1. Tech Quality (0 or 5)
-    tech_val = 5.0 if v_data.get("is_sharp", True) else 0.0
+    tech_val = TECH_SHARP_POINTS if v_data.get("is_sharp", True) else 0.0
     visual_score += tech_val
-    if tech_val < 5: feedback.append("Görsel netliği düşük.")
+    if tech_val < TECH_SHARP_POINTS: feedback.append(FEEDBACK_NOT_SHARP)
 
     # 2. Simplicity (Max 10) - [Paper: Simplicity leads to CTR]
     simp_score = float(v_data.get("simplicity_score", 0))
     if "simplicity_score" not in v_data: 
-        simp_score = 10.0 if v_data.get("is_centered", False) else 5.0
+        simp_score = SIMPLICITY_CENTERED if v_data.get("is_centered", False) else SIMPLICITY_DEFAULT
     
     visual_score += simp_score
-    if simp_score < 7: feedback.append("Kompozisyon karmaşık (Simplicity Principle).")
+    if simp_score < SIMPLICITY_WARN_BELOW: feedback.append(FEEDBACK_COMPLEX)
 
     # 3. Texture/Aesthetics (Max 10) - [Paper: Texture/Style]
     tex_score = float(v_data.get("texture_aesthetics", 0))
     if "texture_aesthetics" not in v_data:
-        tex_score = 10.0 if v_data.get("high_contrast", False) else 4.0
+        tex_score = TEXTURE_HIGH_CONTRAST if v_data.get("high_contrast", False) else TEXTURE_DEFAULT
         
     visual_score += tex_score
-    if tex_score < 7: feedback.append("Doku ve estetik zayıf.")
+    if tex_score < TEXTURE_WARN_BELOW: feedback.append(FEEDBACK_WEAK_TEXTURE)
 
     # 4. Lifestyle (Max 10)
-    life_score = 10.0 if v_data.get("has_lifestyle", False) else 0.0
+    life_score = LIFESTYLE_POINTS if v_data.get("has_lifestyle", False) else 0.0
     visual_score += life_score
-    if life_score < 5: feedback.append("Lifestyle görsel eksik.")
+    if life_score < LIFESTYLE_WARN_BELOW: feedback.append(FEEDBACK_NO_LIFESTYLE)
     
-    visual_score = min(visual_score, 35.0)
+    visual_score = min(visual_score, VISUAL_MAX)
 
     # --- MODULE 2: SEO FOUNDATION (Max 35) ---
     seo_score = 0.0
@@ -56,49 +100,49 @@ def calculate_lqs_3_1(data: LQSInput) -> Dict[str, Any]:
     title_lower = data.title.lower()
     
     # Pareto Title
-    pareto = 15.0
-    if core_object and core_object not in title_lower[:40]: pareto -= 8
-    if len(data.title) < 80: pareto -= 4
-    if data.title.isupper(): pareto -= 3
+    pareto = PARETO_BASE
+    if core_object and core_object not in title_lower[:PARETO_CORE_WINDOW]: pareto -= PARETO_CORE_MISSING_PENALTY
+    if len(data.title) < PARETO_MIN_TITLE_LENGTH: pareto -= PARETO_SHORT_TITLE_PENALTY
+    if data.title.isupper(): pareto -= PARETO_ALL_CAPS_PENALTY
     seo_score += max(0, pareto)
     
     # Tag Health
     tag_s = 0.0
-    tag_s += min(2.0, (len(data.tags)/13)*2) # Density
+    tag_s += min(TAG_DENSITY_MAX, (len(data.tags)/TAG_TARGET_COUNT)*TAG_DENSITY_MAX) # Density
     
     # Semantic Relevance
     match_c = sum(1 for t in data.tags if core_object in t.lower())
-    if len(data.tags) > 0 and (match_c/len(data.tags)) > 0.4: tag_s += 6
-    elif len(data.tags) > 0 and (match_c/len(data.tags)) >= 0.1: tag_s += 3
+    if len(data.tags) > 0 and (match_c/len(data.tags)) > RELEVANCE_HIGH_RATIO: tag_s += RELEVANCE_HIGH_POINTS
+    elif len(data.tags) > 0 and (match_c/len(data.tags)) >= RELEVANCE_LOW_RATIO: tag_s += RELEVANCE_LOW_POINTS
     
     # Long Tail
     long_t = sum(1 for t in data.tags if " " in t.strip())
-    if long_t >= 7: tag_s += 7
-    elif long_t >= 4: tag_s += 3.5
+    if long_t >= LONG_TAIL_HIGH_COUNT: tag_s += LONG_TAIL_HIGH_POINTS
+    elif long_t >= LONG_TAIL_LOW_COUNT: tag_s += LONG_TAIL_LOW_POINTS
     
     seo_score += tag_s
     
     # Asset Richness
-    if data.image_count >= 5: seo_score += 4
-    elif data.image_count >= 2: seo_score += 2
-    if data.has_video: seo_score += 1
+    if data.image_count >= IMAGES_RICH_COUNT: seo_score += IMAGES_RICH_POINTS
+    elif data.image_count >= IMAGES_MULTI_COUNT: seo_score += IMAGES_MULTI_POINTS
+    if data.has_video: seo_score += VIDEO_POINTS
 
     # --- MODULE 3: ZEITGEIST (Max 30) ---
     z_score = 0.0
     # Simulating Market Data
-    z_score += (visual_score / 35.0) * 15.0 # Best Seller Similarity
-    velocity = 8.0 # Stable
+    z_score += (visual_score / VISUAL_MAX) * BEST_SELLER_SIMILARITY_MAX # Best Seller Similarity
+    velocity = ZEITGEIST_VELOCITY
     z_score += velocity
-    z_score += 5.0 # In-Season
+    z_score += ZEITGEIST_IN_SEASON
     
     # Trendsetter Protocol
     is_trendsetter = False
-    if velocity < 6 and visual_score > 30:
-        z_score = 25.0
+    if velocity < TRENDSETTER_MAX_VELOCITY and visual_score > TRENDSETTER_MIN_VISUAL:
+        z_score = TRENDSETTER_SCORE
         is_trendsetter = True
-        feedback.append("TRENDSETTER: Trend düşük ama Görsel mükemmel.")
+        feedback.append(FEEDBACK_TRENDSETTER)
 
-    total = min(100.0, visual_score + seo_score + z_score)
+    total = min(TOTAL_MAX, visual_score + seo_score + z_score)
     
     return {
         "total_score": round(total, 1),
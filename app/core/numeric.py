@@ -0,0 +1,23 @@
+import numpy as np
+
+# x * 10**ndigits yarıma bu kadar yakınsa çarpımdaki yuvarlama hatası sonucu değiştirebilir
+_TIE_TOLERANCE = 1e-9
+
+
+def py_round(values: np.ndarray, ndigits: int) -> np.ndarray:
+    """
+    Python'un round(x, ndigits) sonucunu vektörel olarak üretir.
+    np.round önce 10**ndigits ile çarptığı için yarıma çok yakın değerlerde farklı yuvarlayabilir;
+    sadece bu belirsiz elemanlar Python round() ile yeniden hesaplanır.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    scale = 10.0 ** ndigits
+    scaled = values * scale
+    result = np.rint(scaled) / scale
+
+    with np.errstate(invalid="ignore"):
+        distance = np.abs(scaled - np.floor(scaled) - 0.5)
+    ambiguous = np.flatnonzero(~(distance > _TIE_TOLERANCE * np.maximum(1.0, np.abs(scaled))))
+    for i in ambiguous:
+        result[i] = round(float(values[i]), ndigits)
+    return result
@@ -1,12 +1,41 @@
 import math
 from typing import Dict, Any, List
 
+# Neuro-Pricing katsayıları ve strateji metinleri; skaler motor ve vektörel motor (pricing_batch) aynı sabitleri kullanır
+DEFAULT_CATEGORY_MIN = 5.0
+DEFAULT_CATEGORY_MAX = 100.0
+
+# Rakip çapası
+PREMIUM_MIN_LQS = 75
+PREMIUM_COMPETITOR_FACTOR = 1.15  # Rakibin %15 üstü
+PREMIUM_OWN_WEIGHT, PREMIUM_COMPETITOR_WEIGHT = 0.6, 0.4
+PENETRATION_COMPETITOR_FACTOR = 0.90  # Rakibin %10 altı
+PENETRATION_OWN_WEIGHT, PENETRATION_COMPETITOR_WEIGHT = 0.4, 0.6
+
+# Mevsimsellik
+SEASON_LOOKAHEAD_MONTHS = 3
+HIGH_SEASON_RATIO, HIGH_SEASON_MULTIPLIER = 1.2, 1.10
+LOW_SEASON_RATIO, LOW_SEASON_MULTIPLIER = 0.8, 0.95
+
+# Charm pricing ve fiyat aralığı
+CHARM_SMALL_BELOW = 10
+CHARM_MID_BELOW = 50
+CHARM_ROUND_DOWN_DECIMAL = 0.5
+CHARM_DOWN_OFFSET = 0.05
+CHARM_ENDING = 0.95
+PRICE_BAND_MIN, PRICE_BAND_MAX = 0.85, 1.25
+
+NOTE_QUALITY = "Görsel kalite bazlı değerleme"
+NOTE_PREMIUM = "Premium: Rakibinden daha kaliteli görünüyor (+%15)"
+NOTE_PENETRATION = "Rekabetçi: Pazara giriş için rakip altı (-%10)"
+NOTE_HIGH_SEASON = " + Yüksek Sezon"
+
 class PricingEngine:
     def __init__(self, 
                  lqs_score: float, 
                  competitor_price: float = 0.0, 
-                 category_min: float = 5.0, 
-                 category_max: float = 100.0,
+                 category_min: float = DEFAULT_CATEGORY_MIN, 
+                 category_max: float = DEFAULT_CATEGORY_MAX,
                  seasonality_data: List[int] = None):
         """
         Neuro-Pricing Motoru
@@ -35,19 +64,19 @@ class PricingEngine:
         # Eğer rakip varsa ve bizim görselimiz iyiyse (LQS > 70), rakibin %10 üstüne çık.
         # Görselimiz kötüyse, rekabet için rakibin %10 altına in.
         strategic_price = perceived_value
-        strategy_note = "Görsel kalite bazlı değerleme"
+        strategy_note = NOTE_QUALITY
         
         if self.competitor_price > 0:
-            if self.lqs_score >= 75:
+            if self.lqs_score >= PREMIUM_MIN_LQS:
                 # Premium Strateji
-                comp_target = self.competitor_price * 1.15
-                strategic_price = (perceived_value * 0.6) + (comp_target * 0.4)
-                strategy_note = "Premium: Rakibinden daha kaliteli görünüyor (+%15)"
+                comp_target = self.competitor_price * PREMIUM_COMPETITOR_FACTOR
+                strategic_price = (perceived_value * PREMIUM_OWN_WEIGHT) + (comp_target * PREMIUM_COMPETITOR_WEIGHT)
+                strategy_note = NOTE_PREMIUM
             else:
                 # Penetrasyon Stratejisi
-                comp_target = self.competitor_price * 0.90
-                strategic_price = (perceived_value * 0.4) + (comp_target * 0.6)
-                strategy_note = "Rekabetçi: Pazara giriş için rakip altı (-%10)"
+                comp_target = self.competitor_price * PENETRATION_COMPETITOR_FACTOR
+                strategic_price = (perceived_value * PENETRATION_OWN_WEIGHT) + (comp_target * PENETRATION_COMPETITOR_WEIGHT)
+                strategy_note = NOTE_PENETRATION
 
         # 3. Mevsimsellik Çarpanı (Seasonality Multiplier)
         # Önümüzdeki 3 ayın ortalaması, yıllık ortalamadan %20 yüksekse fiyatı artır.
@@ -57,14 +86,14 @@ class PricingEngine:
             # Şimdilik ortalamaya göre basit bir mantık kuralım
             avg_demand = sum(self.seasonality) / len(self.seasonality)
             # Varsayım: Şu anki ay ilk eleman. Gelecek 3 aya bak.
-            next_3_months = self.seasonality[:3] 
+            next_3_months = self.seasonality[:SEASON_LOOKAHEAD_MONTHS] 
             next_3_avg = sum(next_3_months) / len(next_3_months) if next_3_months else 0
             
-            if next_3_avg > avg_demand * 1.2:
-                season_multiplier = 1.10 # Yüksek sezon zammı
-                strategy_note += " + Yüksek Sezon"
-            elif next_3_avg < avg_demand * 0.8:
-                season_multiplier = 0.95 # Ölü sezon indirimi
+            if next_3_avg > avg_demand * HIGH_SEASON_RATIO:
+                season_multiplier = HIGH_SEASON_MULTIPLIER # Yüksek sezon zammı
+                strategy_note += NOTE_HIGH_SEASON
+            elif next_3_avg < avg_demand * LOW_SEASON_RATIO:
+                season_multiplier = LOW_SEASON_MULTIPLIER # Ölü sezon indirimi
         
         raw_final_price = strategic_price * season_multiplier
 
@@ -75,8 +104,8 @@ class PricingEngine:
         optimal_price = self._apply_charm_pricing(raw_final_price)
         
         # Aralık Belirleme
-        min_price = max(optimal_price * 0.85, self.cat_min)
-        max_price = optimal_price * 1.25
+        min_price = max(optimal_price * PRICE_BAND_MIN, self.cat_min)
+        max_price = optimal_price * PRICE_BAND_MAX
 
         return {
             "min": round(min_price, 2),
@@ -87,16 +116,16 @@ class PricingEngine:
 
     def _apply_charm_pricing(self, price: float) -> float:
         """Fiyatı .95, .99 veya tam sayıya yuvarlar."""
-        if price < 10:
+        if price < CHARM_SMALL_BELOW:
             # Küçük ürünlerde .95 veya .99
             # Örn: 5.30 -> 4.99 veya 5.95
             decimal = price - int(price)
-            if decimal < 0.5: return int(price) - 0.05 # 5.30 -> 4.95
-            else: return int(price) + 0.95 # 5.60 -> 5.95
+            if decimal < CHARM_ROUND_DOWN_DECIMAL: return int(price) - CHARM_DOWN_OFFSET # 5.30 -> 4.95
+            else: return int(price) + CHARM_ENDING # 5.60 -> 5.95
             
-        elif price < 50:
+        elif price < CHARM_MID_BELOW:
             # Orta segmentte .95
-            return int(price) + 0.95
+            return int(price) + CHARM_ENDING
             
         else:
             # Lüks ürünlerde tam sayı veya .00
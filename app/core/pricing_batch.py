@@ -0,0 +1,137 @@
+import sys
+from itertools import chain
+from typing import List, Dict, Any, Optional, Sequence, Union
+
+import numpy as np
+
+from app.core import pricing
+from app.core.numeric import py_round
+
+ArrayLike = Union[float, Sequence[float], np.ndarray]
+
+# Python 3.12+ sum() float'ları kompanse ederek toplar; sıralı toplam ancak tam sayılarda birebir aynıdır
+_COMPENSATED_SUM = sys.version_info >= (3, 12)
+
+
+def _seasonality_matrix(seasonality: Sequence[Optional[Sequence[float]]], n: int):
+    """Farklı uzunluktaki listeleri sıfırla doldurulmuş (n, k) matrise ve uzunluk dizisine çevirir."""
+    rows = [s if isinstance(s, (list, tuple)) else () for s in seasonality]
+    if len(rows) != n:
+        raise ValueError("seasonality length must match lqs_scores")
+    lengths = np.array([len(r) for r in rows], dtype=np.int64)
+    total = int(lengths.sum())
+    flat = np.fromiter(chain.from_iterable(rows), dtype=np.float64, count=total)
+    row_index = np.repeat(np.arange(n), lengths)
+    col_index = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    matrix = np.zeros((n, int(lengths.max()) if n else 0), dtype=np.float64)
+    matrix[row_index, col_index] = flat
+    return rows, matrix, lengths
+
+
+def _sequential_sum(matrix: np.ndarray, stop: Optional[int] = None) -> np.ndarray:
+    """Sütun sütun soldan sağa toplar (np.sum'ın ikili toplamı sum() ile bit bit eşleşmez)."""
+    total = np.zeros(matrix.shape[0])
+    for j in range(matrix.shape[1] if stop is None else min(stop, matrix.shape[1])):
+        total = total + matrix[:, j]
+    return total
+
+
+def _charm_prices(price: np.ndarray) -> np.ndarray:
+    """PricingEngine._apply_charm_pricing'in vektörel hali."""
+    whole = np.trunc(price)  # int(price)
+    decimal = price - whole
+    small = np.where(decimal < pricing.CHARM_ROUND_DOWN_DECIMAL, whole - pricing.CHARM_DOWN_OFFSET, whole + pricing.CHARM_ENDING)
+    mid = whole + pricing.CHARM_ENDING
+    luxury = np.rint(price)  # round(price): yarımlar çifte yuvarlanır
+    return np.where(price < pricing.CHARM_SMALL_BELOW, small, np.where(price < pricing.CHARM_MID_BELOW, mid, luxury))
+
+
+def compute_price_columns(lqs_scores: ArrayLike,
+                          competitor_prices: ArrayLike = 0.0,
+                          category_min: ArrayLike = pricing.DEFAULT_CATEGORY_MIN,
+                          category_max: ArrayLike = pricing.DEFAULT_CATEGORY_MAX,
+                          seasonality: Optional[Sequence[Optional[Sequence[float]]]] = None) -> Dict[str, np.ndarray]:
+    """
+    Neuro-Pricing'in toplu hali: tüm portföy tek geçişte fiyatlanır.
+    İşlem sırası PricingEngine.calculate_prices ile aynıdır; değerler yuvarlanmamış döner.
+    """
+    lqs = np.asarray(lqs_scores, dtype=np.float64)
+    n = lqs.shape[0]
+    competitor = np.broadcast_to(np.asarray(competitor_prices, dtype=np.float64), (n,))
+    cat_min = np.broadcast_to(np.asarray(category_min, dtype=np.float64), (n,))
+    cat_max = np.broadcast_to(np.asarray(category_max, dtype=np.float64), (n,))
+
+    # 1. Taban Fiyat
+    quality_ratio = (lqs / 100.0) ** 2
+    perceived_value = cat_min + quality_ratio * (cat_max - cat_min)
+
+    # 2. Rakip Çapası
+    has_competitor = competitor > 0
+    premium = has_competitor & (lqs >= pricing.PREMIUM_MIN_LQS)
+    penetration = has_competitor & ~premium
+    premium_price = ((perceived_value * pricing.PREMIUM_OWN_WEIGHT)
+                     + ((competitor * pricing.PREMIUM_COMPETITOR_FACTOR) * pricing.PREMIUM_COMPETITOR_WEIGHT))
+    penetration_price = ((perceived_value * pricing.PENETRATION_OWN_WEIGHT)
+                         + ((competitor * pricing.PENETRATION_COMPETITOR_FACTOR) * pricing.PENETRATION_COMPETITOR_WEIGHT))
+    strategic_price = np.where(premium, premium_price, np.where(penetration, penetration_price, perceived_value))
+    note_index = np.where(premium, 1, np.where(penetration, 2, 0))
+
+    # 3. Mevsimsellik Çarpanı
+    season_multiplier = np.ones(n)
+    high_season = np.zeros(n, dtype=bool)
+    if seasonality is not None:
+        rows, matrix, lengths = _seasonality_matrix(seasonality, n)
+        has_season = lengths > 0
+        total = _sequential_sum(matrix)
+        head = _sequential_sum(matrix, stop=pricing.SEASON_LOOKAHEAD_MONTHS)
+        if _COMPENSATED_SUM:
+            for i in np.flatnonzero(has_season):
+                if any(not float(v).is_integer() for v in rows[i]):
+                    total[i] = sum(rows[i])
+                    head[i] = sum(rows[i][:pricing.SEASON_LOOKAHEAD_MONTHS])
+
+        safe_lengths = np.maximum(lengths, 1)
+        avg_demand = total / safe_lengths
+        next_3_avg = head / np.minimum(safe_lengths, pricing.SEASON_LOOKAHEAD_MONTHS)
+
+        high_season = has_season & (next_3_avg > avg_demand * pricing.HIGH_SEASON_RATIO)
+        low_season = has_season & ~high_season & (next_3_avg < avg_demand * pricing.LOW_SEASON_RATIO)
+        season_multiplier = np.where(high_season, pricing.HIGH_SEASON_MULTIPLIER,
+                                     np.where(low_season, pricing.LOW_SEASON_MULTIPLIER, 1.0))
+
+    raw_final_price = strategic_price * season_multiplier
+
+    # 4. Charm Pricing ve aralık
+    optimal = _charm_prices(raw_final_price)
+    min_price = np.maximum(optimal * pricing.PRICE_BAND_MIN, cat_min)
+    max_price = optimal * pricing.PRICE_BAND_MAX
+
+    return {
+        "min": min_price,
+        "optimal": optimal,
+        "max": max_price,
+        "note_index": note_index,
+        "high_season": high_season,
+    }
+
+
+def calculate_prices_batch(lqs_scores: ArrayLike,
+                           competitor_prices: ArrayLike = 0.0,
+                           category_min: ArrayLike = pricing.DEFAULT_CATEGORY_MIN,
+                           category_max: ArrayLike = pricing.DEFAULT_CATEGORY_MAX,
+                           seasonality: Optional[Sequence[Optional[Sequence[float]]]] = None) -> List[Dict[str, Any]]:
+    """
+    PricingEngine.calculate_prices'ın toplu versiyonu; her satır için aynı sözlüğü döner.
+    Yuvarlama Python round() ile birebir aynıdır (py_round), böylece skaler motorla aynı sonuç çıkar.
+    """
+    cols = compute_price_columns(lqs_scores, competitor_prices, category_min, category_max, seasonality)
+    base_notes = (pricing.NOTE_QUALITY, pricing.NOTE_PREMIUM, pricing.NOTE_PENETRATION)  # note_index sırası
+    reasons = [base_notes[i] + (pricing.NOTE_HIGH_SEASON if high else "")
+               for i, high in zip(cols["note_index"].tolist(), cols["high_season"].tolist())]
+    mins = py_round(cols["min"], 2).tolist()
+    optimals = py_round(cols["optimal"], 2).tolist()
+    maxes = py_round(cols["max"], 2).tolist()
+    return [
+        {"min": lo, "optimal": opt, "max": hi, "reason": reason}
+        for lo, opt, hi, reason in zip(mins, optimals, maxes, reasons)
+    ]
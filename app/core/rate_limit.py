@@ -0,0 +1,76 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class TokenBucket:
+    """
+    Asenkron token bucket: saniyede `rate` token dolar, en fazla `capacity` birikir.
+    acquire() token yoksa gereken süre kadar bekler; bekleyenler sırayla (FIFO) geçer.
+    Upstream 429 + Retry-After döndüğünde pause() ile tüm çağıranlar durdurulur.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = self.capacity
+        self.updated_at = clock()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+        self.stats = {"acquired": 0, "waits": 0, "waited_seconds": 0.0, "pauses": 0}
+
+    def _refill(self, now: float):
+        if now <= self.updated_at:
+            return  # pause() sırasında token birikmez
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """Token alır; beklenen süreyi (saniye) döner."""
+        waited = 0.0
+        async with self._lock:
+            while True:
+                now = self.clock()
+                self._refill(now)
+                if now < self.paused_until:
+                    delay = self.paused_until - now
+                elif self.tokens >= tokens:
+                    self.tokens -= tokens
+                    break
+                else:
+                    delay = (tokens - self.tokens) / self.rate
+                waited += delay
+                await self.sleep(delay)
+
+        self.stats["acquired"] += 1
+        if waited:
+            self.stats["waits"] += 1
+            self.stats["waited_seconds"] += waited
+        return waited
+
+    def set_rate(self, rate: float, capacity: Optional[float] = None):
+        """Upstream'in bildirdiği limite uyum (ör. x-limit-per-second başlığı)."""
+        self._refill(self.clock())
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self.tokens = min(self.tokens, self.capacity)
+
+    def pause(self, seconds: float):
+        """Tüm çağıranları `seconds` boyunca bekletir ve biriken token'ları sıfırlar."""
+        now = self.clock()
+        self.paused_until = max(self.paused_until, now + seconds)
+        self.tokens = 0.0
+        self.updated_at = self.paused_until
+        self.stats["pauses"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "waited_seconds": round(self.stats["waited_seconds"], 3),
+            "rate": self.rate,
+            "capacity": self.capacity,
+        }
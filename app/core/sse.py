@@ -0,0 +1,10 @@
+import json
+from typing import Any
+
+# Proxy'lerin (nginx vb.) akışı tamponlamaması için
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def format_sse(event: str, data: Any) -> str:
+    """Tek bir Server-Sent Events mesajı üretir; data JSON olarak gönderilir."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
@@ -0,0 +1,45 @@
+import heapq
+from typing import Dict, Hashable, Iterable, List, Tuple
+
+
+class StreamingCounter:
+    """
+    Bellek sınırlı frekans sayacı (lossy counting). Farklı anahtar sayısı capacity'nin iki katını
+    geçince en sık capacity anahtar tutulur, gerisi atılır. Her budamada atılan en büyük sayım `error`'a
+    eklenir: tutulan her sayım gerçeğin en fazla `error` kadar altındadır ve gerçek sayımı `error`'dan
+    büyük olan hiçbir anahtar kaybolmaz. Budama hiç olmazsa (prunes == 0) sayımlar kesindir.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.total = 0
+        self.error = 0
+        self.prunes = 0
+        self._counts: Dict[Hashable, int] = {}
+
+    def add(self, key: Hashable, count: int = 1):
+        self._counts[key] = self._counts.get(key, 0) + count
+        self.total += count
+        if len(self._counts) > 2 * self.capacity:
+            self._prune()
+
+    def update(self, keys: Iterable[Hashable]):
+        for key in keys:
+            self.add(key)
+
+    def _prune(self):
+        ranked = heapq.nlargest(self.capacity + 1, self._counts.items(), key=lambda item: item[1])
+        # Atılanların en büyüğü, tutulmayan ilk anahtarın sayımıdır
+        self.error += ranked[-1][1]
+        self._counts = dict(ranked[:-1])
+        self.prunes += 1
+
+    def top(self, k: int) -> List[Tuple[Hashable, int]]:
+        """En sık k anahtar; tam sıralama yerine k boyutlu heap (eşitlikte anahtar sırası)."""
+        return heapq.nsmallest(k, self._counts.items(), key=lambda item: (-item[1], item[0]))
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def __getitem__(self, key: Hashable) -> int:
+        return self._counts.get(key, 0)
@@ -0,0 +1,134 @@
+import heapq
+import math
+from collections import Counter
+from itertools import combinations
+from typing import Dict, Any, Iterable, List, Tuple
+
+from app.core.keyword_index import normalize_term
+
+MAX_TAGS_PER_DOCUMENT = 50  # Tek belgenin çift sayısı (n^2/2) patlamasın
+
+
+def tag_set(tags: Iterable[Any]) -> Tuple[str, ...]:
+    """Belgenin (ürün veya snapshot) normalize, tekrarsız ve sıralı etiketleri."""
+    return tuple(sorted({t for t in (normalize_term(tag) for tag in tags or []) if t}))[:MAX_TAGS_PER_DOCUMENT]
+
+
+def cooccurrence_counts(documents: Iterable[Iterable[Any]]) -> Tuple[int, Counter, Counter]:
+    """Düz sayım: (belge sayısı, etiket başına belge sayısı, çift başına ortak belge sayısı)."""
+    n, tags, pairs = 0, Counter(), Counter()
+    for document in documents:
+        unique = tag_set(document)
+        if not unique:
+            continue
+        n += 1
+        tags.update(unique)
+        pairs.update(combinations(unique, 2))
+    return n, tags, pairs
+
+
+class CooccurrenceGraph:
+    """
+    Seyrek etiket birlikte-kullanım matrisi (komşuluk sözlükleri). Her belge bir etiket kümesidir;
+    etiket başına belge sayısı ve çift başına ortak belge sayısı tutulur. İlişkili etiketler
+    lift = c(x,y) * N / (c(x) * c(y)) ve PMI = log2(lift) ile skorlanır.
+    Belgeler eklenip çıkarılarak artımlı güncellenir (tam rebuild ile aynı sayımlar).
+    """
+
+    def __init__(self):
+        self._documents = 0
+        self._tag_counts: Dict[str, int] = {}
+        self._edges: Dict[str, Dict[str, int]] = {}
+        self.stats = {"lookups": 0, "updates": 0, "builds": 0}
+
+    def __len__(self) -> int:
+        return len(self._tag_counts)
+
+    @property
+    def documents(self) -> int:
+        return self._documents
+
+    def _apply(self, tags: Tuple[str, ...], sign: int):
+        if not tags:
+            return
+        self._documents += sign
+        counts, edges = self._tag_counts, self._edges
+        for tag in tags:
+            value = counts.get(tag, 0) + sign
+            if value > 0:
+                counts[tag] = value
+            else:
+                counts.pop(tag, None)
+        for a, b in combinations(tags, 2):
+            for x, y in ((a, b), (b, a)):
+                neighbours = edges.setdefault(x, {})
+                value = neighbours.get(y, 0) + sign
+                if value > 0:
+                    neighbours[y] = value
+                else:
+                    neighbours.pop(y, None)
+                    if not neighbours:
+                        del edges[x]
+
+    def build(self, documents: Iterable[Iterable[Any]]):
+        """Grafiği verilen belgelerden baştan kurar."""
+        n, tag_counts, pair_counts = cooccurrence_counts(documents)
+        # Çiftler önce düz sayılır, komşuluk sözlükleri tek geçişte doldurulur (belge belge _apply'dan hızlı)
+        edges: Dict[str, Dict[str, int]] = {}
+        for (a, b), together in pair_counts.items():
+            edges.setdefault(a, {})[b] = together
+            edges.setdefault(b, {})[a] = together
+        self._documents, self._tag_counts, self._edges = n, dict(tag_counts), edges
+        self.stats["builds"] += 1
+
+    def update(self, added: Iterable[Iterable[Any]] = (), removed: Iterable[Iterable[Any]] = ()):
+        """removed sadece grafiğe daha önce eklenmiş belgeleri içermeli; aksi halde sayımlar rebuild'den sapar."""
+        for tags in removed:
+            self._apply(tag_set(tags), -1)
+        for tags in added:
+            self._apply(tag_set(tags), 1)
+        self.stats["updates"] += 1
+
+    def count(self, tag: str) -> int:
+        return self._tag_counts.get(normalize_term(tag), 0)
+
+    def pair_count(self, a: str, b: str) -> int:
+        return self._edges.get(normalize_term(a), {}).get(normalize_term(b), 0)
+
+    def related(self, tag: str, limit: int = 20, min_count: int = 2, sort: str = "pmi") -> List[Dict[str, Any]]:
+        """
+        Etiketle aynı belgelerde geçen etiketler. Sadece komşular taranır ve ilk `limit` heap ile seçilir.
+        min_count: nadir çiftlerin PMI'ı şişik olduğundan en az bu kadar ortak belge şartı.
+        """
+        tag = normalize_term(tag)
+        self.stats["lookups"] += 1
+        neighbours = self._edges.get(tag)
+        if not neighbours:
+            return []
+        n, counts = self._documents, self._tag_counts
+        base = counts[tag]
+
+        def lift(item: Tuple[str, int]) -> float:
+            other, together = item
+            return together * n / (base * counts[other])
+
+        if sort == "count":
+            key = lambda item: (item[1], lift(item))
+        else:
+            # PMI log2(lift) ile monoton; sıralama aynı
+            key = lambda item: (lift(item), item[1])
+        candidates = ((other, together) for other, together in neighbours.items() if together >= min_count)
+        top = heapq.nlargest(limit, candidates, key=key)
+        return [
+            {"tag": other, "count": together, "lift": round(lift((other, together)), 3),
+             "pmi": round(math.log2(lift((other, together))), 3)}
+            for other, together in top
+        ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "documents": self._documents,
+            "tags": len(self._tag_counts),
+            "pairs": sum(len(neighbours) for neighbours in self._edges.values()) // 2,
+        }
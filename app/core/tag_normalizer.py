@@ -0,0 +1,135 @@
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+MAX_TAG_LENGTH = 20  # Etsy kuralı
+MIN_TRIMMED_LENGTH = 3
+MAX_TAGS = 13
+CLEAN_CACHE_SIZE = 65536  # Katalogda aynı ham etiketler çok tekrar eder
+MAX_BATCH_CONTEXTS = 10000
+
+_WORD_RE = re.compile(r"\w+")
+_PUNCT_RE = re.compile(r"[^\w\s]")
+
+
+class TitleContext:
+    """
+    Başlıktan bir kez türetilen veriler: kelime dizisi, kelime -> ilk konum sözlüğü (list.index yerine)
+    ve etiket sayısı 13'ün altında kalırsa eklenecek, 20 karakteri aşmayan ikili öbekler.
+    """
+
+    __slots__ = ("words", "positions", "_phrases")
+
+    def __init__(self, title: str):
+        self.words = _WORD_RE.findall((title or "").lower())
+        self.positions: Dict[str, int] = {}
+        for i, word in enumerate(self.words):
+            self.positions.setdefault(word, i)
+        self._phrases: Optional[List[Tuple[str, str]]] = None
+
+    def neighbour_phrase(self, tag: str) -> str:
+        """Başlıkta geçen tek kelimelik etiketi önceki (yoksa sonraki) kelimeyle long tail yapar."""
+        idx = self.positions.get(tag.lower())
+        if idx is None:
+            return tag
+        if idx > 0:
+            return f"{self.words[idx - 1]} {tag}"
+        if idx < len(self.words) - 1:
+            return f"{tag} {self.words[idx + 1]}"
+        return tag
+
+    @property
+    def phrases(self) -> List[Tuple[str, str]]:
+        # (Title Case öbek, küçük harf anahtar); sadece doldurma gerektiğinde hesaplanır
+        if self._phrases is None:
+            phrases = []
+            for i in range(len(self.words) - 1):
+                phrase = f"{self.words[i]} {self.words[i + 1]}".title()
+                if len(phrase) <= MAX_TAG_LENGTH:
+                    phrases.append((phrase, phrase.lower()))
+            self._phrases = phrases
+        return self._phrases
+
+
+# Başlıktan bağımsız sonuç: (temiz etiket, küçük harf hali, Title Case etiket, tekrar anahtarı, uzunluk uygun mu)
+CleanedTag = Tuple[str, str, str, str, bool]
+
+
+@lru_cache(maxsize=CLEAN_CACHE_SIZE)
+def clean_tag(tag: str) -> Optional[CleanedTag]:
+    """Noktalama temizliği ve 20 karaktere kısaltma; geçersizse None. Sonuç ham etikete göre önbelleklenir."""
+    cleaned = _PUNCT_RE.sub("", tag.strip())
+    if not cleaned:
+        return None
+
+    # 1. KURAL: UZUNLUK KONTROLÜ (Max 20); sondan kelime atılarak kısaltılır
+    if len(cleaned) > MAX_TAG_LENGTH:
+        words = cleaned.split()
+        while len(" ".join(words)) > MAX_TAG_LENGTH and len(words) > 1:
+            words.pop()
+        cleaned = " ".join(words)
+        if len(cleaned) > MAX_TAG_LENGTH or len(cleaned) < MIN_TRIMMED_LENGTH:
+            return None
+
+    final_tag = cleaned.title()
+    return cleaned, cleaned.lower(), final_tag, final_tag.lower(), len(final_tag) <= MAX_TAG_LENGTH
+
+
+def validate_with_context(raw_tags: Sequence[str], context: TitleContext) -> List[str]:
+    valid_tags = []
+    seen_tags = set()
+    positions = context.positions
+
+    for tag in raw_tags:
+        entry = clean_tag(tag)
+        if entry is None:
+            continue
+        cleaned, lowered, final_tag, key, fits = entry
+
+        # 2. KURAL: TEK KELİME KONTROLÜ (başlıktaki komşu kelimeyle long tail)
+        if lowered in positions and " " not in cleaned:
+            final_tag = context.neighbour_phrase(cleaned).title()
+            key, fits = final_tag.lower(), len(final_tag) <= MAX_TAG_LENGTH
+
+        # 3. KURAL: TEKRAR VE FİNAL KONTROL
+        if fits and key not in seen_tags:
+            valid_tags.append(final_tag)
+            seen_tags.add(key)
+
+    # 13'e tamamlamak için başlıktaki ikili öbekler
+    if len(valid_tags) < MAX_TAGS:
+        for phrase, key in context.phrases:
+            if key not in seen_tags:
+                valid_tags.append(phrase)
+                seen_tags.add(key)
+                if len(valid_tags) >= MAX_TAGS: break
+
+    return valid_tags[:MAX_TAGS]
+
+
+def validate_and_fix_tags(raw_tags: List[str], title: str) -> List[str]:
+    """
+    Etsy kurallarına (max 20 karakter) uygun hale getirir.
+    Tek kelimelik etiketleri başlık kullanarak 'Long Tail' yapmaya çalışır.
+    """
+    return validate_with_context(raw_tags, TitleContext(title))
+
+
+def validate_many(titles: Sequence[str], tag_lists: Sequence[Sequence[str]]) -> List[List[str]]:
+    """
+    Toplu doğrulama (ör. binlerce ürünü yeniden doğrularken). Sonuçlar validate_and_fix_tags ile birebir
+    aynıdır; aynı başlık tekrar ederse başlık bağlamı bir kez kurulur.
+    """
+    if len(titles) != len(tag_lists):
+        raise ValueError("titles and tag_lists must have the same length")
+    contexts: Dict[str, TitleContext] = {}
+    results = []
+    for title, tags in zip(titles, tag_lists):
+        key = title or ""
+        context = contexts.get(key)
+        if context is None:
+            if len(contexts) >= MAX_BATCH_CONTEXTS:
+                contexts.clear()
+            context = contexts[key] = TitleContext(key)
+        results.append(validate_with_context(tags or [], context))
+    return results
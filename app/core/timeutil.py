@@ -0,0 +1,13 @@
+from datetime import datetime, timezone
+
+# Zaman damgaları her yerde timezone'lu UTC olarak yazılır ve karşılaştırılır.
+# Postgres timezone'lu (oturum saat diliminde), SQLite naive (CURRENT_TIMESTAMP, UTC) döner;
+# naive değerler bu yüzden UTC kabul edilir.
+
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def as_utc(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc) if value.tzinfo else value.replace(tzinfo=timezone.utc)
@@ -1,7 +1,12 @@
+import copy
+import hashlib
 import random
 import json
 import os
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Callable, Optional
+
+from app.core.cache import TTLCache
+from app.core.config import settings as app_settings
 
 # Google Analytics Data API
 try:
@@ -11,14 +16,52 @@ try:
 except ImportError:
     GOOGLE_ANALYTICS_AVAILABLE = False
 
+DEFAULT_START_DATE = "30daysAgo"
+DEFAULT_END_DATE = "today"
+
+# Süreç genelinde paylaşılır: client'lar credentials hash'ine, raporlar property + tarih aralığına göre
+_client_cache = TTLCache(ttl_seconds=None, max_entries=app_settings.GA4_CLIENT_CACHE_MAX)
+_report_cache = TTLCache(ttl_seconds=app_settings.GA4_REPORT_CACHE_TTL_SECONDS, max_entries=256)
+
+
+def _default_client_factory(credentials_dict: Dict[str, Any]):
+    return BetaAnalyticsDataClient.from_service_account_info(credentials_dict)
+
+
+def get_ga4_client(client_secret: str, client_factory: Optional[Callable[[Dict[str, Any]], Any]] = None):
+    """Aynı service-account JSON'u için tek client oluşturulur ve tekrar kullanılır."""
+    credentials_hash = hashlib.sha256(client_secret.encode("utf-8")).hexdigest()
+
+    def create_client():
+        try:
+            credentials_dict = json.loads(client_secret)
+        except json.JSONDecodeError:
+            raise ValueError("Invalid GA4 Client Secret JSON.")
+        return (client_factory or _default_client_factory)(credentials_dict)
+
+    return _client_cache.get_or_set(credentials_hash, create_client)
+
+
+def get_ga4_cache_stats() -> Dict[str, Any]:
+    return {"clients": _client_cache.get_stats(), "reports": _report_cache.get_stats()}
+
+
+def clear_ga4_caches():
+    _client_cache.clear()
+    _report_cache.clear()
+
+
 class TrafficIntelligence:
-    def __init__(self, lqs_score: float, settings: Any = None):
+    def __init__(self, lqs_score: float, settings: Any = None,
+                 client_factory: Optional[Callable[[Dict[str, Any]], Any]] = None):
         self.lqs_score = lqs_score
         self.settings = settings
+        self.client_factory = client_factory
 
-    def fetch_real_ga4_data(self) -> Dict[str, Any]:
+    def fetch_real_ga4_data(self, start_date: str = DEFAULT_START_DATE, end_date: str = DEFAULT_END_DATE) -> Dict[str, Any]:
         """
         Fetches real traffic data from Google Analytics 4.
+        The channel report is property-wide, so it is cached per property and date range.
         """
         if not GOOGLE_ANALYTICS_AVAILABLE:
             raise ImportError("google-analytics-data library is not installed.")
@@ -26,21 +69,23 @@ class TrafficIntelligence:
         if not self.settings or not self.settings.ga4_client_secret or not self.settings.ga4_property_id:
             raise ValueError("GA4 settings are missing.")
 
-        # Parse client secret JSON
-        try:
-            credentials_dict = json.loads(self.settings.ga4_client_secret)
-        except json.JSONDecodeError:
-            raise ValueError("Invalid GA4 Client Secret JSON.")
+        property_id = self.settings.ga4_property_id
+        report = _report_cache.get_or_set(
+            (property_id, start_date, end_date),
+            lambda: self._run_channel_report(property_id, start_date, end_date),
+        )
+        # Çağıran taraf sonucu değiştirebilir; önbellekteki kopya korunur
+        return copy.deepcopy(report)
 
-        # Create client
-        client = BetaAnalyticsDataClient.from_service_account_info(credentials_dict)
+    def _run_channel_report(self, property_id: str, start_date: str, end_date: str) -> Dict[str, Any]:
+        client = get_ga4_client(self.settings.ga4_client_secret, self.client_factory)
 
         # Run report
         request = RunReportRequest(
-            property=f"properties/{self.settings.ga4_property_id}",
+            property=f"properties/{property_id}",
             dimensions=[{"name": "sessionDefaultChannelGroup"}],
             metrics=[{"name": "activeUsers"}, {"name": "sessions"}],
-            date_ranges=[{"start_date": "30daysAgo", "end_date": "today"}],
+            date_ranges=[{"start_date": start_date, "end_date": end_date}],
         )
 
         response = client.run_report(request)
@@ -1,9 +1,13 @@
 # app/db/session.py
+from typing import AsyncGenerator
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 import os
 
+from app.core.config import settings
+
 # Render'dan gelen DATABASE_URL'i al
 DATABASE_URL = os.getenv("DATABASE_URL")
 
@@ -19,8 +23,53 @@ else:
     SQLALCHEMY_DATABASE_URL = "sqlite:///./etsy_v2.db"
     connect_args = {"check_same_thread": False}
 
+def to_async_url(url: str):
+    """Senkron URL'i async sürücüye çevirir (asyncpg / aiosqlite)."""
+    async_connect_args = {}
+    if url.startswith("sqlite"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1), async_connect_args
+    base, _, query = url.partition("?")
+    scheme, _, rest = base.partition("://")
+    # asyncpg 'sslmode' parametresini tanımıyor; 'ssl' olarak geçiyoruz
+    params = []
+    for param in filter(None, query.split("&")):
+        key, _, value = param.partition("=")
+        if key == "sslmode":
+            async_connect_args["ssl"] = value
+        else:
+            params.append(param)
+    async_url = f"postgresql+asyncpg://{rest}"
+    if params:
+        async_url += "?" + "&".join(params)
+    return async_url, async_connect_args
+
+ASYNC_DATABASE_URL, async_connect_args = to_async_url(SQLALCHEMY_DATABASE_URL)
+
+# Havuz ayarları sadece sunucu veritabanlarında anlamlı (SQLite dosya tabanlı)
+pool_kwargs = {}
+if not SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
+    pool_kwargs = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+# Senkron motor: script'ler (create_tables.py, migrate_*.py vb.) için
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args=connect_args
+    SQLALCHEMY_DATABASE_URL, connect_args=connect_args, **pool_kwargs
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
\ No newline at end of file
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Async motor: API endpoint'leri event loop'u bloklamadan kullanır
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL, connect_args=async_connect_args, **pool_kwargs
+)
+
+async_session_maker = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    async with async_session_maker() as db:
+        yield db
@@ -0,0 +1,6 @@
+# app/db/types.py
+from sqlalchemy import JSON
+from sqlalchemy.dialects.postgresql import JSONB
+
+# Postgres'te JSONB (GIN indekslenebilir), SQLite'ta JSON (TEXT olarak saklanır)
+JSONType = JSON().with_variant(JSONB(), "postgresql")
@@ -0,0 +1,51 @@
+# app/db/upsert.py
+from typing import Any, Dict, List, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+UPSERT_CHUNK_SIZE = 500
+
+
+def _column_name(model, field: str) -> str:
+    # Kolon adı attribute adından farklı olabilir (ör. Listing._tags -> "tags")
+    return model.__mapper__.attrs[field].columns[0].name
+
+
+def _upsert_statement(dialect: str, model, rows: List[Dict[str, Any]], index_elements: Sequence[str], update_fields: Sequence[str]):
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    stmt = insert(model).values(rows)
+    if not update_fields:
+        return stmt.on_conflict_do_nothing(index_elements=list(index_elements))
+    return stmt.on_conflict_do_update(
+        index_elements=list(index_elements),
+        set_={_column_name(model, field): stmt.excluded[_column_name(model, field)] for field in update_fields},
+    )
+
+
+async def bulk_upsert(db: AsyncSession, model, rows: List[Dict[str, Any]], index_elements: Sequence[str],
+                      update_fields: Sequence[str], chunk_size: int = UPSERT_CHUNK_SIZE) -> int:
+    """
+    Toplu upsert: Postgres/SQLite'ta INSERT ... ON CONFLICT DO UPDATE, parça parça (commit çağırana ait).
+    Çakışmada sadece update_fields güncellenir; diğer kolonlar (ör. analiz sonuçları) korunur.
+    Diğer veritabanlarında merge ile satır satır yazılır.
+    """
+    dialect = db.bind.dialect.name
+    for i in range(0, len(rows), chunk_size):
+        chunk = rows[i:i + chunk_size]
+        stmt = _upsert_statement(dialect, model, chunk, index_elements, update_fields)
+        if stmt is not None:
+            await db.execute(stmt)
+        else:
+            for row in chunk:
+                existing = await db.get(model, tuple(row[key] for key in index_elements))
+                if existing is None:
+                    db.add(model(**row))
+                else:
+                    for field in update_fields:
+                        setattr(existing, field, row[field])
+    return len(rows)
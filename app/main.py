@@ -3,9 +3,15 @@ from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.db.session import engine
+from app.db.session import async_engine
 from app.db.base import Base
 from app.api.v1.api import api_router
+from app.core.http_pool import init_http_pool, close_http_pool
+from app.services.job_queue import start_job_workers, stop_job_workers
+from app.services.model_registry import start_model_registry, stop_model_registry
+from app.services.suggestion_index import start_suggestion_index, stop_suggestion_index
+from app.services.tag_graph import start_tag_graph, stop_tag_graph
+from app.services.traffic_refresh import wait_for_traffic_refreshes, cancel_traffic_refreshes
 import os
 from dotenv import load_dotenv
 
@@ -23,13 +29,34 @@ async def lifespan(app: FastAPI):
     print("🚀 Beyond Words Analytics Platformu Başlatılıyor...")
     
     try:
-        Base.metadata.create_all(bind=engine)
+        async with async_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
         print("✅ Veritabanı Tabloları Hazır.")
     except Exception as e:
         print(f"❌ Veritabanı Hatası: {e}")
+
+    http_pool = init_http_pool()
+    print(f"✅ HTTP İstemci Havuzu Hazır (HTTP/2: {http_pool.http2}).")
+
+    registry = start_model_registry()
+    print(f"✅ Gemini Model Kaydı Hazır (varsayılan: {registry.selected_name}, keşif arka planda).")
+
+    start_suggestion_index()
+    start_tag_graph()
+
+    worker_count = start_job_workers()
+    print(f"✅ Analiz Kuyruğu Hazır ({worker_count} worker).")
         
     yield
     print("🛑 Sistem Kapatılıyor...")
+    await stop_job_workers()
+    await wait_for_traffic_refreshes(timeout=settings.TRAFFIC_REFRESH_TIMEOUT_SECONDS)
+    await cancel_traffic_refreshes()
+    await stop_model_registry()
+    await stop_suggestion_index()
+    await stop_tag_graph()
+    await close_http_pool()
+    await async_engine.dispose()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -46,6 +73,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"], 
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"], # /listings/{id}/history sayfalaması
 )
 
 # --- ARTIK GÜVENLİ: Resim Dosyalarını Sunma ---
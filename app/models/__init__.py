@@ -1,6 +1,9 @@
 # app/models/__init__.py
 from .listing import Listing
 from .snapshot import ListingSnapshot
+from .snapshot_rollup import ListingScoreRollup
 from .settings import Settings
+from .analysis_job import AnalysisJob
+from .keyword_metric import KeywordMetric
 # User ve Shop modellerini şimdilik kullanmıyoruz ama dosya varsa hata vermesin diye burada bırakabilirsin veya silebilirsin.
 # Şimdilik sadece aktif olanları import ediyoruz.
\ No newline at end of file
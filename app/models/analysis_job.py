@@ -0,0 +1,37 @@
+import uuid
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Index
+from app.db.base import Base
+from app.db.types import JSONType
+
+# Analiz hattının aşamaları (ilerleme bildirimi için sıralı)
+JOB_STAGES = ("queued", "download", "model", "lqs", "pricing", "persist", "done")
+
+class AnalysisJob(Base):
+    """Veritabanı tabanlı analiz kuyruğu kaydı; worker yeniden başlasa da kaybolmaz."""
+    __tablename__ = "analysis_jobs"
+    __table_args__ = (
+        # Worker'ların "sıradaki iş" sorgusu
+        Index("ix_analysis_jobs_status_run_after", "status", "run_after"),
+    )
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    listing_id = Column(String, index=True)
+    image_url = Column(String, default="")
+    product_title = Column(String, default="")
+    force_refresh = Column(Boolean, default=False)
+
+    status = Column(String, default="queued")  # queued | running | succeeded | failed
+    stage = Column(String, default="queued")
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=3)
+    run_after = Column(DateTime)  # Bir sonraki deneme zamanı (backoff)
+
+    locked_by = Column(String, nullable=True)
+    locked_at = Column(DateTime, nullable=True)  # Aşama güncellemeleri heartbeat olarak da kullanılır
+
+    error = Column(Text, default="")
+    result = Column(JSONType, nullable=True)
+
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    finished_at = Column(DateTime, nullable=True)
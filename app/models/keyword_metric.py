@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime
+from app.db.base import Base
+
+class KeywordMetric(Base):
+    """
+    Kendi ürün/snapshot etiket istatistiklerimizden toplu işle hesaplanan anahtar kelime metrikleri.
+    /keywords/explore ve Tag Spy her istekte rastgele değer üretmek yerine buradan okur.
+    """
+    __tablename__ = "keyword_metrics"
+
+    term = Column(String, primary_key=True)  # normalize edilmiş (küçük harf, tek boşluk)
+    listing_count = Column(Integer, default=0)   # Etiketi kullanan ürün sayısı
+    snapshot_count = Column(Integer, default=0)  # Analiz geçmişinde görülme sayısı
+    recent_count = Column(Integer, default=0)    # Son KEYWORD_TREND_WINDOW_DAYS içindeki snapshot'lar
+    previous_count = Column(Integer, default=0)  # Ondan önceki aynı uzunluktaki pencere
+    avg_lqs = Column(Float, default=0.0)
+
+    volume = Column(Integer, default=0)
+    competition = Column(String, default="Low")
+    ctr = Column(Float, default=0.0)
+    trend = Column(String, default="0%")
+
+    computed_at = Column(DateTime(timezone=True), index=True)
@@ -1,9 +1,31 @@
-from sqlalchemy import Column, String, Float, Boolean, DateTime
+from sqlalchemy import Column, String, Float, Boolean, DateTime, Integer, Index
 from sqlalchemy.sql import func
 from app.db.base import Base 
+from app.db.types import JSONType
+
+# JSON liste olarak saklanan etiket kolonları
+TAG_LIST_FIELDS = ("tags_focus", "tags_long_tail", "tags_aesthetic", "tags_creative")
+
+def to_tag_list(value):
+    """Virgüllü metin veya listeyi temiz bir etiket listesine çevirir."""
+    if not value: return []
+    if isinstance(value, list): return [str(tag).strip() for tag in value]
+    return [tag.strip() for tag in str(value).split(",")]
 
 class Listing(Base):
     __tablename__ = "listings"
+    __table_args__ = (
+        # /listings/index keyset sayfalaması için
+        Index("ix_listings_last_analyzed_at_id", "last_analyzed_at", "id"),
+        Index("ix_listings_lqs_score_id", "lqs_score", "id"),
+        Index("ix_listings_price_id", "price", "id"),
+        Index("ix_listings_title_id", "title", "id"),
+        Index("ix_listings_listing_type", "listing_type"),
+        # Mağaza senkronunun son güncelleme damgası sorgusu
+        Index("ix_listings_shop_id_etsy_updated_at", "shop_id", "etsy_updated_at"),
+        # Etiket sorguları için (sadece Postgres/JSONB)
+        Index("ix_listings_tags_gin", "tags", postgresql_using="gin").ddl_if(dialect="postgresql"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     title = Column(String, index=True)
@@ -11,6 +33,9 @@ class Listing(Base):
     image_url = Column(String)
     
     listing_type = Column(String, default="mine") 
+    shop_id = Column(String, index=True, nullable=True) # Etsy mağaza ID'si (içe aktarılan ürünler)
+    etsy_updated_at = Column(Integer, nullable=True) # Etsy updated_timestamp (artımlı senkron için)
+    source_fingerprint = Column(String, default="") # Etsy'deki başlık/etiket/fiyat/görsel özeti
     competitor_analysis = Column(String, default="") 
     
     is_analyzed = Column(Boolean, default=False)
@@ -24,6 +49,8 @@ class Listing(Base):
     # --------------------------------
     
     last_analyzed_at = Column(DateTime(timezone=True), nullable=True)
+    # Son analizin girdileri (görsel hash + başlık + tip); önbellek kararı için
+    analysis_input_hash = Column(String, default="")
 
     suggested_title = Column(String, default="")
     suggested_description = Column(String, default="")
@@ -42,24 +69,23 @@ class Listing(Base):
     trend_score = Column(Float, default=0.0)
     trend_reason = Column(String, default="")
     best_selling_months = Column(String, default="")
-    monthly_popularity = Column(String, default="") 
+    monthly_popularity = Column(JSONType, default=list) # [12 aylık puan]
 
-    tags_focus = Column(String, default="")
-    tags_long_tail = Column(String, default="")
-    tags_aesthetic = Column(String, default="")
-    tags_creative = Column(String, default="")
+    tags_focus = Column(JSONType, default=list)
+    tags_long_tail = Column(JSONType, default=list)
+    tags_aesthetic = Column(JSONType, default=list)
+    tags_creative = Column(JSONType, default=list)
     
-    traffic_data = Column(String, default="{}") # JSON String
+    traffic_data = Column(JSONType, default=dict)
+    visual_data = Column(JSONType, default=dict) # Gemini görsel öznitelikleri (LQS yeniden puanlama için)
+    pricing_inputs = Column(JSONType, default=dict) # Rakip fiyatı ve kategori sınırları (toplu yeniden fiyatlama için)
 
-    _tags = Column("tags", String, default="")
+    _tags = Column("tags", JSONType, default=list)
 
     @property
     def tags(self):
-        if not self._tags: return []
-        return [tag.strip() for tag in self._tags.split(",")]
+        return to_tag_list(self._tags)
 
     @tags.setter
     def tags(self, value):
-        if not value: self._tags = ""
-        elif isinstance(value, list): self._tags = ",".join(value)
-        else: self._tags = str(value)
\ No newline at end of file
+        self._tags = to_tag_list(value)
\ No newline at end of file
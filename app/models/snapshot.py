@@ -1,9 +1,13 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from app.db.base import Base
 
 class ListingSnapshot(Base):
     __tablename__ = "listing_snapshots"
+    __table_args__ = (
+        # Geçmiş sorguları ve sıkıştırma: listing_id + zaman sırası
+        Index("ix_listing_snapshots_listing_created", "listing_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     listing_id = Column(String, index=True)
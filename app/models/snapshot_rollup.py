@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, UniqueConstraint
+from app.db.base import Base
+
+class ListingScoreRollup(Base):
+    """Sıkıştırılmış eski snapshot'ların günlük/haftalık puan özetleri."""
+    __tablename__ = "listing_score_rollups"
+    __table_args__ = (
+        UniqueConstraint("listing_id", "granularity", "bucket_start", name="uq_rollup_bucket"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    listing_id = Column(String, index=True)
+    granularity = Column(String)  # "day" | "week"
+    bucket_start = Column(DateTime(timezone=True))
+    snapshot_count = Column(Integer, default=0)
+
+    lqs_avg = Column(Float, default=0.0)
+    lqs_min = Column(Float, default=0.0)
+    lqs_max = Column(Float, default=0.0)
+    lqs_visual_avg = Column(Float, default=0.0)
+    lqs_seo_avg = Column(Float, default=0.0)
+    lqs_zeitgeist_avg = Column(Float, default=0.0)
+    price_min_avg = Column(Float, default=0.0)
+    price_max_avg = Column(Float, default=0.0)
+    trend_avg = Column(Float, default=0.0)
@@ -1,11 +1,15 @@
 import json
 import openai
 from app.core.config import settings
+from app.core.http_pool import get_http_pool
+from app.services.image_cache import get_image_cache
+from app.services.image_processing import prepare_for_model
 
 class HybridSEOService:
     def __init__(self):
         # TEK MOTOR: Hem Göz (Vision) hem Kalem (Yazar) olarak GPT-4o kullanıyoruz
-        self.openai_client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        # Bağlantıları uygulamanın paylaşılan havuzu üzerinden aç (keep-alive)
+        self.openai_client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY, http_client=get_http_pool().client)
 
     async def analyze_image(self, image_url: str) -> dict:
         """
@@ -13,6 +17,11 @@ class HybridSEOService:
         """
         try:
             print("👀 AI (Göz): Görsel taranıyor...")
+            # URL yerine küçültülmüş kopyayı data URL olarak gönder
+            image = await get_image_cache().fetch(image_url, get_http_pool())
+            prepared = await prepare_for_model(image)
+            data_url = f"data:{prepared.mime_type};base64,{await prepared.base64()}"
+            print(f"🖼️ Görsel hazırlandı ({prepared.bytes_saved} byte tasarruf)")
             response = await self.openai_client.chat.completions.create(
                 model="gpt-4o",
                 messages=[
@@ -20,7 +29,7 @@ class HybridSEOService:
                         "role": "user",
                         "content": [
                             {"type": "text", "text": "Analyze this product image for Etsy. Return JSON: style, main_colors, materials, vibe, suggested_occasion."},
-                            {"type": "image_url", "image_url": {"url": image_url}}
+                            {"type": "image_url", "image_url": {"url": data_url}}
                         ]
                     }
                 ],
@@ -0,0 +1,349 @@
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta
+from typing import List, Optional, Dict, Any, Callable, Awaitable
+
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings as app_settings
+from app.core.http_pool import HTTPClientPool
+from app.core.lqs_engine import LQSInput, calculate_lqs_3_1
+from app.core.pricing import PricingEngine
+from app.core.tag_normalizer import validate_and_fix_tags
+from app.core.timeutil import as_utc, utc_now
+from app.models import Listing, ListingSnapshot
+from app.models.listing import to_tag_list
+from app.services.image_cache import get_image_cache
+from app.services.image_processing import prepare_for_model
+from app.services.lqs_rescore import lqs_reason
+from app.services.suggestion_index import listing_terms, snapshot_terms, record_listing_terms
+from app.services.tag_graph import listing_tags, snapshot_tags, record_listing_tags
+from app.services.traffic_refresh import schedule_traffic_refresh
+
+# Tek ürün analiz hattı; hem /analyze endpoint'leri hem de kuyruk worker'ları (job_queue) kullanır
+
+
+class AnalysisResult(BaseModel):
+    suggested_title: str
+    suggested_description: str
+    suggested_tags: List[str]
+    lqs_score: float
+    lqs_visual_score: float
+    lqs_seo_score: float
+    lqs_zeitgeist_score: float
+    lqs_reason: str
+    suggested_materials: str
+    suggested_styles: str
+    suggested_colors: str
+    suggested_occasions: str
+    suggested_recipients: str
+    suggested_faqs: str
+    predicted_price_min: float
+    predicted_price_max: float
+    predicted_price_optimal: float 
+    price_reason: str
+    trend_score: float
+    trend_reason: str
+    best_selling_months: str
+    monthly_popularity: str 
+    tags_focus: str
+    tags_long_tail: str
+    tags_aesthetic: str
+    tags_creative: str
+    competitor_analysis: str
+    traffic_data: Optional[Dict[str, Any]] = None
+    last_analyzed_at: Optional[datetime] = None
+    image_bytes_saved: Optional[int] = None
+
+
+# --- JSON YAPISI ---
+COMMON_STRUCTURE = """
+    {
+        "suggested_title": "SEO Optimized Title...", 
+        "suggested_description": "Sales oriented description...",
+        "tags_pool_20": ["tag1", "tag2", "tag3", ...], 
+        "tags_focus": ["core1", "core2"], 
+        "tags_long_tail": ["phrase 1", "phrase 2"], 
+        "tags_aesthetic": ["style1", "vibe1"], 
+        "tags_creative": ["unique idea 1"],
+        "competitor_analysis": "...", 
+        "monthly_popularity": [80, 90, 80, 70, 60, 50, 60, 70, 80, 90, 95, 90],
+        "materials": "...", "styles": "...", "colors": "...", "occasions": "...", "recipients": "...",
+        """
+
+
+def build_prompt(product_title: str, listing_type: str) -> str:
+    """Gemini'ye gönderilecek analiz talimatını hazırlar."""
+    role = "a COMPETITOR listing (estimate its market price)" if listing_type == "competitor" else "OUR OWN listing"
+    return f"""
+    YOU ARE AN ELITE ETSY SEO & VISUAL MERCHANDISING ANALYST.
+    Analyze the attached product image. It belongs to {role}.
+    CURRENT TITLE: "{product_title}"
+
+    Return ONLY valid JSON (no markdown) with exactly this structure:
+    {COMMON_STRUCTURE}
+        "faqs": [{{"q": "...", "a": "..."}}],
+        "price_min": 0, "price_max_valuation": 0,
+        "trend_score": 0, "trend_reason": "...", "best_months": ["..."],
+        "visual_data": {{"is_sharp": true, "simplicity_score": 0, "texture_aesthetics": 0, "has_lifestyle": false, "is_centered": false, "high_contrast": false, "core_object": "..."}}
+    }}
+    """
+
+
+class AnalysisModelError(Exception):
+    """Gemini yanıtı kullanılamadı (HTTP hatası, ayrıştırılamayan veya boş içerik); hiçbir şey kaydedilmez."""
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+    @property
+    def retryable(self) -> bool:
+        # Kota (429), sunucu hataları ve bozuk/boş yanıt tekrar denenebilir; diğer 4xx (anahtar, istek) denenmez
+        return self.status_code is None or self.status_code == 429 or self.status_code >= 500
+
+
+def compute_input_hash(image_hash: str, product_title: str, listing_type: str) -> str:
+    raw = f"{image_hash}|{product_title}|{listing_type}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def is_cached_result_fresh(db_listing: Listing, input_hash: str) -> bool:
+    """Girdiler aynıysa ve son analiz TTL içindeyse Gemini'ye gitmeye gerek yok."""
+    ttl_hours = app_settings.ANALYSIS_CACHE_TTL_HOURS
+    if ttl_hours <= 0 or not db_listing.is_analyzed or not db_listing.last_analyzed_at:
+        return False
+    if db_listing.analysis_input_hash != input_hash:
+        return False
+    return utc_now() - as_utc(db_listing.last_analyzed_at) < timedelta(hours=ttl_hours)
+
+
+async def run_analysis_pipeline(db: AsyncSession, http: HTTPClientPool, db_listing: Listing, image_url: str, product_title: str, force_refresh: bool = False,
+                                on_stage: Optional[Callable[[str], Awaitable[None]]] = None) -> AnalysisResult:
+    """
+    Tek bir ürün için tam analiz hattı: Görsel -> Gemini -> LQS -> Fiyat -> Kayıt.
+    Hata durumunda exception fırlatır; çağıran taraf nasıl raporlayacağına karar verir.
+    on_stage verilirse her aşamanın başında aşama adıyla çağrılır (download, model, lqs, pricing, persist).
+    """
+    async def stage(name: str):
+        if on_stage: await on_stage(name)
+
+    my_api_key = os.getenv("GEMINI_API_KEY")
+    target_model = "gemini-flash-latest"
+    
+    url = f"https://generativelanguage.googleapis.com/v1beta/models/{target_model}:generateContent?key={my_api_key}"
+    headers = {"Content-Type": "application/json"} 
+
+    prompt_text = build_prompt(product_title, db_listing.listing_type)
+
+    await stage("download")
+    # Görsel önbellekten gelir (ETag/Last-Modified doğrulamalı); base64 de önbellekte tutulur
+    image = await get_image_cache().fetch(image_url, http)
+
+    # --- SONUÇ ÖNBELLEĞİ ---
+    input_hash = compute_input_hash(image.content_hash, product_title, db_listing.listing_type)
+    if not force_refresh and is_cached_result_fresh(db_listing, input_hash):
+        return get_cached_result(db_listing)
+
+    prepared = await prepare_for_model(image)
+    image_data = await prepared.base64()
+    mime_type = prepared.mime_type
+    print(f"🖼️ Görsel hazırlandı: {prepared.original_size} -> {prepared.size} byte ({prepared.bytes_saved} byte tasarruf)")
+
+    await stage("model")
+    payload = {
+        "contents": [{"parts": [{"text": prompt_text}, {"inline_data": {"mime_type": mime_type, "data": image_data}}]}],
+        "generationConfig": {"temperature": 0.2, "topP": 0.8, "topK": 40}
+    }
+
+    response = await http.post(url, headers=headers, json=payload, timeout=50.0)
+    if response.status_code != 200:
+        raise AnalysisModelError(f"Gemini HTTP {response.status_code}: {response.text[:200]}", status_code=response.status_code)
+    try:
+        result_json = response.json()
+        candidate = result_json["candidates"][0]["content"]["parts"][0]["text"]
+        cleaned_text = candidate.replace("```json", "").replace("```", "").strip()
+        data = json.loads(cleaned_text)
+    except (KeyError, IndexError, TypeError, ValueError) as e:
+        raise AnalysisModelError(f"Gemini yanıtı ayrıştırılamadı: {type(e).__name__}: {e}") from e
+    # Boş analiz kaydedilmez: input hash yazılırsa sonuç önbelleği boş sonucu TTL boyunca döndürür
+    if not isinstance(data, dict) or not data:
+        raise AnalysisModelError("Gemini boş analiz döndü")
+
+    await stage("lqs")
+    # --- ETİKET DOĞRULAMA VE İYİLEŞTİRME ---
+    raw_pool = data.get("tags_pool_20", [])
+    if not raw_pool:
+        raw_pool = (data.get("tags_focus", []) + data.get("tags_long_tail", []) + data.get("tags_aesthetic", []))
+    
+    final_tags = validate_and_fix_tags(raw_pool, product_title)
+    
+    # --- LQS MOTORU ---
+    raw_visual = data.get("visual_data", {})
+    if not isinstance(raw_visual, dict): raw_visual = {}
+    
+    lqs_input = LQSInput(
+        image_url=image_url,
+        title=data.get("suggested_title", product_title),
+        tags=final_tags,
+        visual_data=raw_visual,
+        image_count=1,
+        has_video=False
+    )
+    
+    lqs_result = calculate_lqs_3_1(lqs_input)
+    final_lqs = lqs_result["total_score"]
+    lqs_breakdown = lqs_result["breakdown"]
+    lqs_reason_text = lqs_reason(lqs_breakdown)
+
+    await stage("pricing")
+    # --- PRICING ENGINE ---
+    comp_price = 0.0
+    if db_listing.listing_type == "competitor":
+        comp_price = float(data.get("price_min", 0))
+
+    gemini_max_valuation = float(data.get("price_max_valuation", 100.0))
+    if gemini_max_valuation == 0: gemini_max_valuation = 100.0
+    
+    pricing_engine = PricingEngine(
+        lqs_score=final_lqs,
+        competitor_price=comp_price,
+        category_min=5.0, 
+        category_max=gemini_max_valuation, 
+        seasonality_data=data.get("monthly_popularity", [])
+    )
+    
+    pricing_result = pricing_engine.calculate_prices()
+
+    # Veri Hazırlığı
+    t_focus = data.get("tags_focus", []) if isinstance(data.get("tags_focus"), list) else []
+    t_long = data.get("tags_long_tail", []) if isinstance(data.get("tags_long_tail"), list) else []
+    t_aes = data.get("tags_aesthetic", []) if isinstance(data.get("tags_aesthetic"), list) else []
+    t_creative = data.get("tags_creative", []) if isinstance(data.get("tags_creative"), list) else []
+    
+    str_focus = ",".join(t_focus)
+    str_long = ",".join(t_long)
+    str_aes = ",".join(t_aes)
+    str_creative = ",".join(t_creative)
+    monthly_list = data.get("monthly_popularity", []) if isinstance(data.get("monthly_popularity"), list) else []
+    monthly_str = json.dumps(monthly_list)
+    comp_analysis = data.get("competitor_analysis", "")
+
+    await stage("persist")
+    current_time = utc_now()
+    snapshot = ListingSnapshot(
+        listing_id=db_listing.id,
+        created_at=current_time,
+        lqs_score=final_lqs,
+        lqs_visual_score=lqs_breakdown['visual_impulse_score'],
+        lqs_seo_score=lqs_breakdown['seo_foundation_score'],
+        lqs_zeitgeist_score=lqs_breakdown['zeitgeist_score'],
+        lqs_reason=lqs_reason_text,
+        suggested_title=data.get("suggested_title", ""),
+        suggested_description=data.get("suggested_description", ""),
+        suggested_tags=",".join(final_tags),
+        predicted_price_min=pricing_result["min"],
+        predicted_price_max=pricing_result["max"],
+        price_reason=pricing_result["reason"],
+        trend_score=float(data.get("trend_score", 0)),
+        trend_reason=data.get("trend_reason", ""),
+        best_selling_months=", ".join(data.get("best_months", [])) if isinstance(data.get("best_months"), list) else str(data.get("best_months")),
+        monthly_popularity=monthly_str,
+        tags_focus=str_focus,
+        tags_long_tail=str_long,
+        tags_aesthetic=str_aes,
+        tags_creative=str_creative,
+        competitor_analysis=comp_analysis
+    )
+    db.add(snapshot)
+
+    if db_listing.image_url != image_url:
+        db_listing.image_url = image_url
+
+    db_listing.lqs_score = final_lqs
+    db_listing.lqs_visual_score = lqs_breakdown['visual_impulse_score']
+    db_listing.lqs_seo_score = lqs_breakdown['seo_foundation_score']
+    db_listing.lqs_zeitgeist_score = lqs_breakdown['zeitgeist_score']
+    db_listing.lqs_reason = lqs_reason_text
+    db_listing.last_analyzed_at = current_time
+    db_listing.analysis_input_hash = input_hash
+    db_listing.tags = final_tags
+    db_listing.suggested_title = data.get("suggested_title", "")
+    db_listing.suggested_description = data.get("suggested_description", "")
+    db_listing.suggested_materials = data.get("materials", "")
+    db_listing.suggested_styles = data.get("styles", "")
+    db_listing.suggested_colors = data.get("colors", "")
+    db_listing.suggested_occasions = data.get("occasions", "")
+    db_listing.suggested_recipients = data.get("recipients", "")
+    db_listing.suggested_faqs = "\n".join([f"Q: {i.get('q','')}\nA: {i.get('a','')}" for i in data.get("faqs", [])])
+    db_listing.predicted_price_min = pricing_result["min"]
+    db_listing.predicted_price_max = pricing_result["max"]
+    db_listing.price_reason = pricing_result["reason"]
+    db_listing.trend_score = float(data.get("trend_score", 0))
+    db_listing.trend_reason = data.get("trend_reason", "")
+    db_listing.best_selling_months = ", ".join(data.get("best_months", [])) if isinstance(data.get("best_months"), list) else str(data.get("best_months"))
+    # Listing kolonları native JSON; snapshot'lar metin olarak kalıyor
+    db_listing.monthly_popularity = monthly_list
+    db_listing.tags_focus = to_tag_list(t_focus)
+    db_listing.tags_long_tail = to_tag_list(t_long)
+    db_listing.tags_aesthetic = to_tag_list(t_aes)
+    db_listing.tags_creative = to_tag_list(t_creative)
+    db_listing.competitor_analysis = comp_analysis
+    db_listing.visual_data = raw_visual
+    db_listing.pricing_inputs = {"competitor_price": comp_price, "category_min": 5.0, "category_max": gemini_max_valuation}
+    db_listing.is_analyzed = True
+    new_terms, new_snapshot_terms = listing_terms(db_listing), snapshot_terms(snapshot)
+    new_tags, new_snapshot_tags = listing_tags(db_listing), snapshot_tags(snapshot)
+    
+    await db.commit()
+    await db.refresh(db_listing)
+    record_listing_terms(db_listing.id, new_terms, new_snapshot_terms)
+    record_listing_tags(db_listing.id, new_tags, new_snapshot_tags)
+
+    # --- TRAFFIC INTELLIGENCE ---
+    # GA4 gecikmesi analiz yanıtına eklenmez; traffic_data yanıt döndükten sonra arka planda güncellenir
+    schedule_traffic_refresh(db_listing.id, final_lqs)
+
+    result_obj = get_cached_result(db_listing)
+    result_obj.predicted_price_optimal = pricing_result["optimal"]
+    result_obj.image_bytes_saved = prepared.bytes_saved
+    return result_obj
+
+
+def get_cached_result(listing):
+    optimal_derived = (listing.predicted_price_min + listing.predicted_price_max) / 2
+    
+    traffic_dict = listing.traffic_data if isinstance(listing.traffic_data, dict) else {}
+
+    return AnalysisResult(
+        suggested_title=listing.suggested_title,
+        suggested_description=listing.suggested_description,
+        suggested_tags=listing.tags,
+        lqs_score=listing.lqs_score,
+        lqs_visual_score=listing.lqs_visual_score,
+        lqs_seo_score=listing.lqs_seo_score,
+        lqs_zeitgeist_score=listing.lqs_zeitgeist_score,
+        lqs_reason=listing.lqs_reason,
+        suggested_materials=listing.suggested_materials,
+        suggested_styles=listing.suggested_styles,
+        suggested_colors=listing.suggested_colors,
+        suggested_occasions=listing.suggested_occasions,
+        suggested_recipients=listing.suggested_recipients,
+        suggested_faqs=listing.suggested_faqs,
+        predicted_price_min=listing.predicted_price_min,
+        predicted_price_max=listing.predicted_price_max,
+        predicted_price_optimal=optimal_derived,
+        price_reason=listing.price_reason,
+        trend_score=listing.trend_score,
+        trend_reason=listing.trend_reason,
+        best_selling_months=listing.best_selling_months,
+        monthly_popularity=json.dumps(listing.monthly_popularity or []),
+        tags_focus=",".join(to_tag_list(listing.tags_focus)),
+        tags_long_tail=",".join(to_tag_list(listing.tags_long_tail)),
+        tags_aesthetic=",".join(to_tag_list(listing.tags_aesthetic)),
+        tags_creative=",".join(to_tag_list(listing.tags_creative)),
+        competitor_analysis=listing.competitor_analysis,
+        traffic_data=traffic_dict,
+        last_analyzed_at=listing.last_analyzed_at
+    )
@@ -0,0 +1,72 @@
+import asyncio
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Callable, Awaitable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import async_session_maker
+
+
+class BackgroundRebuild:
+    """
+    Süreç içi bellek yapıları (öneri indeksi, etiket grafiği) için ortak yaşam döngüsü:
+    arka planda periyodik tam rebuild ve kurulum durumu.
+
+    Her süreç (gunicorn worker'ı) kendi kopyasını tutar; başka süreçteki değişiklikler periyodik rebuild
+    ile gelir. Yapı hazır değilken veya kurulurken gelen artımlı güncellemeler atlanır (skipped_updates);
+    sonraki rebuild bunları toplar.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = {"ready": False, "building": False, "last_build_at": None, "last_build_seconds": None, "skipped_updates": 0}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state["ready"]
+
+    @contextmanager
+    def building(self):
+        """Tam kurulumu sarar; başarıyla biterse yapı hazır sayılır ve süre kaydedilir."""
+        start = time.perf_counter()
+        self.state["building"] = True
+        try:
+            yield
+        finally:
+            self.state["building"] = False
+        self.state["ready"] = True
+        self.state["last_build_at"] = time.time()
+        self.state["last_build_seconds"] = round(time.perf_counter() - start, 3)
+
+    def accepts_updates(self) -> bool:
+        """Artımlı güncelleme uygulanabilir mi? Uygulanamıyorsa atlanan güncelleme sayılır."""
+        if not self.state["ready"] or self.state["building"]:
+            self.state["skipped_updates"] += 1
+            return False
+        return True
+
+    async def _loop(self, build: Callable[[AsyncSession], Awaitable[Any]], interval: float):
+        while True:
+            try:
+                async with async_session_maker() as db:
+                    await build(db)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ {self.name} kurulamadı: {e}")
+            await asyncio.sleep(interval)
+
+    def start(self, build: Callable[[AsyncSession], Awaitable[Any]], interval: float):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(build, interval))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.state)
@@ -1,29 +1,158 @@
+import asyncio
+import random
+from typing import Optional, Dict, Any, List, Callable, Awaitable
+
 import httpx
+
 from app.core.config import settings
+from app.core.http_pool import HTTPClientPool, get_http_pool
+from app.core.rate_limit import TokenBucket
+
+PAGE_SIZE = 100  # Etsy v3 limit üst sınırı
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Etsy kotası uygulama anahtarı başına; tüm istemciler aynı bucket'ı paylaşır
+_etsy_bucket = TokenBucket(settings.ETSY_RATE_PER_SECOND, settings.ETSY_RATE_BURST)
+
+
+class EtsyAPIError(Exception):
+    def __init__(self, status_code: int, detail: str = ""):
+        super().__init__(f"Etsy API {status_code}: {detail}")
+        self.status_code = status_code
+        self.detail = detail
+
+
+def get_etsy_rate_limit_stats() -> Dict[str, Any]:
+    return _etsy_bucket.get_stats()
+
 
 class EtsyClient:
-    def __init__(self, access_token: str = None):
-        self.base_url = "https://api.etsy.com/v3"
+    def __init__(self, access_token: str = None, http: Optional[HTTPClientPool] = None,
+                 base_url: str = "https://api.etsy.com/v3", bucket: Optional[TokenBucket] = None):
+        self.base_url = base_url
         self.headers = {"x-api-key": settings.ETSY_KEY_STRING}
         if access_token:
             self.headers["Authorization"] = f"Bearer {access_token}"
+        # Paylaşılan bağlantı havuzu (keep-alive); verilmezse uygulama havuzu kullanılır
+        self.http = http or get_http_pool()
+        self.bucket = bucket or _etsy_bucket
+
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        # Üstel backoff + jitter: aynı anda düşen istekler aynı anda tekrar denemesin
+        return settings.ETSY_RETRY_BASE_SECONDS * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+    def _adapt_rate(self, response: httpx.Response):
+        # Etsy saniyelik limiti başlıkta bildirir; config'ten düşükse ona uyulur
+        limit = response.headers.get("x-limit-per-second")
+        if limit and limit.isdigit() and 0 < int(limit) < self.bucket.rate:
+            self.bucket.set_rate(int(limit))
+
+    async def _get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Token bucket ile sınırlanmış GET; 429/5xx ve bağlantı hatalarında jitter'lı tekrar dener."""
+        url = f"{self.base_url}{path}"
+        for attempt in range(settings.ETSY_MAX_RETRIES + 1):
+            await self.bucket.acquire()
+            try:
+                response = await self.http.get(url, params=params, headers=self.headers, timeout=settings.ETSY_TIMEOUT_SECONDS)
+            except httpx.TransportError as e:
+                if attempt >= settings.ETSY_MAX_RETRIES:
+                    raise EtsyAPIError(0, str(e)) from e
+                await asyncio.sleep(self._retry_delay(attempt))
+                continue
+
+            if response.status_code == 200:
+                self._adapt_rate(response)
+                return response.json()
+            if response.status_code not in RETRY_STATUSES or attempt >= settings.ETSY_MAX_RETRIES:
+                raise EtsyAPIError(response.status_code, response.text[:200])
+
+            delay = self._retry_delay(attempt, response)
+            if response.status_code == 429:
+                # Bir sonraki acquire() (tüm eşzamanlı istekler dahil) pause bitene kadar bekler
+                self.bucket.pause(delay)
+            else:
+                await asyncio.sleep(delay)
+        raise EtsyAPIError(0, "retries exhausted")
 
     async def get_shop_details(self, shop_name: str):
         """Mağaza detaylarını getirir"""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/application/shops",
-                params={"shop_name": shop_name},
-                headers=self.headers
-            )
-            return response.json()
-
-    async def get_active_listings(self, shop_id: int, limit: int = 100):
-        """Aktif ürünleri getirir"""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/application/shops/{shop_id}/listings/active",
-                params={"limit": limit},
-                headers=self.headers
-            )
-            return response.json()
\ No newline at end of file
+        return await self._get("/application/shops", params={"shop_name": shop_name})
+
+    async def find_shop(self, shop_name: str) -> Optional[Dict[str, Any]]:
+        """Mağaza adına göre tam eşleşen mağaza kaydı (yoksa None)."""
+        results = (await self.get_shop_details(shop_name)).get("results", [])
+        for shop in results:
+            if str(shop.get("shop_name", "")).lower() == shop_name.lower():
+                return shop
+        return results[0] if results else None
+
+    async def get_active_listings(self, shop_id: int, limit: int = PAGE_SIZE, offset: int = 0, **params):
+        """Aktif ürünlerin bir sayfası ({"count", "results"})."""
+        return await self._get(
+            f"/application/shops/{shop_id}/listings/active",
+            params={"limit": limit, "offset": offset, "includes": "Images", **params},
+        )
+
+    async def get_all_active_listings(self, shop_id: int,
+                                      on_page: Optional[Callable[[List[Dict[str, Any]], int], Awaitable[None]]] = None,
+                                      page_size: int = PAGE_SIZE,
+                                      concurrency: Optional[int] = None,
+                                      collect: bool = True) -> List[Dict[str, Any]]:
+        """
+        Tüm aktif ürünler: ilk sayfadaki toplam sayıdan kalan sayfalar hesaplanır ve eşzamanlı çekilir.
+        Hız token bucket ile sınırlıdır. on_page(sayfa, toplam) her sayfa geldikçe çağrılır.
+        collect=False: sayfalar biriktirilmez (büyük mağazalarda bellek sayfa başına sınırlı kalır).
+        """
+        first = await self.get_active_listings(shop_id, limit=page_size, offset=0)
+        total = int(first.get("count", 0))
+        first_page = first.get("results", [])
+        listings = list(first_page) if collect else []
+        if on_page:
+            await on_page(first_page, total)
+
+        semaphore = asyncio.Semaphore(concurrency or settings.ETSY_IMPORT_CONCURRENCY)
+
+        async def fetch_page(offset: int) -> List[Dict[str, Any]]:
+            async with semaphore:
+                return (await self.get_active_listings(shop_id, limit=page_size, offset=offset)).get("results", [])
+
+        tasks = [asyncio.create_task(fetch_page(offset)) for offset in range(page_size, total, page_size)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                page = await next_done
+                if collect:
+                    listings.extend(page)
+                if on_page:
+                    await on_page(page, total)
+        finally:
+            for task in tasks:
+                task.cancel()
+        return listings
+
+    async def get_listings_updated_since(self, shop_id: int, since: int,
+                                         on_page: Optional[Callable[[List[Dict[str, Any]], int], Awaitable[None]]] = None,
+                                         page_size: int = PAGE_SIZE) -> List[Dict[str, Any]]:
+        """
+        updated_timestamp >= since olan aktif ürünler. Sonuçlar son güncellenene göre azalan sırada
+        istenir; eski bir ürüne ulaşılan sayfada tarama durur (sayfalar bu yüzden sıralı çekilir).
+        Aynı saniyede güncellenmiş ürünler kaçmasın diye sınır dahildir; değişmeyenleri parmak izi eler.
+        """
+        listings: List[Dict[str, Any]] = []
+        offset = 0
+        while True:
+            data = await self.get_active_listings(shop_id, limit=page_size, offset=offset,
+                                                  sort_on="updated", sort_order="desc")
+            results = data.get("results", [])
+            fresh = [item for item in results if int(item.get("updated_timestamp") or 0) >= since]
+            listings.extend(fresh)
+            if on_page and fresh:
+                await on_page(fresh, int(data.get("count", 0)))
+            if len(fresh) < len(results) or len(results) < page_size:
+                return listings
+            offset += page_size
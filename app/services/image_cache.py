@@ -0,0 +1,336 @@
+import asyncio
+import base64
+import hashlib
+import json
+import mimetypes
+import os
+import time
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import urlsplit
+
+from app.core.config import settings
+from app.core.http_pool import HTTPClientPool
+
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "0.0.0.0"}
+
+
+class ImageDownloadError(Exception):
+    pass
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+class CachedImage:
+    """
+    Önbellekteki bir görsel: içerik hash'i ile adreslenir.
+    content verilirse (önbelleğe sığmayacak kadar büyük görsel) diske yazılmaz, bellekten okunur.
+    """
+
+    def __init__(self, cache: "ImageCache", content_hash: str, mime_type: str, source: str,
+                 content: Optional[bytes] = None):
+        self.cache = cache
+        self.content_hash = content_hash
+        self.mime_type = mime_type
+        self.source = source  # "hit" | "revalidated" | "download" | "local"
+        self.content = content
+
+    @property
+    def size(self) -> int:
+        if self.content is not None:
+            return len(self.content)
+        return self.cache.blob_size(self.content_hash)
+
+    async def read_bytes(self) -> bytes:
+        if self.content is not None:
+            return self.content
+        return await asyncio.to_thread(self.cache.read_blob, self.content_hash)
+
+    async def base64(self) -> str:
+        """Base64 metni bir kere hesaplanır ve blob'un yanında saklanır (boyutu LRU sınırına dahildir)."""
+        if self.content is not None:
+            return await asyncio.to_thread(lambda: base64.b64encode(self.content).decode("utf-8"))
+        encoded, written = await asyncio.to_thread(self.cache.read_base64, self.content_hash)
+        if written:
+            await self.cache.record_sidecar(self.content_hash, written)
+        return encoded
+
+
+class ImageCache:
+    """
+    Diskte, içerik adresli (sha256) görsel önbelleği.
+
+    - URL -> (hash, ETag, Last-Modified) eşlemesi index.json'da tutulur.
+    - Aynı içerik farklı URL'lerden gelse bile tek blob olarak saklanır.
+    - Toplam boyut max_bytes'ı aşarsa en az kullanılan blob'lar silinir (LRU).
+    - Süresi dolan kayıtlar koşullu GET (If-None-Match / If-Modified-Since) ile doğrulanır.
+
+    Not: Her worker kendi index kopyasını tutar; çakışmada en kötü ihtimalle önbellek ıskalanır.
+    """
+
+    def __init__(self, root: str, max_bytes: int, fresh_seconds: int, uploads_dir: str = "uploads"):
+        self.root = root
+        self.blob_dir = os.path.join(root, "blobs")
+        self.index_path = os.path.join(root, "index.json")
+        self.max_bytes = max_bytes
+        self.fresh_seconds = fresh_seconds
+        self.uploads_dir = uploads_dir
+        self._lock = asyncio.Lock()
+        self.stats = {"hits": 0, "revalidated": 0, "downloads": 0, "local_reads": 0, "evictions": 0, "oversized": 0}
+
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self._urls: Dict[str, Dict[str, Any]] = {}
+        self._blobs: Dict[str, Dict[str, Any]] = {}
+        self._derived: Dict[str, Dict[str, Any]] = {}
+        self._load_index()
+
+    # --- Index ---
+    def _load_index(self):
+        try:
+            with open(self.index_path, "r") as f:
+                index = json.load(f)
+            self._urls = index.get("urls", {})
+            self._blobs = index.get("blobs", {})
+            self._derived = index.get("derived", {})
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._urls, self._blobs, self._derived = {}, {}, {}
+        # Diskte olmayan blob'ları unut; base64 kopyalarının boyutu diskten alınır
+        self._blobs = {h: meta for h, meta in self._blobs.items() if os.path.exists(self._blob_path(h))}
+        for content_hash, meta in self._blobs.items():
+            b64_path = self._b64_path(content_hash)
+            meta["b64_size"] = os.path.getsize(b64_path) if os.path.exists(b64_path) else 0
+        self._drop_dangling_refs()
+
+    def _drop_dangling_refs(self):
+        self._urls = {u: meta for u, meta in self._urls.items() if meta.get("hash") in self._blobs}
+        self._derived = {k: meta for k, meta in self._derived.items() if meta.get("hash") in self._blobs}
+
+    def _save_index(self):
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"urls": self._urls, "blobs": self._blobs, "derived": self._derived}, f)
+        os.replace(tmp_path, self.index_path)
+
+    # --- Blob erişimi ---
+    def _blob_path(self, content_hash: str) -> str:
+        return os.path.join(self.blob_dir, f"{content_hash}.bin")
+
+    def _b64_path(self, content_hash: str) -> str:
+        return os.path.join(self.blob_dir, f"{content_hash}.b64")
+
+    @staticmethod
+    def _disk_bytes(meta: Dict[str, Any]) -> int:
+        # Blob + (varsa) base64 kopyası
+        return meta["size"] + meta.get("b64_size", 0)
+
+    def _total_bytes(self) -> int:
+        return sum(self._disk_bytes(meta) for meta in self._blobs.values())
+
+    def blob_size(self, content_hash: str) -> int:
+        return self._blobs.get(content_hash, {}).get("size", 0)
+
+    def read_blob(self, content_hash: str) -> bytes:
+        with open(self._blob_path(content_hash), "rb") as f:
+            return f.read()
+
+    def read_base64(self, content_hash: str) -> Tuple[str, int]:
+        """(base64 metni, yeni yazılan kopyanın boyutu; zaten varsa 0)."""
+        b64_path = self._b64_path(content_hash)
+        try:
+            with open(b64_path, "r") as f:
+                return f.read(), 0
+        except FileNotFoundError:
+            encoded = base64.b64encode(self.read_blob(content_hash)).decode("utf-8")
+            with open(b64_path, "w") as f:
+                f.write(encoded)
+            return encoded, len(encoded)
+
+    async def record_sidecar(self, content_hash: str, size: int):
+        """Yeni yazılan base64 kopyasını blob'un boyutuna ekler; sınır aşılırsa başka blob'lar silinir."""
+        async with self._lock:
+            meta = self._blobs.get(content_hash)
+            if meta is None:
+                # Blob bu arada silinmiş: sahipsiz kopya bırakılmaz
+                await asyncio.to_thread(self._remove_files, content_hash)
+                return
+            meta["b64_size"] = size
+            self._evict_if_needed(protected=content_hash)
+            await asyncio.to_thread(self._save_index)
+
+    def _write_blob(self, content: bytes) -> str:
+        content_hash = hashlib.sha256(content).hexdigest()
+        path = self._blob_path(content_hash)
+        if not os.path.exists(path):
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        return content_hash
+
+    def fits(self, size: int) -> bool:
+        """max_bytes'tan büyük içerik önbelleğe alınmaz (yazıldığı anda silinirdi); bellekten sunulur."""
+        return size <= self.max_bytes
+
+    def _touch(self, content_hash: str, size: int, mime_type: str):
+        previous = self._blobs.get(content_hash, {})
+        self._blobs[content_hash] = {"size": size, "b64_size": previous.get("b64_size", 0),
+                                     "mime_type": mime_type, "last_access": time.time()}
+
+    def _remove_files(self, content_hash: str):
+        for path in (self._blob_path(content_hash), self._b64_path(content_hash)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _evict_if_needed(self, protected: Optional[str] = None):
+        """protected: az önce yazılan/dokunulan blob; döndürülen CachedImage onu okuyacağı için silinmez."""
+        total = self._total_bytes()
+        if total <= self.max_bytes:
+            return
+        for content_hash, meta in sorted(self._blobs.items(), key=lambda item: item[1]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            if content_hash == protected:
+                continue
+            self._remove_files(content_hash)
+            total -= self._disk_bytes(meta)
+            del self._blobs[content_hash]
+            self.stats["evictions"] += 1
+        self._drop_dangling_refs()
+
+    # --- Ana giriş noktası ---
+    def _local_upload_path(self, url: str) -> Optional[str]:
+        """localhost:8000/uploads/... adresleri HTTP yerine doğrudan diskten okunur."""
+        parts = urlsplit(url)
+        if parts.hostname not in LOCAL_HOSTS or not parts.path.startswith("/uploads/"):
+            return None
+        path = os.path.join(self.uploads_dir, os.path.basename(parts.path))
+        return path if os.path.isfile(path) else None
+
+    async def fetch(self, url: str, http: HTTPClientPool) -> CachedImage:
+        local_path = self._local_upload_path(url)
+        if local_path:
+            return await self._fetch_local(url, local_path)
+
+        async with self._lock:
+            entry = self._urls.get(url)
+            if entry and entry["hash"] not in self._blobs:
+                entry = None
+        if entry and time.time() - entry["validated_at"] < self.fresh_seconds:
+            return await self._hit(url, entry, "hit")
+
+        headers = {}
+        if entry:
+            if entry.get("etag"): headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"): headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            resp = await http.get(url, headers=headers, timeout=10.0)
+        except Exception as e:
+            raise ImageDownloadError(f"Resim indirilemedi: {e}")
+
+        if resp.status_code == 304 and entry:
+            return await self._hit(url, entry, "revalidated")
+        if resp.status_code != 200:
+            raise ImageDownloadError("Resim indirilemedi.")
+
+        mime_type = resp.headers.get("content-type", "image/jpeg")
+        content = resp.content
+        self.stats["downloads"] += 1
+        if not self.fits(len(content)):
+            self.stats["oversized"] += 1
+            return CachedImage(self, hashlib.sha256(content).hexdigest(), mime_type, "download", content=content)
+
+        content_hash = await asyncio.to_thread(self._write_blob, content)
+        async with self._lock:
+            self._touch(content_hash, len(content), mime_type)
+            self._urls[url] = {
+                "hash": content_hash,
+                "etag": resp.headers.get("etag"),
+                "last_modified": resp.headers.get("last-modified"),
+                "mime_type": mime_type,
+                "validated_at": time.time(),
+            }
+            self._evict_if_needed(protected=content_hash)
+            await asyncio.to_thread(self._save_index)
+        return CachedImage(self, content_hash, mime_type, "download")
+
+    async def _hit(self, url: str, entry: Dict[str, Any], source: str) -> CachedImage:
+        async with self._lock:
+            if source == "revalidated":
+                entry["validated_at"] = time.time()
+                self._urls[url] = entry
+                await asyncio.to_thread(self._save_index)
+            meta = self._blobs.get(entry["hash"])
+            if meta:
+                meta["last_access"] = time.time()
+        self.stats["hits" if source == "hit" else "revalidated"] += 1
+        return CachedImage(self, entry["hash"], entry["mime_type"], source)
+
+    async def _fetch_local(self, url: str, path: str) -> CachedImage:
+        content = await asyncio.to_thread(_read_file, path)
+        mime_type = mimetypes.guess_type(path)[0] or "image/jpeg"
+        self.stats["local_reads"] += 1
+        if not self.fits(len(content)):
+            self.stats["oversized"] += 1
+            return CachedImage(self, hashlib.sha256(content).hexdigest(), mime_type, "local", content=content)
+
+        content_hash = await asyncio.to_thread(self._write_blob, content)
+        async with self._lock:
+            is_new = content_hash not in self._blobs
+            self._touch(content_hash, len(content), mime_type)
+            if is_new:
+                self._evict_if_needed(protected=content_hash)
+                await asyncio.to_thread(self._save_index)
+        return CachedImage(self, content_hash, mime_type, "local")
+
+    # --- Türetilmiş görseller (küçültülmüş kopyalar vb.) ---
+    async def get_derived(self, key: str) -> Optional[CachedImage]:
+        async with self._lock:
+            entry = self._derived.get(key)
+            meta = self._blobs.get(entry["hash"]) if entry else None
+            if not meta:
+                return None
+            meta["last_access"] = time.time()
+        return CachedImage(self, entry["hash"], entry["mime_type"], "hit")
+
+    async def put_derived(self, key: str, content: bytes, mime_type: str) -> CachedImage:
+        """Kaynak hash + işlem parametreleri anahtarıyla türetilmiş içeriği saklar (LRU kapsamında)."""
+        if not self.fits(len(content)):
+            self.stats["oversized"] += 1
+            return CachedImage(self, hashlib.sha256(content).hexdigest(), mime_type, "download", content=content)
+
+        content_hash = await asyncio.to_thread(self._write_blob, content)
+        async with self._lock:
+            self._touch(content_hash, len(content), mime_type)
+            self._derived[key] = {"hash": content_hash, "mime_type": mime_type}
+            self._evict_if_needed(protected=content_hash)
+            await asyncio.to_thread(self._save_index)
+        return CachedImage(self, content_hash, mime_type, "download")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "urls": len(self._urls),
+            "blobs": len(self._blobs),
+            "derived": len(self._derived),
+            "bytes": self._total_bytes(),
+            "max_bytes": self.max_bytes,
+        }
+
+
+_cache: Optional[ImageCache] = None
+
+
+def get_image_cache() -> ImageCache:
+    global _cache
+    if _cache is None:
+        _cache = ImageCache(
+            root=settings.IMAGE_CACHE_DIR,
+            max_bytes=settings.IMAGE_CACHE_MAX_BYTES,
+            fresh_seconds=settings.IMAGE_CACHE_FRESH_SECONDS,
+        )
+    return _cache
@@ -0,0 +1,103 @@
+import asyncio
+import io
+from typing import Dict, Any, Optional
+
+from app.core.config import settings
+from app.services.image_cache import CachedImage, get_image_cache
+
+# Pillow opsiyonel: yoksa görseller olduğu gibi gönderilir
+try:
+    from PIL import Image, ImageOps
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+FORMAT_MIME_TYPES = {"JPEG": "image/jpeg", "WEBP": "image/webp"}
+
+
+class PreparedImage:
+    """Modele gönderilmeye hazır görsel + tasarruf bilgisi."""
+
+    def __init__(self, image: CachedImage, original_size: int):
+        self.image = image
+        self.mime_type = image.mime_type
+        self.content_hash = image.content_hash
+        self.original_size = original_size
+        self.size = image.size
+
+    @property
+    def bytes_saved(self) -> int:
+        return max(0, self.original_size - self.size)
+
+    async def base64(self) -> str:
+        return await self.image.base64()
+
+
+_stats: Dict[str, int] = {"processed": 0, "derived_hits": 0, "bytes_in": 0, "bytes_out": 0, "bytes_saved": 0}
+
+
+def _downscale(content: bytes, max_edge: int, output_format: str, quality: int) -> Optional[bytes]:
+    """
+    En uzun kenarı max_edge'e indirir ve yeniden kodlar. Çözülemeyen/kodlanamayan görselde None döner
+    (çağıran orijinali kullanır). Pillow tembel çözdüğü için bozuk dosya ancak thumbnail/save sırasında patlar.
+    """
+    try:
+        img = Image.open(io.BytesIO(content))
+        img = ImageOps.exif_transpose(img)
+
+        if output_format == "JPEG" and img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        elif output_format == "WEBP" and img.mode not in ("RGB", "RGBA"):
+            # P/CMYK/LA vb. doğrudan WEBP'ye yazılamayabilir
+            has_alpha = img.mode in ("LA", "PA") or "transparency" in img.info
+            img = img.convert("RGBA" if has_alpha else "RGB")
+        img.thumbnail((max_edge, max_edge), Image.LANCZOS)
+
+        buffer = io.BytesIO()
+        img.save(buffer, format=output_format, quality=quality, optimize=True)
+        return buffer.getvalue()
+    except Exception as e:
+        print(f"⚠️ Görsel küçültülemedi, orijinali kullanılacak: {type(e).__name__}: {e}")
+        return None
+
+
+async def prepare_for_model(image: CachedImage,
+                            max_edge: Optional[int] = None,
+                            output_format: Optional[str] = None,
+                            quality: Optional[int] = None) -> PreparedImage:
+    """
+    Vision modeline gitmeden önce görseli küçültür ve yeniden kodlar.
+    Sonuç kaynak içerik hash'i + parametrelerle önbelleğe alınır; küçülmüyorsa orijinal kullanılır.
+    """
+    max_edge = max_edge or settings.IMAGE_MAX_EDGE
+    output_format = (output_format or settings.IMAGE_OUTPUT_FORMAT).upper()
+    quality = quality or settings.IMAGE_QUALITY
+    original_size = image.size
+
+    if not PIL_AVAILABLE or output_format not in FORMAT_MIME_TYPES:
+        return PreparedImage(image, original_size)
+
+    cache = get_image_cache()
+    key = f"{image.content_hash}:{max_edge}:{output_format}:{quality}"
+    derived = await cache.get_derived(key)
+    if derived:
+        _stats["derived_hits"] += 1
+    else:
+        content = await image.read_bytes()
+        encoded = await asyncio.to_thread(_downscale, content, max_edge, output_format, quality)
+        if encoded is None or len(encoded) >= len(content):
+            # Zaten küçük/optimize görsel: orijinali türetilmiş kopya olarak işaretle
+            derived = await cache.put_derived(key, content, image.mime_type)
+        else:
+            derived = await cache.put_derived(key, encoded, FORMAT_MIME_TYPES[output_format])
+
+    prepared = PreparedImage(derived, original_size)
+    _stats["processed"] += 1
+    _stats["bytes_in"] += original_size
+    _stats["bytes_out"] += prepared.size
+    _stats["bytes_saved"] += prepared.bytes_saved
+    return prepared
+
+
+def get_processing_stats() -> Dict[str, Any]:
+    return {**_stats, "pillow_available": PIL_AVAILABLE}
@@ -0,0 +1,257 @@
+import asyncio
+import os
+import random
+import traceback
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy import select, update, or_
+
+from app.core.config import settings
+from app.core.http_pool import get_http_pool
+from app.db.session import async_session_maker
+from app.models import AnalysisJob, Listing
+from app.services.analysis_pipeline import AnalysisModelError, run_analysis_pipeline
+
+TERMINAL_STATUSES = ("succeeded", "failed")
+
+
+class PermanentJobError(Exception):
+    """Tekrar denemenin anlamı olmayan hatalar (ör. ürün silinmiş)."""
+    pass
+
+
+def is_permanent_error(error: Exception) -> bool:
+    # Gemini 429/5xx ve bozuk/boş yanıtlar backoff ile tekrar denenir; diğer 4xx (anahtar, istek) denenmez
+    if isinstance(error, AnalysisModelError):
+        return not error.retryable
+    return isinstance(error, PermanentJobError)
+
+
+def retry_delay(attempts: int) -> float:
+    """Üstel backoff + jitter: base * 2^(deneme-1), üst sınırlı; aynı anda düşen işler dağılsın."""
+    delay = min(settings.ANALYSIS_JOB_RETRY_MAX_SECONDS, settings.ANALYSIS_JOB_RETRY_BASE_SECONDS * (2 ** max(0, attempts - 1)))
+    return delay * random.uniform(0.5, 1.0)
+
+
+# --- Kuyruk işlemleri ---
+async def enqueue_job(listing_id: str, image_url: str, product_title: str, force_refresh: bool = False) -> AnalysisJob:
+    now = datetime.now()
+    async with async_session_maker() as db:
+        job = AnalysisJob(
+            id=str(uuid.uuid4()),
+            listing_id=listing_id,
+            image_url=image_url,
+            product_title=product_title,
+            force_refresh=force_refresh,
+            status="queued",
+            stage="queued",
+            attempts=0,
+            max_attempts=settings.ANALYSIS_JOB_MAX_ATTEMPTS,
+            run_after=now,
+            created_at=now,
+            updated_at=now,
+        )
+        db.add(job)
+        await db.commit()
+    if _wakeup: _wakeup.set()
+    return job
+
+
+async def claim_next_job(worker_id: str) -> Optional[AnalysisJob]:
+    """
+    Sıradaki işi iyimser kilitle alır: UPDATE ... WHERE status='queued' yalnızca bir worker'da
+    1 satır etkiler. Broker veya SELECT ... FOR UPDATE gerektirmez (SQLite ve Postgres'te çalışır).
+    """
+    now = datetime.now()
+    async with async_session_maker() as db:
+        candidates = (await db.execute(
+            select(AnalysisJob.id)
+            .where(AnalysisJob.status == "queued", AnalysisJob.run_after <= now)
+            .order_by(AnalysisJob.run_after, AnalysisJob.created_at)
+            .limit(5)
+        )).scalars().all()
+
+        for job_id in candidates:
+            result = await db.execute(
+                update(AnalysisJob)
+                .where(AnalysisJob.id == job_id, AnalysisJob.status == "queued")
+                .values(status="running", stage="download", locked_by=worker_id, locked_at=now, updated_at=now,
+                        attempts=AnalysisJob.attempts + 1)
+            )
+            await db.commit()
+            if result.rowcount == 1:
+                return await db.get(AnalysisJob, job_id)
+    return None
+
+
+async def set_job_stage(job_id: str, worker_id: str, stage: str):
+    """Aşamayı günceller; locked_at'i yenilediği için heartbeat görevi de görür."""
+    now = datetime.now()
+    async with async_session_maker() as db:
+        await db.execute(
+            update(AnalysisJob)
+            .where(AnalysisJob.id == job_id, AnalysisJob.locked_by == worker_id)
+            .values(stage=stage, locked_at=now, updated_at=now)
+        )
+        await db.commit()
+
+
+async def complete_job(job_id: str, worker_id: str, result: Dict[str, Any]):
+    now = datetime.now()
+    async with async_session_maker() as db:
+        await db.execute(
+            update(AnalysisJob)
+            .where(AnalysisJob.id == job_id, AnalysisJob.locked_by == worker_id)
+            .values(status="succeeded", stage="done", result=result, error="", locked_by=None,
+                    locked_at=None, updated_at=now, finished_at=now)
+        )
+        await db.commit()
+
+
+async def fail_job(job: AnalysisJob, worker_id: str, error: str, permanent: bool = False):
+    """Deneme hakkı kaldıysa backoff ile kuyruğa geri koyar, yoksa failed olarak kapatır."""
+    now = datetime.now()
+    values = {"error": error, "locked_by": None, "locked_at": None, "updated_at": now}
+    if permanent or job.attempts >= job.max_attempts:
+        values.update(status="failed", finished_at=now)
+    else:
+        values.update(status="queued", stage="queued", run_after=now + timedelta(seconds=retry_delay(job.attempts)))
+    async with async_session_maker() as db:
+        await db.execute(
+            update(AnalysisJob)
+            .where(AnalysisJob.id == job.id, AnalysisJob.locked_by == worker_id)
+            .values(**values)
+        )
+        await db.commit()
+
+
+async def release_job(job_id: str, worker_id: str):
+    """Kapanışta yarım kalan işi, deneme hakkını yemeden hemen kuyruğa geri bırakır."""
+    now = datetime.now()
+    async with async_session_maker() as db:
+        await db.execute(
+            update(AnalysisJob)
+            .where(AnalysisJob.id == job_id, AnalysisJob.locked_by == worker_id, AnalysisJob.status == "running")
+            .values(status="queued", stage="queued", attempts=AnalysisJob.attempts - 1, run_after=now,
+                    locked_by=None, locked_at=None, updated_at=now)
+        )
+        await db.commit()
+
+
+async def requeue_stale_jobs() -> int:
+    """
+    ANALYSIS_JOB_STALE_SECONDS boyunca aşama güncellemesi gelmeyen 'running' işler (worker çöktü/yeniden
+    başladı) tekrar kuyruğa alınır; deneme hakkı bittiyse failed olur.
+    """
+    now = datetime.now()
+    cutoff = now - timedelta(seconds=settings.ANALYSIS_JOB_STALE_SECONDS)
+    stale = or_(AnalysisJob.locked_at == None, AnalysisJob.locked_at < cutoff)
+    async with async_session_maker() as db:
+        failed = await db.execute(
+            update(AnalysisJob)
+            .where(AnalysisJob.status == "running", stale, AnalysisJob.attempts >= AnalysisJob.max_attempts)
+            .values(status="failed", error="Worker yanıt vermedi (zaman aşımı).", locked_by=None, locked_at=None,
+                    updated_at=now, finished_at=now)
+        )
+        requeued = await db.execute(
+            update(AnalysisJob)
+            .where(AnalysisJob.status == "running", stale)
+            .values(status="queued", stage="queued", run_after=now, locked_by=None, locked_at=None, updated_at=now)
+        )
+        await db.commit()
+    if requeued.rowcount or failed.rowcount:
+        print(f"♻️ Takılı kalan işler: {requeued.rowcount} yeniden kuyrukta, {failed.rowcount} başarısız.")
+    return requeued.rowcount
+
+
+# --- İş yürütme ---
+async def process_job(job: AnalysisJob, worker_id: str):
+    async def on_stage(stage: str):
+        await set_job_stage(job.id, worker_id, stage)
+
+    async with async_session_maker() as db:
+        try:
+            if not os.getenv("GEMINI_API_KEY"):
+                raise PermanentJobError("API Key configuration error")
+            db_listing = await db.get(Listing, job.listing_id)
+            if not db_listing:
+                raise PermanentJobError("Listing not found")
+
+            result = await run_analysis_pipeline(
+                db, get_http_pool(), db_listing,
+                job.image_url or db_listing.image_url,
+                job.product_title or db_listing.title,
+                job.force_refresh,
+                on_stage=on_stage,
+            )
+            await complete_job(job.id, worker_id, result.model_dump(mode="json"))
+            _stats["succeeded"] += 1
+        except asyncio.CancelledError:
+            # Kapanış: iş kaybolmaz, kuyruğa geri bırakılır (süreç ölürse stale kontrolü devralır)
+            await asyncio.shield(release_job(job.id, worker_id))
+            raise
+        except Exception as e:
+            await db.rollback()
+            permanent = is_permanent_error(e)
+            with open("error.log", "a") as f:
+                f.write(f"{datetime.now()}: job {job.id} attempt {job.attempts}: {str(e)}\n{traceback.format_exc()}\n")
+            await fail_job(job, worker_id, str(e), permanent=permanent)
+            _stats["failed" if permanent or job.attempts >= job.max_attempts else "retried"] += 1
+
+
+async def worker_loop(worker_id: str, wakeup: asyncio.Event):
+    print(f"👷 Analiz worker'ı başladı: {worker_id}")
+    last_stale_check = 0.0
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            if loop.time() - last_stale_check > settings.ANALYSIS_JOB_STALE_SECONDS / 4:
+                last_stale_check = loop.time()
+                await requeue_stale_jobs()
+
+            job = await claim_next_job(worker_id)
+            if job is None:
+                wakeup.clear()
+                try:
+                    await asyncio.wait_for(wakeup.wait(), timeout=settings.ANALYSIS_JOB_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            _stats["claimed"] += 1
+            await process_job(job, worker_id)
+        except asyncio.CancelledError:
+            break
+        except Exception as e:
+            print(f"❌ Worker hatası ({worker_id}): {e}")
+            await asyncio.sleep(settings.ANALYSIS_JOB_POLL_SECONDS)
+
+
+# --- Yaşam döngüsü ---
+_wakeup: Optional[asyncio.Event] = None  # Aynı süreçte yeni iş gelince worker'ları hemen uyandırır
+_workers: List[asyncio.Task] = []
+_stats = {"claimed": 0, "succeeded": 0, "retried": 0, "failed": 0}
+
+
+def start_job_workers(count: Optional[int] = None) -> int:
+    global _wakeup
+    count = settings.ANALYSIS_JOB_WORKERS if count is None else count
+    _wakeup = asyncio.Event()
+    prefix = f"{os.getpid()}-{uuid.uuid4().hex[:6]}"
+    for i in range(count):
+        _workers.append(asyncio.create_task(worker_loop(f"{prefix}-{i}", _wakeup)))
+    return count
+
+
+async def stop_job_workers():
+    for task in _workers:
+        task.cancel()
+    if _workers:
+        await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+
+
+def get_job_queue_stats() -> Dict[str, Any]:
+    return {**_stats, "workers": len(_workers)}
@@ -0,0 +1,152 @@
+import hashlib
+import random
+from datetime import timedelta
+from typing import Dict, Any, Iterable
+
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.keyword_index import normalize_term
+from app.core.timeutil import as_utc, utc_now
+from app.db.upsert import bulk_upsert
+from app.models import Listing, ListingSnapshot, KeywordMetric
+from app.models.listing import to_tag_list, TAG_LIST_FIELDS
+
+METRIC_FIELDS = ("listing_count", "snapshot_count", "recent_count", "previous_count", "avg_lqs",
+                 "volume", "competition", "ctr", "trend", "computed_at")
+
+
+class _TermStats:
+    __slots__ = ("listing_count", "lqs_sum", "snapshot_count", "recent_count", "previous_count")
+
+    def __init__(self):
+        self.listing_count = 0
+        self.lqs_sum = 0.0
+        self.snapshot_count = 0
+        self.recent_count = 0
+        self.previous_count = 0
+
+
+def _unique_terms(values: Iterable[str]) -> set:
+    return {t for t in (normalize_term(v) for v in values) if t}
+
+
+def format_trend(recent: int, previous: int) -> str:
+    value = round((recent - previous) / max(previous, 1) * 100)
+    value = max(-99, min(999, value))
+    return f"{'+' if value > 0 else ''}{value}%"
+
+
+def derive_metrics(stats: _TermStats, competition: str) -> Dict[str, Any]:
+    """
+    Ham sayımlardan gösterilen metrikler (deterministik):
+    - volume: kullanım sayısıyla orantılı talep tahmini
+    - ctr: etiketi kullanan ürünlerin ortalama LQS'i (%1 - %5 aralığına ölçeklenir)
+    - trend: son pencere / önceki pencere snapshot kullanım değişimi
+    """
+    avg_lqs = stats.lqs_sum / stats.listing_count if stats.listing_count else 0.0
+    return {
+        "listing_count": stats.listing_count,
+        "snapshot_count": stats.snapshot_count,
+        "recent_count": stats.recent_count,
+        "previous_count": stats.previous_count,
+        "avg_lqs": round(avg_lqs, 1),
+        "volume": 500 + settings.KEYWORD_VOLUME_PER_USE * (stats.listing_count + stats.snapshot_count),
+        "competition": competition,
+        "ctr": round(0.01 + 0.04 * min(avg_lqs, 100.0) / 100.0, 3),
+        "trend": format_trend(stats.recent_count, stats.previous_count),
+    }
+
+
+def competition_levels(usage_counts: Dict[str, int]) -> Dict[str, str]:
+    """Kullanım sayısının yüzdelik dilimine göre: ilk %20 High, sonraki %40 Medium, kalan Low."""
+    ranked = sorted(usage_counts, key=lambda term: (-usage_counts[term], term))
+    total = len(ranked)
+    return {
+        term: "High" if i < total * 0.2 else "Medium" if i < total * 0.6 else "Low"
+        for i, term in enumerate(ranked)
+    }
+
+
+async def compute_keyword_stats(db: AsyncSession) -> Dict[str, _TermStats]:
+    stats: Dict[str, _TermStats] = {}
+
+    listing_columns = [Listing._tags.label("tags"), Listing.lqs_score] + [getattr(Listing, f) for f in TAG_LIST_FIELDS]
+    async for row in await db.stream(select(*listing_columns)):
+        terms = _unique_terms(to_tag_list(row.tags) + [t for f in TAG_LIST_FIELDS for t in to_tag_list(getattr(row, f))])
+        for term in terms:
+            item = stats.get(term) or stats.setdefault(term, _TermStats())
+            item.listing_count += 1
+            item.lqs_sum += row.lqs_score or 0.0
+
+    now = utc_now()
+    recent_cutoff = now - timedelta(days=settings.KEYWORD_TREND_WINDOW_DAYS)
+    previous_cutoff = recent_cutoff - timedelta(days=settings.KEYWORD_TREND_WINDOW_DAYS)
+    async for row in await db.stream(
+        select(ListingSnapshot.created_at, ListingSnapshot.suggested_tags).where(ListingSnapshot.suggested_tags != "")
+    ):
+        created_at = as_utc(row.created_at) if row.created_at else None
+        for term in _unique_terms(to_tag_list(row.suggested_tags)):
+            item = stats.get(term) or stats.setdefault(term, _TermStats())
+            item.snapshot_count += 1
+            if created_at and created_at >= recent_cutoff:
+                item.recent_count += 1
+            elif created_at and created_at >= previous_cutoff:
+                item.previous_count += 1
+    return stats
+
+
+async def refresh_keyword_metrics(db: AsyncSession) -> Dict[str, Any]:
+    """
+    keyword_metrics tablosunu ürün ve snapshot etiketlerinden yeniden hesaplar (toplu iş).
+    Artık hiçbir yerde geçmeyen terimler silinir.
+    """
+    started_at = utc_now()
+    stats = await compute_keyword_stats(db)
+    levels = competition_levels({term: item.listing_count + item.snapshot_count for term, item in stats.items()})
+
+    rows = []
+    for term, item in stats.items():
+        row = derive_metrics(item, levels[term])
+        row.update(term=term, computed_at=started_at)
+        rows.append(row)
+
+    written = await bulk_upsert(db, KeywordMetric, rows, index_elements=["term"], update_fields=METRIC_FIELDS)
+    removed = await db.execute(delete(KeywordMetric).where(KeywordMetric.computed_at < started_at))
+    await db.commit()
+
+    print(f"📊 Anahtar kelime metrikleri güncellendi: {written} terim, {removed.rowcount} eski terim silindi.")
+    return {"terms": written, "removed": removed.rowcount, "computed_at": started_at.isoformat()}
+
+
+def estimate_keyword_metrics(term: str) -> Dict[str, Any]:
+    """
+    Tabloda olmayan terimler (Etsy önerileri vb.) için terime göre sabit tahmini değerler:
+    aynı terim her istekte aynı sayıları verir.
+    """
+    seed = int.from_bytes(hashlib.sha256(normalize_term(term).encode()).digest()[:8], "big")
+    rng = random.Random(seed)
+    volume = rng.randint(500, 50000)
+    trend_val = rng.randint(-10, 35)
+    return {
+        "volume": volume,
+        "competition": rng.choice(["High", "Medium", "Low"]),
+        "ctr": round(rng.uniform(0.01, 0.05), 3),
+        "trend": f"{'+' if trend_val > 0 else ''}{trend_val}%",
+    }
+
+
+async def get_keyword_metrics(db: AsyncSession, terms: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """Terimlerin metrikleri (tek sorgu, PK üzerinden); tabloda olmayanlar için sabit tahmin."""
+    normalized = {term: normalize_term(term) for term in terms}
+    found = {}
+    keys = sorted(set(normalized.values()))
+    if keys:
+        rows = (await db.execute(
+            select(KeywordMetric.term, KeywordMetric.volume, KeywordMetric.competition, KeywordMetric.ctr, KeywordMetric.trend)
+            .where(KeywordMetric.term.in_(keys))
+        )).all()
+        found = {row.term: {"volume": row.volume, "competition": row.competition, "ctr": row.ctr, "trend": row.trend}
+                 for row in rows}
+    return {term: found.get(key) or estimate_keyword_metrics(key) for term, key in normalized.items()}
@@ -0,0 +1,91 @@
+import random
+from typing import Dict, Any, List
+
+from app.core.cache import TTLCache
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.config import settings
+from app.core.inflight import InFlight
+from app.core.http_pool import HTTPClientPool
+from app.services.suggestion_index import get_suggestion_index
+
+ETSY_SUGGESTIONS_URL = "https://api.etsy.com/v0.1/public/guest/search_suggestions"
+
+FALLBACK_SUFFIXES = ["ideas", "gift", "art", "decor", "print", "svg", "pattern", "handmade", "vintage", "jewelry", "design", "template"]
+FALLBACK_PREFIXES = ["custom", "personalized", "unique", "minimalist", "boho", "rustic", "modern", "cute"]
+
+SUGGESTION_LIMIT = 12
+
+# Normalize edilmiş sorgu -> Etsy öneri listesi. Boş sonuçlar daha kısa süre tutulur ki
+# upstream düzelince gerçek öneriler devreye girsin.
+_suggestion_cache = TTLCache(settings.KEYWORD_SUGGEST_CACHE_TTL_SECONDS, max_entries=settings.KEYWORD_SUGGEST_CACHE_MAX)
+# Etsy'nin eski öneri endpoint'i çoğunlukla cevap vermiyor; art arda hatalarda bir süre hiç denenmez
+_etsy_breaker = CircuitBreaker(settings.KEYWORD_SUGGEST_FAILURE_THRESHOLD, settings.KEYWORD_SUGGEST_COOLDOWN_SECONDS)
+# Aynı sorgu için eşzamanlı ıskalamalar tek upstream isteğini paylaşır
+_inflight = InFlight()
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def fallback_suggestions(query: str) -> List[str]:
+    """Upstream cevap vermediğinde üretilen varyasyonlar (eski davranış)."""
+    results = [f"{query}", f"{query} for sale", f"{query} ideas"]
+    results += [f"{query} {s}" for s in FALLBACK_SUFFIXES]
+    results += [f"{p} {query}" for p in FALLBACK_PREFIXES]
+    # Sorguya göre sabit karıştırma: aynı sorgu her seferinde aynı listeyi verir
+    random.Random(normalize_query(query)).shuffle(results)
+    return results[:SUGGESTION_LIMIT]
+
+
+async def fetch_etsy_suggestions(http: HTTPClientPool, query: str) -> List[str]:
+    """Etsy öneri endpoint'i; hata veya 200 dışı yanıtta istisna fırlatır."""
+    response = await http.get(ETSY_SUGGESTIONS_URL, params={"q": query}, timeout=settings.KEYWORD_SUGGEST_TIMEOUT_SECONDS)
+    response.raise_for_status()
+    items = response.json().get("results", [])
+    return [item.get("term") if isinstance(item, dict) else str(item) for item in items]
+
+
+async def _load_remote(http: HTTPClientPool, query: str, key: str) -> List[str]:
+    results: List[str] = []
+    if _etsy_breaker.allow():
+        try:
+            results = await fetch_etsy_suggestions(http, query)
+            _etsy_breaker.record_success()
+        except Exception as e:
+            _etsy_breaker.record_failure()
+            print(f"⚠️ Etsy öneri servisi yanıt vermedi ({type(e).__name__}). Devre: {_etsy_breaker.state}")
+
+    # Boş sonuç da (kısa süreli) önbelleğe alınır; ölü upstream her tuşta tekrar denenmez
+    _suggestion_cache.set(key, results, ttl_seconds=None if results else settings.KEYWORD_SUGGEST_FALLBACK_TTL_SECONDS)
+    return results
+
+
+async def get_remote_suggestions(http: HTTPClientPool, query: str) -> List[str]:
+    key = normalize_query(query)
+    cached = _suggestion_cache.get(key)
+    if cached is not None:
+        return list(cached)
+
+    return list(await _inflight.run(key, lambda: _load_remote(http, query, key)))
+
+
+async def get_suggestions(http: HTTPClientPool, query: str, limit: int = SUGGESTION_LIMIT) -> List[str]:
+    """
+    Önce yerel öneri indeksi (kendi ürün/snapshot etiketlerimiz, frekansa göre); yetmezse Etsy önerileriyle
+    tamamlanır. İkisi de boşsa sorgudan türetilen varyasyonlar döner.
+    """
+    local = [term for term, _ in get_suggestion_index().suggest(query, limit)]
+    if len(local) >= limit:
+        return local
+
+    merged = list(dict.fromkeys(local + [normalize_query(term) for term in await get_remote_suggestions(http, query) if term]))
+    return merged[:limit] or fallback_suggestions(query)
+
+
+def get_keyword_suggestion_stats() -> Dict[str, Any]:
+    return {
+        "cache": _suggestion_cache.get_stats(),
+        "etsy_breaker": _etsy_breaker.get_stats(),
+        "in_flight": len(_inflight),
+    }
@@ -0,0 +1,31 @@
+from typing import Iterable
+
+from sqlalchemy import select
+
+from app.models import Listing
+from app.services.suggestion_index import LISTING_DOCUMENT_COLUMNS, listing_terms, record_listing_terms
+from app.services.tag_graph import listing_tags, record_listing_tags
+
+# Ürün yazma yolları (import, senkron, düzenleme, silme) bellek içi öneri indeksini ve etiket grafiğini
+# buradan günceller
+
+
+def record_listing_documents(listing):
+    """Kaydedilmiş ürünün (ORM nesnesi veya LISTING_DOCUMENT_COLUMNS satırı) güncel terimlerini ve etiketlerini yazar."""
+    record_listing_terms(listing.id, listing_terms(listing))
+    record_listing_tags(listing.id, listing_tags(listing))
+
+
+def forget_listing_documents(listing_id: str):
+    record_listing_terms(listing_id, [])
+    record_listing_tags(listing_id, [])
+
+
+async def refresh_listing_documents(db, listing_ids: Iterable[str]):
+    """Toplu upsert sonrası: değişen ürünlerin güncel hali tek sorguda okunup indeks ve grafiğe yazılır."""
+    listing_ids = list(listing_ids)
+    if not listing_ids:
+        return
+    rows = await db.execute(select(*LISTING_DOCUMENT_COLUMNS).where(Listing.id.in_(listing_ids)))
+    for row in rows:
+        record_listing_documents(row)
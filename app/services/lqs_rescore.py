@@ -0,0 +1,78 @@
+from typing import Dict, Any
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.lqs_batch import calculate_lqs_batch
+from app.models import Listing
+from app.models.listing import to_tag_list
+
+CHUNK_SIZE = 1000
+
+SCORE_FIELDS = ("lqs_score", "lqs_visual_score", "lqs_seo_score", "lqs_zeitgeist_score", "lqs_reason")
+
+
+def lqs_reason(breakdown: Dict[str, Any]) -> str:
+    return f"Visual: {breakdown['visual_impulse_score']}/35, SEO: {breakdown['seo_foundation_score']}/35, Zeitgeist: {breakdown['zeitgeist_score']}/30"
+
+
+async def rescore_all_listings(db: AsyncSession, chunk_size: int = CHUNK_SIZE) -> Dict[str, Any]:
+    """
+    Analiz edilmiş tüm ürünlerin LQS puanını kayıtlı verilerden (başlık, etiketler, visual_data)
+    toplu olarak yeniden hesaplar. LLM çağrısı yapılmaz.
+
+    Analiz hattıyla aynı girdiler kullanılır: önerilen başlık (yoksa orijinal), image_count=1, video yok.
+    visual_data kaydı olmayan (bu kolon eklenmeden önce analiz edilmiş) ürünler atlanır.
+    """
+    scanned, rescored, changed, skipped = 0, 0, 0, 0
+    last_id = None
+
+    while True:
+        query = (
+            select(Listing.id, Listing.title, Listing.suggested_title, Listing._tags.label("tags"), Listing.visual_data,
+                   *[getattr(Listing, field) for field in SCORE_FIELDS])
+            .where(Listing.is_analyzed == True)
+            .order_by(Listing.id)
+            .limit(chunk_size)
+        )
+        if last_id is not None:
+            query = query.where(Listing.id > last_id)
+        rows = (await db.execute(query)).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        scanned += len(rows)
+
+        scorable = [row for row in rows if isinstance(row.visual_data, dict) and row.visual_data]
+        skipped += len(rows) - len(scorable)
+        rows = scorable
+        if not rows:
+            continue
+
+        results = calculate_lqs_batch(
+            titles=[row.suggested_title or row.title or "" for row in rows],
+            tag_lists=[to_tag_list(row.tags) for row in rows],
+            visual_data=[row.visual_data for row in rows],
+        )
+
+        updates = []
+        for row, result in zip(rows, results):
+            breakdown = result["breakdown"]
+            values = {
+                "lqs_score": result["total_score"],
+                "lqs_visual_score": breakdown["visual_impulse_score"],
+                "lqs_seo_score": breakdown["seo_foundation_score"],
+                "lqs_zeitgeist_score": breakdown["zeitgeist_score"],
+                "lqs_reason": lqs_reason(breakdown),
+            }
+            if any(getattr(row, field) != value for field, value in values.items()):
+                updates.append({"id": row.id, **values})
+        rescored += len(rows)
+
+        if updates:
+            # Birincil anahtara göre toplu UPDATE (executemany)
+            await db.execute(update(Listing), updates)
+            changed += len(updates)
+        await db.commit()
+
+    return {"scanned": scanned, "rescored": rescored, "changed": changed, "skipped_no_visual_data": skipped}
@@ -0,0 +1,184 @@
+import asyncio
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List, Optional, Tuple
+
+import google.generativeai as genai
+
+from app.core.config import settings
+
+
+class ModelRegistry:
+    """
+    Gemini model keşfi ve GenerativeModel önbelleği.
+
+    - genai.list_models() her istekte değil, başlangıçta ve periyodik olarak (thread'de) çalışır.
+    - Seçim tercih listesine göre yapılır; keşif hiç başarılı olmadıysa veya hata verirse
+      son başarılı liste, o da yoksa tercih listesinin ilk modeli kullanılır.
+    - GenerativeModel nesneleri model adı (+ safety ayarları) başına bir kez oluşturulur.
+    - Üretim çağrıları async istemciyle yapılır ve model başına eşzamanlılık sınırlanır.
+    """
+
+    def __init__(self, preferences: List[str], max_concurrency: int = 8):
+        self.preferences = list(preferences)
+        self._lock = threading.Lock()
+        self._configured_key: Optional[str] = None
+        self._available: List[str] = []
+        self._selected: Optional[str] = None
+        self._models: Dict[Tuple, Any] = {}
+        self._limits: Dict[str, asyncio.Semaphore] = {}
+        self._in_flight: Dict[str, int] = {}
+        self.max_concurrency = max_concurrency
+        self.stats = {"refreshes": 0, "refresh_errors": 0, "last_refresh_at": None, "last_error": None, "models_created": 0}
+
+    # --- Yapılandırma ---
+    def _api_key(self) -> Optional[str]:
+        return os.getenv("GEMINI_API_KEY")
+
+    def _ensure_configured(self) -> bool:
+        api_key = self._api_key()
+        if not api_key:
+            return False
+        if api_key != self._configured_key:
+            genai.configure(api_key=api_key)
+            self._configured_key = api_key
+            with self._lock:
+                # Anahtar değiştiyse eski istemcilerle oluşturulan modeller geçersiz
+                self._models.clear()
+        return True
+
+    # --- Keşif ---
+    def choose(self, available: List[str]) -> Optional[str]:
+        """Tercih sırasına göre ilk eşleşen model; hiçbiri yoksa listedeki ilk model."""
+        for pref in self.preferences:
+            for model_name in available:
+                if pref in model_name:
+                    return model_name
+        return available[0] if available else None
+
+    def refresh(self) -> bool:
+        """Bloklayan ağ çağrısı; event loop'ta değil thread'de çalıştırılmalı."""
+        if not self._ensure_configured():
+            return False
+        try:
+            available = [m.name for m in genai.list_models() if 'generateContent' in m.supported_generation_methods]
+        except Exception as e:
+            self.stats["refresh_errors"] += 1
+            self.stats["last_error"] = str(e)
+            print(f"⚠️ Model listeleme hatası: {e}. Önbellekteki seçim kullanılmaya devam ediliyor.")
+            return False
+
+        selected = self.choose(available)
+        with self._lock:
+            self._available = available
+            if selected:
+                self._selected = selected
+        self.stats["refreshes"] += 1
+        self.stats["last_refresh_at"] = time.time()
+        self.stats["last_error"] = None
+        print(f"📋 Mevcut Modeller: {len(available)} adet. ✅ Seçilen Model: {self._selected}")
+        return True
+
+    async def refresh_async(self) -> bool:
+        return await asyncio.to_thread(self.refresh)
+
+    # --- Seçim ---
+    @property
+    def selected_name(self) -> str:
+        return self._selected or self.preferences[0]
+
+    def get_model(self, model_name: Optional[str] = None, **model_kwargs):
+        """
+        Önbellekten GenerativeModel döner (ağ çağrısı yapmaz). API anahtarı yoksa None.
+        model_kwargs (ör. safety_settings) önbellek anahtarına dahildir.
+        """
+        if not self._ensure_configured():
+            print("🛑 API Key bulunamadı!")
+            return None
+
+        name = model_name or self.selected_name
+        key = (name, repr(sorted(model_kwargs.items(), key=lambda item: item[0])))
+        with self._lock:
+            model = self._models.get(key)
+            if model is None:
+                model = genai.GenerativeModel(name, **model_kwargs)
+                self._models[key] = model
+                self.stats["models_created"] += 1
+        return model
+
+    # --- Üretim ---
+    def limit(self, model_name: str) -> asyncio.Semaphore:
+        """Model başına eşzamanlı istek sınırı (GEMINI_MAX_CONCURRENCY_PER_MODEL)."""
+        semaphore = self._limits.get(model_name)
+        if semaphore is None:
+            semaphore = self._limits[model_name] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    @asynccontextmanager
+    async def slot(self, model):
+        """Akışlı çağrılar için: slot, akış bitene kadar tutulur."""
+        name = getattr(model, "model_name", "default")
+        async with self.limit(name):
+            self._in_flight[name] = self._in_flight.get(name, 0) + 1
+            try:
+                yield
+            finally:
+                self._in_flight[name] -= 1
+
+    async def generate(self, model, *args, **kwargs):
+        """
+        generate_content'in event loop'u bloklamayan hali: generate_content_async ile çalışır,
+        aynı model için en fazla max_concurrency istek aynı anda upstream'e gider.
+        """
+        async with self.slot(model):
+            return await model.generate_content_async(*args, **kwargs)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": dict(self._in_flight),
+            "selected": self.selected_name,
+            "discovered": self._selected is not None,
+            "available": len(self._available),
+            "cached_models": len(self._models),
+        }
+
+
+_registry: Optional[ModelRegistry] = None
+_refresh_task: Optional[asyncio.Task] = None
+
+
+def get_model_registry() -> ModelRegistry:
+    global _registry
+    if _registry is None:
+        _registry = ModelRegistry(settings.GEMINI_MODEL_PREFERENCES, settings.GEMINI_MAX_CONCURRENCY_PER_MODEL)
+    return _registry
+
+
+async def _refresh_loop(registry: ModelRegistry, interval: float):
+    while True:
+        await registry.refresh_async()
+        await asyncio.sleep(interval)
+
+
+def start_model_registry() -> ModelRegistry:
+    """
+    lifespan başında çağrılır. İlk keşif arka planda yapılır; başlangıcı ağ gecikmesi bekletmez,
+    o sırada gelen istekler tercih listesindeki modeli kullanır.
+    """
+    global _refresh_task
+    registry = get_model_registry()
+    if _refresh_task is None:
+        _refresh_task = asyncio.create_task(_refresh_loop(registry, settings.GEMINI_MODEL_REFRESH_SECONDS))
+    return registry
+
+
+async def stop_model_registry():
+    global _refresh_task
+    if _refresh_task is not None:
+        _refresh_task.cancel()
+        await asyncio.gather(_refresh_task, return_exceptions=True)
+        _refresh_task = None
@@ -0,0 +1,95 @@
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.pricing_batch import calculate_prices_batch
+from app.models import Listing
+
+CHUNK_SIZE = 1000
+
+DEFAULT_CATEGORY_MIN = 5.0
+DEFAULT_CATEGORY_MAX = 100.0
+
+
+def _pricing_inputs(row) -> Dict[str, float]:
+    """
+    Analiz sırasında kaydedilen fiyat girdileri.
+    Bu kolon eklenmeden önce analiz edilen ürünlerde rakip fiyatı olarak ürünün kendi fiyatı kullanılır.
+    """
+    inputs = row.pricing_inputs if isinstance(row.pricing_inputs, dict) else {}
+    if "competitor_price" in inputs:
+        competitor_price = float(inputs["competitor_price"] or 0.0)
+    else:
+        competitor_price = float(row.price or 0.0) if row.listing_type == "competitor" else 0.0
+    return {
+        "competitor_price": competitor_price,
+        "category_min": float(inputs.get("category_min", DEFAULT_CATEGORY_MIN)),
+        "category_max": float(inputs.get("category_max", DEFAULT_CATEGORY_MAX)),
+    }
+
+
+async def reprice_listings(db: AsyncSession,
+                           category_min: Optional[float] = None,
+                           category_max: Optional[float] = None,
+                           listing_ids: Optional[List[str]] = None,
+                           listing_type: Optional[str] = None,
+                           dry_run: bool = False,
+                           chunk_size: int = CHUNK_SIZE) -> Dict[str, Any]:
+    """
+    Analiz edilmiş ürünlerin fiyat aralığını kayıtlı LQS, rakip fiyatı ve mevsimsellik verisinden
+    toplu (NumPy) olarak yeniden hesaplar ve tek UPDATE ile geri yazar.
+    category_min/category_max verilirse kayıtlı kategori sınırlarının yerine kullanılır.
+    """
+    scanned, changed = 0, 0
+    preview = []
+    last_id = None
+
+    while True:
+        query = (
+            select(Listing.id, Listing.price, Listing.listing_type, Listing.lqs_score, Listing.monthly_popularity,
+                   Listing.pricing_inputs, Listing.predicted_price_min, Listing.predicted_price_max, Listing.price_reason)
+            .where(Listing.is_analyzed == True)
+            .order_by(Listing.id)
+            .limit(chunk_size)
+        )
+        if listing_ids:
+            query = query.where(Listing.id.in_(listing_ids))
+        if listing_type:
+            query = query.where(Listing.listing_type == listing_type)
+        if last_id is not None:
+            query = query.where(Listing.id > last_id)
+        rows = (await db.execute(query)).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        scanned += len(rows)
+
+        inputs = [_pricing_inputs(row) for row in rows]
+        results = calculate_prices_batch(
+            lqs_scores=[row.lqs_score or 0.0 for row in rows],
+            competitor_prices=[i["competitor_price"] for i in inputs],
+            category_min=category_min if category_min is not None else [i["category_min"] for i in inputs],
+            category_max=category_max if category_max is not None else [i["category_max"] for i in inputs],
+            seasonality=[row.monthly_popularity for row in rows],
+        )
+
+        updates = []
+        for row, result in zip(rows, results):
+            values = {
+                "predicted_price_min": result["min"],
+                "predicted_price_max": result["max"],
+                "price_reason": result["reason"],
+            }
+            if any(getattr(row, field) != value for field, value in values.items()):
+                updates.append({"id": row.id, **values})
+                if len(preview) < 20:
+                    preview.append({"id": row.id, "optimal": result["optimal"], **values})
+
+        if updates and not dry_run:
+            # Birincil anahtara göre toplu UPDATE (executemany)
+            await db.execute(update(Listing), updates)
+            await db.commit()
+        changed += len(updates)
+
+    return {"scanned": scanned, "changed": changed, "dry_run": dry_run, "preview": preview}
@@ -0,0 +1,131 @@
+import hashlib
+import json
+import re
+import time
+from typing import Dict, Any, List, Optional, Callable, Awaitable
+
+from app.db.session import async_session_maker
+from app.db.upsert import bulk_upsert
+from app.models import Listing
+from app.services.etsy_client import EtsyClient
+from app.services.listing_documents import refresh_listing_documents
+
+# Çakışmada (daha önce içe aktarılmış ürün) güncellenen kolonlar. Etiketler analiz sonrası
+# önerilen etiketlerle değiştiği için ezilmez; analiz sonuçları da korunur.
+IMPORT_UPDATE_FIELDS = ("title", "price", "image_url", "shop_id", "etsy_updated_at", "source_fingerprint")
+
+ProgressCallback = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class ShopNotFoundError(Exception):
+    pass
+
+
+def parse_shop_name(url: str) -> Optional[str]:
+    match = re.search(r"etsy\.com/(?:[a-z]{2}(?:-[a-z]{2})?/)?shop/([^/?#]+)", url, re.IGNORECASE)
+    return match.group(1) if match else None
+
+
+def listing_price(price: Any) -> float:
+    """Etsy v3 fiyatı {"amount": 4500, "divisor": 100} biçiminde gelir."""
+    if isinstance(price, dict):
+        divisor = price.get("divisor") or 100
+        return round(float(price.get("amount", 0)) / divisor, 2)
+    try:
+        return float(price or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def listing_image_url(item: Dict[str, Any]) -> str:
+    images = item.get("images") or []
+    if not images:
+        return ""
+    first = images[0] if isinstance(images[0], dict) else {"url_fullxfull": images[0]}
+    return first.get("url_570xN") or first.get("url_fullxfull") or ""
+
+
+def listing_fingerprint(title: str, tags: List[str], price: float, image_url: str) -> str:
+    """Senkronda değişiklik tespiti için Etsy tarafındaki girdilerin özeti."""
+    payload = json.dumps([title or "", sorted(tags or []), round(float(price or 0), 2), image_url or ""], ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def listing_row(item: Dict[str, Any], shop_id: str) -> Dict[str, Any]:
+    title = item.get("title", "")
+    tags = [str(tag).strip() for tag in item.get("tags") or []]
+    price = listing_price(item.get("price"))
+    image_url = listing_image_url(item)
+    return {
+        "id": str(item["listing_id"]),
+        "title": title,
+        "price": price,
+        "image_url": image_url,
+        "shop_id": shop_id,
+        "listing_type": "mine",
+        "_tags": tags,
+        "etsy_updated_at": item.get("updated_timestamp") or item.get("last_modified_timestamp"),
+        "source_fingerprint": listing_fingerprint(title, tags, price, image_url),
+    }
+
+
+def product_summary(item: Dict[str, Any]) -> Dict[str, Any]:
+    """/import/fetch-shop yanıtındaki ürün özeti (frontend'in beklediği alanlar)."""
+    price = item.get("price") if isinstance(item.get("price"), dict) else {}
+    return {
+        "listing_id": int(item["listing_id"]),
+        "title": item.get("title", ""),
+        "price": listing_price(item.get("price")),
+        "currency": price.get("currency_code", "USD"),
+        "image_url": listing_image_url(item),
+        "tags": item.get("tags") or [],
+        "views": int(item.get("views") or 0),
+        "favorites": int(item.get("num_favorers") or 0),
+    }
+
+
+async def import_shop(shop_name: str, client: Optional[EtsyClient] = None,
+                      on_progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+    """
+    Mağazanın tüm aktif ürünlerini sayfalar halinde eşzamanlı çeker (token bucket ile sınırlı) ve
+    her sayfayı geldiği anda listings tablosuna toplu upsert eder. İlerleme on_progress ile bildirilir.
+    """
+    client = client or EtsyClient()
+    started = time.perf_counter()
+
+    shop = await client.find_shop(shop_name)
+    if not shop:
+        raise ShopNotFoundError(shop_name)
+    shop_id = str(shop["shop_id"])
+
+    seen: Dict[str, Dict[str, Any]] = {}
+    progress = {"fetched": 0, "imported": 0, "total": 0}
+
+    async with async_session_maker() as db:
+        async def on_page(page: List[Dict[str, Any]], total: int):
+            # Tarama sırasında ürün sırası kayarsa aynı ürün iki sayfada gelebilir
+            fresh = [item for item in page if item.get("listing_id") and str(item["listing_id"]) not in seen]
+            for item in fresh:
+                seen[str(item["listing_id"])] = item
+            if fresh:
+                await bulk_upsert(db, Listing, [listing_row(item, shop_id) for item in fresh],
+                                  index_elements=["id"], update_fields=IMPORT_UPDATE_FIELDS)
+                await db.commit()
+                await refresh_listing_documents(db, [str(item["listing_id"]) for item in fresh])
+
+            progress.update(fetched=progress["fetched"] + len(page), imported=len(seen), total=total)
+            if on_progress:
+                await on_progress({"shop_name": shop.get("shop_name", shop_name), **progress})
+
+        await client.get_all_active_listings(int(shop_id), on_page=on_page)
+
+    seconds = round(time.perf_counter() - started, 2)
+    print(f"📦 Mağaza içe aktarıldı: {shop.get('shop_name', shop_name)} ({len(seen)} ürün, {seconds}s)")
+    return {
+        "shop_id": shop_id,
+        "shop_name": shop.get("shop_name", shop_name),
+        "imported": len(seen),
+        "total": progress["total"],
+        "seconds": seconds,
+        "products": [product_summary(item) for item in seen.values()],
+    }
@@ -0,0 +1,161 @@
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+
+from sqlalchemy import select, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.timeutil import as_utc, utc_now
+from app.models import ListingSnapshot, ListingScoreRollup
+
+# Rollup ortalama kolonu -> snapshot kolonu
+AVG_FIELDS = {
+    "lqs_avg": "lqs_score",
+    "lqs_visual_avg": "lqs_visual_score",
+    "lqs_seo_avg": "lqs_seo_score",
+    "lqs_zeitgeist_avg": "lqs_zeitgeist_score",
+    "price_min_avg": "predicted_price_min",
+    "price_max_avg": "predicted_price_max",
+    "trend_avg": "trend_score",
+}
+
+CHUNK_SIZE = 500
+
+BucketKey = Tuple[str, str, datetime]
+
+
+def bucket_start(ts: datetime, granularity: str) -> datetime:
+    """UTC gün/hafta başlangıcı (timezone'lu)."""
+    day = as_utc(ts).replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == "week":
+        day -= timedelta(days=day.weekday())
+    return day
+
+
+class _Bucket:
+    """Ağırlıklı ortalama için toplamları tutar."""
+
+    def __init__(self):
+        self.count = 0
+        self.sums = {field: 0.0 for field in AVG_FIELDS}
+        self.lqs_min: Optional[float] = None
+        self.lqs_max: Optional[float] = None
+
+    def add(self, count: int, averages: Dict[str, float], lqs_min: float, lqs_max: float):
+        self.count += count
+        for field in AVG_FIELDS:
+            self.sums[field] += (averages.get(field) or 0.0) * count
+        self.lqs_min = lqs_min if self.lqs_min is None else min(self.lqs_min, lqs_min)
+        self.lqs_max = lqs_max if self.lqs_max is None else max(self.lqs_max, lqs_max)
+
+    def add_rollup(self, rollup: ListingScoreRollup):
+        self.add(rollup.snapshot_count, {field: getattr(rollup, field) for field in AVG_FIELDS}, rollup.lqs_min, rollup.lqs_max)
+
+    def apply_to(self, rollup: ListingScoreRollup):
+        rollup.snapshot_count = self.count
+        for field in AVG_FIELDS:
+            setattr(rollup, field, round(self.sums[field] / self.count, 2) if self.count else 0.0)
+        rollup.lqs_min = self.lqs_min or 0.0
+        rollup.lqs_max = self.lqs_max or 0.0
+
+
+async def compact_snapshots(db: AsyncSession,
+                            keep_full_days: Optional[int] = None,
+                            keep_latest: Optional[int] = None,
+                            weekly_after_days: Optional[int] = None,
+                            now: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Eski snapshot'ları puan özetlerine (rollup) çevirip siler.
+
+    - Son keep_full_days gün ve her ürünün son keep_latest analizi tam haliyle kalır.
+    - Daha eskiler günlük; weekly_after_days'den eskiler haftalık kovalara toplanır.
+    - Süresi dolan günlük rollup'lar da haftalığa birleştirilir, böylece tablo büyümesi sınırlı kalır.
+    """
+    keep_full_days = settings.SNAPSHOT_KEEP_FULL_DAYS if keep_full_days is None else keep_full_days
+    keep_latest = settings.SNAPSHOT_KEEP_LATEST if keep_latest is None else keep_latest
+    weekly_after_days = settings.SNAPSHOT_WEEKLY_AFTER_DAYS if weekly_after_days is None else weekly_after_days
+    now = as_utc(now) if now else utc_now()
+    full_cutoff = now - timedelta(days=keep_full_days)
+    weekly_cutoff = now - timedelta(days=weekly_after_days)
+
+    buckets: Dict[BucketKey, _Bucket] = {}
+    compacted_ids: List[int] = []
+
+    # 1. Sıkıştırılacak snapshot'lar (sadece sayısal kolonlar, akış halinde)
+    ranked = select(
+        ListingSnapshot.id,
+        func.row_number().over(
+            partition_by=ListingSnapshot.listing_id,
+            order_by=ListingSnapshot.created_at.desc()
+        ).label("rn")
+    ).subquery()
+
+    columns = [ListingSnapshot.id, ListingSnapshot.listing_id, ListingSnapshot.created_at]
+    columns += [getattr(ListingSnapshot, field) for field in AVG_FIELDS.values()]
+    query = (
+        select(*columns)
+        .join(ranked, ranked.c.id == ListingSnapshot.id)
+        .where(ListingSnapshot.created_at < full_cutoff, ranked.c.rn > keep_latest)
+    )
+
+    stream = await db.stream(query)
+    async for row in stream:
+        granularity = "week" if as_utc(row.created_at) < weekly_cutoff else "day"
+        key = (row.listing_id, granularity, bucket_start(row.created_at, granularity))
+        averages = {field: getattr(row, column) for field, column in AVG_FIELDS.items()}
+        lqs = row.lqs_score or 0.0
+        buckets.setdefault(key, _Bucket()).add(1, averages, lqs, lqs)
+        compacted_ids.append(row.id)
+
+    # 2. Eskimiş günlük rollup'ları haftalığa taşı
+    stale_daily = (await db.execute(
+        select(ListingScoreRollup).where(
+            ListingScoreRollup.granularity == "day",
+            ListingScoreRollup.bucket_start < weekly_cutoff
+        )
+    )).scalars().all()
+    for rollup in stale_daily:
+        key = (rollup.listing_id, "week", bucket_start(rollup.bucket_start, "week"))
+        buckets.setdefault(key, _Bucket()).add_rollup(rollup)
+
+    # 3. Mevcut rollup'larla birleştir
+    created, updated = 0, 0
+    buckets_by_listing: Dict[str, Dict[BucketKey, _Bucket]] = {}
+    for key, bucket in buckets.items():
+        buckets_by_listing.setdefault(key[0], {})[key] = bucket
+
+    listing_ids = sorted(buckets_by_listing)
+    for i in range(0, len(listing_ids), CHUNK_SIZE):
+        chunk = listing_ids[i:i + CHUNK_SIZE]
+        existing = (await db.execute(
+            select(ListingScoreRollup).where(ListingScoreRollup.listing_id.in_(chunk))
+        )).scalars().all()
+        existing_by_key = {
+            (r.listing_id, r.granularity, as_utc(r.bucket_start)): r
+            for r in existing if not (r.granularity == "day" and as_utc(r.bucket_start) < weekly_cutoff)
+        }
+        for listing_id in chunk:
+            for key, bucket in buckets_by_listing[listing_id].items():
+                rollup = existing_by_key.get(key)
+                if rollup:
+                    bucket.add_rollup(rollup)
+                    updated += 1
+                else:
+                    rollup = ListingScoreRollup(listing_id=key[0], granularity=key[1], bucket_start=key[2])
+                    db.add(rollup)
+                    created += 1
+                bucket.apply_to(rollup)
+
+    # 4. Temizlik
+    for rollup in stale_daily:
+        await db.delete(rollup)
+    for i in range(0, len(compacted_ids), CHUNK_SIZE):
+        await db.execute(delete(ListingSnapshot).where(ListingSnapshot.id.in_(compacted_ids[i:i + CHUNK_SIZE])))
+
+    await db.commit()
+    return {
+        "snapshots_compacted": len(compacted_ids),
+        "rollups_created": created,
+        "rollups_updated": updated,
+        "daily_rolled_to_weekly": len(stale_daily),
+    }
@@ -0,0 +1,111 @@
+import sys
+from collections import Counter
+from typing import Dict, Any, Iterable, List, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.keyword_index import PrefixIndex, title_ngrams, normalize_term
+from app.models import Listing, ListingSnapshot
+from app.models.listing import to_tag_list, TAG_LIST_FIELDS
+from app.services.background_rebuild import BackgroundRebuild
+
+SNAPSHOT_TAG_FIELDS = ("suggested_tags",) + TAG_LIST_FIELDS
+# listing_terms için gereken kolonlar (rebuild ve import/senkron sonrası yenileme aynı sorguyu kullanır)
+LISTING_DOCUMENT_COLUMNS = [Listing.id, Listing.title, Listing.suggested_title, Listing._tags.label("tags")]
+LISTING_DOCUMENT_COLUMNS += [getattr(Listing, field) for field in TAG_LIST_FIELDS]
+
+_index = PrefixIndex()
+# Ürün başına indekste sayılmış terimler: güncellemede DB'deki eski hali değil, bu süreçte gerçekten
+# sayılmış olan düşülür (import/senkronla gelip hiç eklenmemiş terimler eksiye düşmez)
+_listing_docs: Dict[str, Tuple[str, ...]] = {}
+_rebuild = BackgroundRebuild("Öneri indeksi")
+
+
+def get_suggestion_index() -> PrefixIndex:
+    return _index
+
+
+def listing_terms(listing) -> List[str]:
+    """Bir ürün satırının indekse katkısı: tüm etiket kolonları + başlık ve önerilen başlık öbekleri."""
+    terms = to_tag_list(listing.tags)
+    for field in TAG_LIST_FIELDS:
+        terms += to_tag_list(getattr(listing, field))
+    terms += title_ngrams(listing.title)
+    terms += title_ngrams(listing.suggested_title)
+    return terms
+
+
+def snapshot_terms(snapshot) -> List[str]:
+    """Snapshot'larda etiketler virgüllü metin olarak saklanıyor."""
+    terms = []
+    for field in SNAPSHOT_TAG_FIELDS:
+        terms += to_tag_list(getattr(snapshot, field))
+    terms += title_ngrams(snapshot.suggested_title)
+    return terms
+
+
+def _normalized(terms: Iterable[str]) -> Tuple[str, ...]:
+    # intern: aynı terim binlerce üründe geçer, saklanan demetler tek kopyayı paylaşır
+    return tuple(sys.intern(t) for t in (normalize_term(term) for term in terms) if t)
+
+
+def _count(counts: Counter, terms: List[str]):
+    counts.update(_normalized(terms))
+
+
+async def build_suggestion_index(db: AsyncSession) -> Dict[str, Any]:
+    """listings ve listing_snapshots tablolarını akış halinde okuyup indeksi baştan kurar."""
+    global _listing_docs
+    with _rebuild.building():
+        counts, listing_docs = Counter(), {}
+        async for row in await db.stream(select(*LISTING_DOCUMENT_COLUMNS)):
+            terms = _normalized(listing_terms(row))
+            if terms:
+                listing_docs[row.id] = terms
+                counts.update(terms)
+
+        snapshot_columns = [ListingSnapshot.suggested_title] + [getattr(ListingSnapshot, f) for f in SNAPSHOT_TAG_FIELDS]
+        async for row in await db.stream(select(*snapshot_columns)):
+            _count(counts, snapshot_terms(row))
+
+        _index.build(counts)
+        _listing_docs = listing_docs
+
+    seconds = _rebuild.state["last_build_seconds"]
+    print(f"🔤 Öneri indeksi hazır: {len(_index)} terim ({seconds}s).")
+    return {"terms": len(_index), "seconds": seconds}
+
+
+def record_listing_terms(listing_id: str, new_listing_terms: List[str], new_snapshot_terms: Iterable[str] = ()):
+    """
+    Ürün eklenince/değişince (analiz, içe aktarma, senkron, düzenleme) indeksi artımlı günceller:
+    ürünün bu süreçte sayılmış önceki terimleri düşülür, yenileri ve varsa yeni snapshot'ın terimleri
+    eklenir (tam rebuild ile aynı sayımlar). Silinen ürün için boş liste verilir.
+    İndeks hazır değilken/kurulurken gelen güncellemeler atlanır (bkz. BackgroundRebuild).
+    """
+    if not _rebuild.accepts_updates():
+        return
+    terms = _normalized(new_listing_terms)
+    delta = Counter(terms)
+    _count(delta, new_snapshot_terms)
+    delta.subtract(_listing_docs.get(listing_id, ()))
+    if terms:
+        _listing_docs[listing_id] = terms
+    else:
+        _listing_docs.pop(listing_id, None)
+    _index.update(delta)
+
+
+def start_suggestion_index():
+    """İlk kurulum arka planda yapılır; hazır olana kadar /keywords/explore sadece uzak önerileri kullanır."""
+    _rebuild.start(build_suggestion_index, settings.SUGGESTION_INDEX_REBUILD_SECONDS)
+
+
+async def stop_suggestion_index():
+    await _rebuild.stop()
+
+
+def get_suggestion_index_stats() -> Dict[str, Any]:
+    return {**_rebuild.get_stats(), **_index.get_stats(), "listings": len(_listing_docs)}
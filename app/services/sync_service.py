@@ -0,0 +1,147 @@
+import time
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy import select, func
+
+from app.db.session import async_session_maker
+from app.db.upsert import bulk_upsert
+from app.models import AnalysisJob, Listing
+from app.services.etsy_client import EtsyClient
+from app.services.job_queue import enqueue_job
+from app.services.listing_documents import refresh_listing_documents
+from app.services.shop_import import (
+    IMPORT_UPDATE_FIELDS, ProgressCallback, ShopNotFoundError, listing_row, product_summary,
+)
+
+# Analiz edilmemiş ürünlerde etiketler hâlâ Etsy'deki etiketlerdir, onlar da güncellenir
+UNANALYZED_UPDATE_FIELDS = IMPORT_UPDATE_FIELDS + ("_tags",)
+ACTIVE_JOB_STATUSES = ("queued", "running")
+
+
+def classify_changes(rows: List[Dict[str, Any]], existing: Dict[str, Listing]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Etsy'den gelen satırları veritabanındaki kayıtlarla parmak izine göre ayırır:
+    new (yeni ürün), changed (başlık/etiket/fiyat/görsel değişmiş), touched (sadece updated_timestamp
+    ilerlemiş; ör. stok/görüntülenme) ve reanalyze (analiz girdisi olan başlık veya görsel değişmiş).
+    """
+    groups = {"new": [], "changed": [], "touched": [], "reanalyze": []}
+    for row in rows:
+        current = existing.get(row["id"])
+        if current is None:
+            groups["new"].append(row)
+        elif current.source_fingerprint != row["source_fingerprint"]:
+            groups["changed"].append(row)
+            if current.is_analyzed and (current.title != row["title"] or current.image_url != row["image_url"]):
+                groups["reanalyze"].append(row)
+        elif current.etsy_updated_at != row["etsy_updated_at"]:
+            groups["touched"].append(row)
+    return groups
+
+
+async def get_sync_watermark(db, shop_id: str) -> Optional[int]:
+    """Mağazanın bilinen en son Etsy güncelleme zamanı; hiç senkron yapılmamışsa None."""
+    return await db.scalar(select(func.max(Listing.etsy_updated_at)).where(Listing.shop_id == shop_id))
+
+
+async def _save_page(db, rows: List[Dict[str, Any]], existing: Dict[str, Listing]) -> Dict[str, List[Dict[str, Any]]]:
+    groups = classify_changes(rows, existing)
+    unanalyzed = [row for row in groups["new"] + groups["changed"] if not (existing.get(row["id"]) and existing[row["id"]].is_analyzed)]
+    analyzed = [row for row in groups["changed"] if existing[row["id"]].is_analyzed]
+
+    if unanalyzed:
+        await bulk_upsert(db, Listing, unanalyzed, index_elements=["id"], update_fields=UNANALYZED_UPDATE_FIELDS)
+    if analyzed:
+        # Analiz edilmiş ürünlerde etiket kolonu önerilen etiketleri tutar, ezilmez
+        await bulk_upsert(db, Listing, analyzed, index_elements=["id"], update_fields=IMPORT_UPDATE_FIELDS)
+    if groups["touched"]:
+        await bulk_upsert(db, Listing, groups["touched"], index_elements=["id"], update_fields=("etsy_updated_at",))
+    await db.commit()
+    # touched ürünlerde sadece damga değişti; indekslenen alanlar aynı
+    await refresh_listing_documents(db, [row["id"] for row in unanalyzed + analyzed])
+    return groups
+
+
+async def _queue_reanalysis(db, rows: List[Dict[str, Any]]) -> int:
+    if not rows:
+        return 0
+    # Kuyrukta bekleyen/çalışan işi olan ürün için ikinci iş açılmaz
+    pending = set((await db.execute(
+        select(AnalysisJob.listing_id).where(
+            AnalysisJob.listing_id.in_([row["id"] for row in rows]),
+            AnalysisJob.status.in_(ACTIVE_JOB_STATUSES),
+        )
+    )).scalars())
+    queued = 0
+    for row in rows:
+        if row["id"] in pending or not row["image_url"]:
+            continue
+        # force_refresh yok: pipeline girdi hash'i (görsel + başlık) aynıysa LLM çağrısı yapılmaz
+        await enqueue_job(row["id"], row["image_url"], row["title"])
+        queued += 1
+    return queued
+
+
+async def sync_shop(shop_name: str, client: Optional[EtsyClient] = None,
+                    on_progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+    """
+    Artımlı mağaza senkronu: sadece son senkrondan beri updated_timestamp'i ilerlemiş ürünler çekilir,
+    parmak izi değişenler toplu upsert edilir ve sadece analiz girdisi değişen ürünler yeniden analize
+    kuyruğa alınır. İlk senkronda (bilinen damga yoksa) mağazanın tamamı taranır.
+    """
+    client = client or EtsyClient()
+    started = time.perf_counter()
+
+    shop = await client.find_shop(shop_name)
+    if not shop:
+        raise ShopNotFoundError(shop_name)
+    shop_id = str(shop["shop_id"])
+
+    summary = {"fetched": 0, "new": 0, "changed": 0, "touched": 0, "unchanged": 0, "reanalyze": 0}
+    reanalyze: Dict[str, Dict[str, Any]] = {}
+    changed_items: List[Dict[str, Any]] = []
+    seen = set()
+
+    async with async_session_maker() as db:
+        watermark = await get_sync_watermark(db, shop_id)
+
+        async def on_page(page: List[Dict[str, Any]], total: int):
+            items = [item for item in page if item.get("listing_id") and str(item["listing_id"]) not in seen]
+            seen.update(str(item["listing_id"]) for item in items)
+            rows = [listing_row(item, shop_id) for item in items]
+            if rows:
+                existing = {
+                    listing.id: listing
+                    for listing in (await db.execute(select(Listing).where(Listing.id.in_([row["id"] for row in rows])))).scalars()
+                }
+                groups = await _save_page(db, rows, existing)
+                changed_ids = {row["id"] for row in groups["new"] + groups["changed"]}
+                changed_items.extend(item for item in items if str(item["listing_id"]) in changed_ids)
+                reanalyze.update((row["id"], row) for row in groups["reanalyze"])
+                for key in ("new", "changed", "touched"):
+                    summary[key] += len(groups[key])
+                summary["unchanged"] += len(rows) - len(groups["new"]) - len(groups["changed"]) - len(groups["touched"])
+
+            summary["fetched"] += len(page)
+            if on_progress:
+                await on_progress({"shop_name": shop.get("shop_name", shop_name), "total": total, **summary})
+
+        if watermark is None:
+            await client.get_all_active_listings(int(shop_id), on_page=on_page)
+        else:
+            await client.get_listings_updated_since(int(shop_id), watermark, on_page=on_page)
+
+        summary["reanalyze"] = await _queue_reanalysis(db, list(reanalyze.values()))
+
+    seconds = round(time.perf_counter() - started, 2)
+    print(f"🔄 Mağaza senkronlandı: {shop.get('shop_name', shop_name)} "
+          f"({summary['fetched']} çekildi, {summary['new']} yeni, {summary['changed']} değişti, "
+          f"{summary['reanalyze']} yeniden analiz, {seconds}s)")
+    return {
+        "shop_id": shop_id,
+        "shop_name": shop.get("shop_name", shop_name),
+        "full_scan": watermark is None,
+        "since": watermark,
+        **summary,
+        "seconds": seconds,
+        "products": [product_summary(item) for item in changed_items],
+    }
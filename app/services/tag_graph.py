@@ -0,0 +1,98 @@
+import asyncio
+from typing import Dict, Any, Iterable, List, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.tag_graph import CooccurrenceGraph, tag_set
+from app.models import Listing, ListingSnapshot
+from app.models.listing import to_tag_list, TAG_LIST_FIELDS
+from app.services.background_rebuild import BackgroundRebuild
+from app.services.suggestion_index import SNAPSHOT_TAG_FIELDS
+
+_graph = CooccurrenceGraph()
+# Ürün başına grafikte sayılmış belge (normalize etiket demeti); grafikle birlikte kurulup değiştirilir.
+# Güncellemede sadece grafiğin gerçekten içerdiği belge çıkarılır.
+_listing_docs: Dict[str, Tuple[str, ...]] = {}
+_rebuild = BackgroundRebuild("Etiket grafiği")
+
+
+def get_tag_graph() -> CooccurrenceGraph:
+    return _graph
+
+
+def is_tag_graph_ready() -> bool:
+    return _rebuild.ready
+
+
+def listing_tags(listing) -> List[str]:
+    """Ürünün grafikteki belgesi: etiketler + etiket kategorisi kolonları (kendi ve rakip ürünler)."""
+    tags = to_tag_list(listing.tags)
+    for field in TAG_LIST_FIELDS:
+        tags += to_tag_list(getattr(listing, field))
+    return tags
+
+
+def snapshot_tags(snapshot) -> List[str]:
+    tags = []
+    for field in SNAPSHOT_TAG_FIELDS:
+        tags += to_tag_list(getattr(snapshot, field))
+    return tags
+
+
+async def build_tag_graph(db: AsyncSession) -> Dict[str, Any]:
+    """listings ve listing_snapshots tablolarını akış halinde okuyup grafiği baştan kurar."""
+    global _graph, _listing_docs
+    with _rebuild.building():
+        # Belgeler normalize etiket demetleri olarak toplanır
+        documents, listing_docs = [], {}
+        listing_columns = [Listing.id, Listing._tags.label("tags")] + [getattr(Listing, field) for field in TAG_LIST_FIELDS]
+        async for row in await db.stream(select(*listing_columns)):
+            tags = tag_set(listing_tags(row))
+            if tags:
+                listing_docs[row.id] = tags
+                documents.append(tags)
+
+        snapshot_columns = [getattr(ListingSnapshot, field) for field in SNAPSHOT_TAG_FIELDS]
+        async for row in await db.stream(select(*snapshot_columns)):
+            documents.append(tag_set(snapshot_tags(row)))
+
+        # Çift sayımı CPU ağırlıklı: yeni grafik thread'de kurulur, bu sırada istekler eskisinden okunur
+        graph = CooccurrenceGraph()
+        await asyncio.to_thread(graph.build, documents)
+        graph.stats["builds"] += _graph.stats["builds"]
+        _graph, _listing_docs = graph, listing_docs
+
+    seconds = _rebuild.state["last_build_seconds"]
+    print(f"🕸️ Etiket grafiği hazır: {len(_graph)} etiket, {_graph.documents} belge ({seconds}s).")
+    return {"tags": len(_graph), "documents": _graph.documents, "seconds": seconds}
+
+
+def record_listing_tags(listing_id: str, new_listing_tags: List[str], new_snapshot_tags: Iterable[str] = ()):
+    """
+    Ürün eklenince/değişince (analiz, içe aktarma, senkron, düzenleme) grafiği artımlı günceller:
+    ürünün grafikteki belgesi (varsa) çıkarılır, yeni belgesi ve varsa yeni snapshot eklenir.
+    Silinen ürün için boş liste verilir. Grafik hazır değilken/kurulurken gelen güncellemeler atlanır
+    (bkz. BackgroundRebuild).
+    """
+    if not _rebuild.accepts_updates():
+        return
+    tags = tag_set(new_listing_tags)
+    previous = _listing_docs.pop(listing_id, None)
+    if tags:
+        _listing_docs[listing_id] = tags
+    _graph.update(added=[tags, new_snapshot_tags], removed=[previous] if previous else [])
+
+
+def start_tag_graph():
+    """İlk kurulum arka planda yapılır; hazır olana kadar /keywords/related boş döner (ready=False)."""
+    _rebuild.start(build_tag_graph, settings.TAG_GRAPH_REBUILD_SECONDS)
+
+
+async def stop_tag_graph():
+    await _rebuild.stop()
+
+
+def get_tag_graph_stats() -> Dict[str, Any]:
+    return {**_rebuild.get_stats(), **_graph.get_stats(), "listings": len(_listing_docs)}
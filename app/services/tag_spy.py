@@ -0,0 +1,94 @@
+import time
+from itertools import combinations
+from typing import Dict, Any, Iterable, List, Optional
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.inflight import InFlight
+from app.core.stream_counter import StreamingCounter
+from app.services.etsy_client import EtsyClient
+from app.services.shop_import import ShopNotFoundError
+
+# Mağaza başına sonuç önbelleği; aynı mağaza için eşzamanlı istekler tek taramayı bekler
+_shop_tag_cache = TTLCache(settings.TAG_SPY_CACHE_TTL_SECONDS, max_entries=settings.TAG_SPY_CACHE_MAX)
+_inflight = InFlight()
+_stats = {"scans": 0, "listings_scanned": 0, "last_scan_seconds": None}
+
+
+def normalize_tag(tag: Any) -> str:
+    return " ".join(str(tag).lower().split())
+
+
+class TagAggregator:
+    """
+    Ürün ürün etiket frekansı ve etiket çifti (aynı üründe birlikte kullanım) sayımı.
+    Sayaçlar bellek sınırlı olduğundan 10k+ ürünlü mağazalar sayfa sayfa işlenebilir.
+    """
+
+    def __init__(self, tag_capacity: Optional[int] = None, pair_capacity: Optional[int] = None):
+        self.tags = StreamingCounter(tag_capacity or settings.TAG_SPY_TAG_CAPACITY)
+        self.pairs = StreamingCounter(pair_capacity or settings.TAG_SPY_PAIR_CAPACITY)
+        self.listing_count = 0
+
+    def add_listing(self, tags: Iterable[Any]):
+        unique = sorted({normalize_tag(tag) for tag in tags or []} - {""})
+        self.tags.update(unique)
+        self.pairs.update(combinations(unique, 2))
+        self.listing_count += 1
+
+    def add_page(self, listings: Iterable[Dict[str, Any]]):
+        for listing in listings:
+            self.add_listing(listing.get("tags"))
+
+    def result(self, top_tags: Optional[int] = None, top_pairs: Optional[int] = None) -> Dict[str, Any]:
+        return {
+            "analyzed_product_count": self.listing_count,
+            "top_tags": self.tags.top(top_tags or settings.TAG_SPY_TOP_TAGS),
+            "top_pairs": [(list(pair), count) for pair, count in self.pairs.top(top_pairs or settings.TAG_SPY_TOP_PAIRS)],
+            # Budama olduysa sayımlar en fazla error kadar eksik olabilir
+            "approximate": bool(self.tags.prunes or self.pairs.prunes),
+            "max_count_error": max(self.tags.error, self.pairs.error),
+        }
+
+
+async def _scan_shop(shop_name: str, client: EtsyClient) -> Dict[str, Any]:
+    started = time.perf_counter()
+    shop = await client.find_shop(shop_name)
+    if not shop:
+        raise ShopNotFoundError(shop_name)
+
+    aggregator = TagAggregator()
+
+    async def on_page(page: List[Dict[str, Any]], total: int):
+        aggregator.add_page(page)
+
+    # Sayfalar biriktirilmez: bellek kullanımı sayaç kapasiteleriyle sınırlı
+    await client.get_all_active_listings(int(shop["shop_id"]), on_page=on_page, collect=False)
+
+    seconds = round(time.perf_counter() - started, 2)
+    _stats["scans"] += 1
+    _stats["listings_scanned"] += aggregator.listing_count
+    _stats["last_scan_seconds"] = seconds
+    print(f"🕵️ Tag Spy: {shop.get('shop_name', shop_name)} ({aggregator.listing_count} ürün, {seconds}s)")
+    return {"shop_name": shop.get("shop_name", shop_name), **aggregator.result(), "seconds": seconds}
+
+
+async def _load_shop(shop_name: str, key: str, client: EtsyClient) -> Dict[str, Any]:
+    result = await _scan_shop(shop_name, client)
+    _shop_tag_cache.set(key, result)
+    return result
+
+
+async def analyze_competitor_shop(shop_name: str, client: Optional[EtsyClient] = None) -> Dict[str, Any]:
+    """Rakip mağazanın tüm aktif ürünlerinden etiket frekansı ve birlikte kullanım çiftleri (TTL önbellekli)."""
+    key = shop_name.lower()
+    cached = _shop_tag_cache.get(key)
+    if cached is not None:
+        return {**cached, "cached": True}
+
+    result = await _inflight.run(key, lambda: _load_shop(shop_name, key, client or EtsyClient()))
+    return {**result, "cached": False}
+
+
+def get_tag_spy_stats() -> Dict[str, Any]:
+    return {**_stats, "cache": _shop_tag_cache.get_stats(), "inflight": len(_inflight)}
@@ -0,0 +1,93 @@
+import asyncio
+from typing import Dict, Any, Set
+
+from sqlalchemy import select, update
+
+from app.core.config import settings as app_settings
+from app.core.traffic_engine import TrafficIntelligence
+from app.db.session import async_session_maker
+from app.models import Listing
+from app.models.settings import Settings
+
+# Görevlere güçlü referans tutulur; aksi halde event loop onları bitmeden toplayabilir
+_tasks: Set[asyncio.Task] = set()
+_by_listing: Dict[str, asyncio.Task] = {}
+_stats = {"scheduled": 0, "completed": 0, "ga4": 0, "fallbacks": 0, "timeouts": 0, "errors": 0}
+
+
+async def compute_traffic_data(lqs_score: float, settings: Any, timeout: float) -> Dict[str, Any]:
+    """
+    GA4 raporunu (bloklayan gRPC çağrısı) thread pool'da, zaman aşımıyla çalıştırır.
+    Hata veya zaman aşımında LQS tabanlı tahmine düşer. Zaman aşımında thread arka planda
+    bitmeye devam eder ve raporu önbelleğe yazar; sonraki analizler onu kullanır.
+    """
+    engine = TrafficIntelligence(lqs_score=lqs_score, settings=settings)
+    try:
+        data = await asyncio.wait_for(asyncio.to_thread(engine.fetch_real_ga4_data), timeout)
+        _stats["ga4"] += 1
+        return data
+    except asyncio.TimeoutError:
+        _stats["timeouts"] += 1
+        print(f"⏱️ GA4 {timeout}s içinde yanıt vermedi. Tahmini veri kullanılıyor.")
+    except Exception as e:
+        print(f"GA4 Fetch Error: {e}. Falling back to mock data.")
+    _stats["fallbacks"] += 1
+    return engine.generate_mock_data()
+
+
+async def refresh_traffic_data(listing_id: str, lqs_score: float, timeout: float = None):
+    """Trafik verisini hesaplayıp kendi oturumuyla Listing.traffic_data'ya yazar."""
+    timeout = app_settings.TRAFFIC_REFRESH_TIMEOUT_SECONDS if timeout is None else timeout
+    try:
+        async with async_session_maker() as db:
+            settings = (await db.execute(select(Settings))).scalars().first()
+            traffic_data = await compute_traffic_data(lqs_score, settings, timeout)
+            await db.execute(update(Listing).where(Listing.id == listing_id).values(traffic_data=traffic_data))
+            await db.commit()
+        _stats["completed"] += 1
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        _stats["errors"] += 1
+        print(f"❌ Trafik verisi güncellenemedi ({listing_id}): {e}")
+
+
+def schedule_traffic_refresh(listing_id: str, lqs_score: float) -> asyncio.Task:
+    """
+    Analiz yanıtını bekletmeden trafik verisini arka planda yeniler.
+    Aynı ürün için bekleyen eski bir yenileme varsa iptal edilir (yeni LQS geçerli).
+    """
+    previous = _by_listing.get(listing_id)
+    if previous and not previous.done():
+        previous.cancel()
+
+    task = asyncio.create_task(refresh_traffic_data(listing_id, lqs_score))
+    _tasks.add(task)
+    _by_listing[listing_id] = task
+    _stats["scheduled"] += 1
+
+    def _done(t: asyncio.Task):
+        _tasks.discard(t)
+        if _by_listing.get(listing_id) is t:
+            del _by_listing[listing_id]
+
+    task.add_done_callback(_done)
+    return task
+
+
+async def wait_for_traffic_refreshes(timeout: float = None):
+    """Bekleyen yenilemeleri bitirir (kapanışta ve script'lerde)."""
+    if _tasks:
+        await asyncio.wait(list(_tasks), timeout=timeout)
+
+
+async def cancel_traffic_refreshes():
+    tasks = list(_tasks)
+    for task in tasks:
+        task.cancel()
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def get_traffic_refresh_stats() -> Dict[str, Any]:
+    return {**_stats, "pending": len(_tasks)}
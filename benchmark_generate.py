@@ -0,0 +1,82 @@
+import asyncio
+import json
+import os
+import time
+
+import httpx
+from fastapi import FastAPI
+
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+from app.api.v1.endpoints import generate
+from app.services.model_registry import get_model_registry
+
+# /generate/'in eşzamanlı yük altındaki verimini ölçer (gerçek Gemini'ye gitmez).
+# Sahte model her çağrıda LATENCY kadar bekler: eski yol (async def içinde senkron generate_content)
+# bu süre boyunca event loop'u kilitler, yeni yol generate_content_async ile bekler.
+LATENCY = 0.2
+REQUESTS = 32
+
+FAKE_JSON = json.dumps({
+    "seo_title": "Boho Line Art Print", "description": "Minimal wall decor.",
+    "tags": ["boho art"] * 13, "image_prompt_a": "a", "image_prompt_b": "b",
+})
+
+
+class FakeResponse:
+    text = FAKE_JSON
+
+
+class FakeModel:
+    model_name = "models/fake-flash"
+
+    def generate_content(self, prompt, **kwargs):
+        time.sleep(LATENCY)
+        return FakeResponse()
+
+    async def generate_content_async(self, prompt, **kwargs):
+        await asyncio.sleep(LATENCY)
+        return FakeResponse()
+
+
+async def legacy_generate_listing(request: generate.GenerateRequest):
+    # Değişiklik öncesi davranış: senkron çağrı event loop'u bloklar
+    model = generate.get_model()
+    response = model.generate_content(generate.build_listing_prompt(request.description))
+    return generate.build_final_data(generate.parse_model_json(response.text))
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(generate.router, prefix="/generate")
+    app.add_api_route("/legacy", legacy_generate_listing, methods=["POST"])
+    return app
+
+
+async def run(client: httpx.AsyncClient, path: str) -> float:
+    start = time.perf_counter()
+    responses = await asyncio.gather(*[
+        client.post(path, json={"description": f"ürün {i}"}) for i in range(REQUESTS)
+    ])
+    elapsed = time.perf_counter() - start
+    assert all(r.status_code == 200 and not r.json()["seo_title"].startswith("Hata") for r in responses)
+    return elapsed
+
+
+async def main():
+    fake = FakeModel()
+    generate.get_model = lambda: fake
+    limit = get_model_registry().max_concurrency
+
+    transport = httpx.ASGITransport(app=build_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        legacy = await run(client, "/legacy")
+        current = await run(client, "/generate/")
+
+    print(f"{REQUESTS} eşzamanlı istek, model gecikmesi {LATENCY}s, model başına limit {limit}")
+    print(f"Önce (senkron generate_content): {legacy:.2f}s  ->  {REQUESTS / legacy:.1f} istek/s")
+    print(f"Sonra (generate_content_async):  {current:.2f}s  ->  {REQUESTS / current:.1f} istek/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
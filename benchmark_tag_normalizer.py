@@ -0,0 +1,132 @@
+import gc
+import random
+import re
+import time
+from typing import List
+
+from app.core.tag_normalizer import clean_tag, validate_and_fix_tags, validate_many
+
+# Yeni etiket doğrulayıcının eski analyze.validate_and_fix_tags ile birebir aynı sonucu verdiğini
+# kontrol eder ve hızlarını karşılaştırır. Eski fonksiyon aşağıda değiştirilmeden duruyor.
+
+
+def legacy_validate_and_fix_tags(raw_tags: List[str], title: str) -> List[str]:
+    """
+    Etsy kurallarına (max 20 karakter) uygun hale getirir.
+    Tek kelimelik etiketleri başlık kullanarak 'Long Tail' yapmaya çalışır.
+    """
+    valid_tags = []
+    seen_tags = set()
+    
+    # Başlıktan kelime havuzu oluştur (güvenli ekleme yapmak için)
+    title_words = re.findall(r'\w+', title.lower())
+    
+    for tag in raw_tags:
+        clean_tag = tag.strip()
+        clean_tag = re.sub(r'[^\w\s]', '', clean_tag)
+        
+        if not clean_tag: continue
+        
+        # 1. KURAL: UZUNLUK KONTROLÜ (Max 20)
+        if len(clean_tag) > 20:
+            words = clean_tag.split()
+            while len(" ".join(words)) > 20 and len(words) > 1:
+                words.pop() 
+            
+            new_tag = " ".join(words)
+            if len(new_tag) > 20 or len(new_tag) < 3:
+                continue
+            clean_tag = new_tag
+
+        # 2. KURAL: TEK KELİME KONTROLÜ (Single Word)
+        if " " not in clean_tag:
+            if clean_tag.lower() in title_words:
+                try:
+                    idx = title_words.index(clean_tag.lower())
+                    if idx > 0:
+                        clean_tag = f"{title_words[idx-1]} {clean_tag}"
+                    elif idx < len(title_words) - 1:
+                        clean_tag = f"{clean_tag} {title_words[idx+1]}"
+                except:
+                    pass
+        
+        # 3. KURAL: TEKRAR VE FİNAL KONTROL
+        final_tag = clean_tag.title()
+        if len(final_tag) <= 20 and final_tag.lower() not in seen_tags:
+            valid_tags.append(final_tag)
+            seen_tags.add(final_tag.lower())
+    
+    if len(valid_tags) < 13:
+        for i in range(len(title_words) - 1):
+            phrase = f"{title_words[i]} {title_words[i+1]}".title()
+            if len(phrase) <= 20 and phrase.lower() not in seen_tags:
+                valid_tags.append(phrase)
+                seen_tags.add(phrase.lower())
+                if len(valid_tags) >= 13: break
+
+    return valid_tags[:13]
+
+
+random.seed(3)
+WORDS = ["boho", "wall", "art", "print", "vintage", "ceramic", "vase", "gift", "minimalist", "poster",
+         "custom", "name", "necklace", "gold", "silver", "ring", "botanical", "line", "abstract", "kids",
+         "Çiçek", "straße", "x", "mug", "for", "her", "handmade"]
+NOISE = ["", " ", "!", "&", "-", "'s", "...", "  ", "#", "✨"]
+
+
+def random_tag() -> str:
+    words = random.choices(WORDS, k=random.choice([1, 1, 1, 2, 2, 3, 4, 5]))
+    tag = " ".join(w + random.choice(NOISE) if random.random() < 0.2 else w for w in words)
+    if random.random() < 0.1: tag = tag.upper()
+    if random.random() < 0.1: tag = f"  {tag}  "
+    return tag
+
+
+def random_title() -> str:
+    return " ".join(random.choice(WORDS) + (random.choice(NOISE) if random.random() < 0.15 else "")
+                    for _ in range(random.randint(0, 18)))
+
+
+def bench(label, titles, tag_lists):
+    # GC kapalı: önceki ölçümlerin ürettiği nesneler sonrakileri yavaşlatmasın
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        legacy = [legacy_validate_and_fix_tags(tags, title) for title, tags in zip(titles, tag_lists)]
+        legacy_time = time.perf_counter() - start
+
+        clean_tag.cache_clear()
+        start = time.perf_counter()
+        single = [validate_and_fix_tags(tags, title) for title, tags in zip(titles, tag_lists)]
+        single_time = time.perf_counter() - start
+
+        clean_tag.cache_clear()
+        start = time.perf_counter()
+        batch = validate_many(titles, tag_lists)
+        batch_time = time.perf_counter() - start
+    finally:
+        gc.enable()
+
+    mismatches = sum(a != b for a, b in zip(legacy, single)) + sum(a != b for a, b in zip(legacy, batch))
+    rows = len(titles)
+    print(f"{label}: {rows} rows, mismatches: {mismatches}, clean cache: {clean_tag.cache_info().hits} hits / "
+          f"{clean_tag.cache_info().misses} misses")
+    print(f"  legacy                {legacy_time:.3f}s ({rows / legacy_time:,.0f} rows/s)")
+    print(f"  validate_and_fix_tags {single_time:.3f}s ({legacy_time / single_time:.2f}x)")
+    print(f"  validate_many         {batch_time:.3f}s ({legacy_time / batch_time:.2f}x)")
+    assert mismatches == 0
+
+
+ROWS = 50000
+
+# 1) Gürültülü LLM çıktısı: noktalama, büyük harf, boşluk; ham etiketlerin çoğu tekil
+titles = [random_title() for _ in range(ROWS)]
+tag_lists = [[random_tag() for _ in range(random.randint(0, 30))] for _ in range(ROWS)]
+bench("Noisy LLM output", titles, tag_lists)
+
+# 2) Katalog yeniden doğrulama: kayıtlı etiketler sınırlı bir havuzdan, ürün başına birden çok snapshot
+pool = list({random_tag() for _ in range(3000)})
+catalog_titles = [titles[i % 5000] for i in range(ROWS)]
+catalog_tags = [random.sample(pool, 13) for _ in range(ROWS)]
+bench("Catalog re-validation", catalog_titles, catalog_tags)
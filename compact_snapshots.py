@@ -0,0 +1,21 @@
+import asyncio
+import sys
+import os
+
+# Windows yol hatasını önlemek için
+sys.path.append(os.getcwd())
+
+from app.db.session import async_session_maker
+from app.services.snapshot_compaction import compact_snapshots
+
+async def run_compaction():
+    print("🗜️ Snapshot geçmişi sıkıştırılıyor...")
+    async with async_session_maker() as db:
+        result = await compact_snapshots(db)
+    print(f"✅ Tamamlandı: {result}")
+
+if __name__ == "__main__":
+    # Cron ile periyodik çalıştırılabilir (ör. her gece)
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(run_compaction())
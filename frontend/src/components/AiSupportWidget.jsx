@@ -2,6 +2,7 @@ import React, { useState, useRef, useEffect } from 'react';
 import { useTranslation } from 'react-i18next';
 import { MessageSquare, X, Send, Bot, User, Sparkles } from 'lucide-react';
 import { API_BASE_URL } from '../config';
+import { postSSE } from '../utils/sseStream';
 
 const AiSupportWidget = () => {
     const { t } = useTranslation();
@@ -30,18 +31,28 @@ const AiSupportWidget = () => {
         setIsLoading(true);
 
         try {
-            const response = await fetch(`${API_BASE_URL}/chat/`, {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({ message: userMessage }),
-            });
-
-            if (!response.ok) throw new Error(t('ai_support.network_error'));
+            // Cevap parça parça gelir; ilk parça yeni bir AI mesajı açar, sonrakiler ona eklenir
+            let started = false;
+            const appendText = (text) => {
+                const isFirst = !started;
+                started = true;
+                setMessages(prev => {
+                    if (isFirst) return [...prev, { type: 'ai', text }];
+                    const last = prev[prev.length - 1];
+                    return [...prev.slice(0, -1), { ...last, text: last.text + text }];
+                });
+            };
 
-            const data = await response.json();
-            setMessages(prev => [...prev, { type: 'ai', text: data.response }]);
+            await postSSE(`${API_BASE_URL}/chat/stream`, { message: userMessage }, (event, data) => {
+                if (event === 'delta') {
+                    setIsLoading(false);
+                    appendText(data.text);
+                } else if (event === 'done' && !started) {
+                    appendText(data.response);
+                } else if (event === 'error') {
+                    throw new Error(data.detail || t('ai_support.network_error'));
+                }
+            });
         } catch (error) {
             console.error('Chat error:', error);
             setMessages(prev => [...prev, { type: 'ai', text: t('ai_support.connection_error') }]);
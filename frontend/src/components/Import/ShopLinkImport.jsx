@@ -2,6 +2,7 @@ import React, { useState } from 'react';
 import { useTranslation } from 'react-i18next';
 import { Link, Search, Loader2, AlertCircle, CheckCircle } from 'lucide-react';
 import { API_BASE_URL } from '../../config';
+import { postSSE } from '../../utils/sseStream';
 
 const ShopLinkImport = ({ onImportComplete }) => {
     const { t } = useTranslation();
@@ -9,6 +10,7 @@ const ShopLinkImport = ({ onImportComplete }) => {
     const [isLoading, setIsLoading] = useState(false);
     const [error, setError] = useState(null);
     const [success, setSuccess] = useState(null);
+    const [progress, setProgress] = useState(null);
 
     const validateUrl = (inputUrl) => {
         return inputUrl.includes('etsy.com/shop/') || inputUrl.includes('etsy.com');
@@ -31,24 +33,23 @@ const ShopLinkImport = ({ onImportComplete }) => {
         setIsLoading(true);
 
         try {
-            const response = await fetch(`${API_BASE_URL}/import/fetch-shop`, {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({ url: url }),
+            // İçe aktarma ilerlemesi SSE ile gelir (sayfa sayfa)
+            let finalData = null;
+            let streamError = null;
+            await postSSE(`${API_BASE_URL}/import/fetch-shop/stream`, { url: url }, (event, data) => {
+                if (event === 'progress') setProgress(data);
+                else if (event === 'done') finalData = data;
+                else if (event === 'error') streamError = data.detail;
             });
 
-            if (!response.ok) {
-                throw new Error(t('shop_link_import.fetch_error'));
+            if (streamError) {
+                throw new Error(streamError);
             }
 
-            const data = await response.json();
-
-            if (data.status === 'success') {
-                setSuccess(t('shop_link_import.success_message', { shopName: data.shop_name, count: data.products.length }));
+            if (finalData && finalData.status === 'success') {
+                setSuccess(t('shop_link_import.success_message', { shopName: finalData.shop_name, count: finalData.products.length }));
                 if (onImportComplete) {
-                    onImportComplete(data.products);
+                    onImportComplete(finalData.products);
                 }
                 setUrl('');
             } else {
@@ -59,6 +60,7 @@ const ShopLinkImport = ({ onImportComplete }) => {
             setError(err.message || t('common.error_occurred'));
         } finally {
             setIsLoading(false);
+            setProgress(null);
         }
     };
 
@@ -104,6 +106,21 @@ const ShopLinkImport = ({ onImportComplete }) => {
                 </button>
             </div>
 
+            {isLoading && progress && progress.total > 0 && (
+                <div className="mt-3">
+                    <div className="flex justify-between text-xs text-gray-500 mb-1">
+                        <span>{t('shop_link_import.progress', { fetched: progress.imported, total: progress.total })}</span>
+                        <span>{Math.min(100, Math.round((progress.imported / progress.total) * 100))}%</span>
+                    </div>
+                    <div className="w-full bg-gray-100 rounded-full h-1.5">
+                        <div
+                            className="bg-orange-500 h-1.5 rounded-full transition-all"
+                            style={{ width: `${Math.min(100, (progress.imported / progress.total) * 100)}%` }}
+                        />
+                    </div>
+                </div>
+            )}
+
             {error && (
                 <div className="mt-3 flex items-center text-sm text-red-600 bg-red-50 p-2 rounded-lg animate-fade-in">
                     <AlertCircle className="w-4 h-4 mr-2 flex-shrink-0" />
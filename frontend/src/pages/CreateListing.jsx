@@ -1,6 +1,7 @@
 import React, { useState, useRef } from 'react';
 import { useTranslation } from 'react-i18next';
 import { Wand2, Upload, Sparkles, Copy, Check, Image as ImageIcon, Palette, Layout, Monitor, Printer, Frame, Shirt, X, Camera } from 'lucide-react';
+import { postSSE } from '../utils/sseStream';
 
 const CreateListing = () => {
     const { t } = useTranslation();
@@ -8,6 +9,7 @@ const CreateListing = () => {
     const [description, setDescription] = useState('');
     const [isGenerating, setIsGenerating] = useState(false);
     const [generatedData, setGeneratedData] = useState(null);
+    const [streamText, setStreamText] = useState(''); // Üretim sırasında gelen ham metin
     const [copiedField, setCopiedField] = useState(null);
     const [imagePreview, setImagePreview] = useState(null);
     const fileInputRef = useRef(null);
@@ -33,22 +35,20 @@ const CreateListing = () => {
         setIsGenerating(true);
         setGeneratedData(null);
         setGeneratedPrompts(null);
+        setStreamText('');
 
         try {
-            const response = await fetch(`${import.meta.env.VITE_API_URL || 'http://localhost:8000/api/v1'}/generate/`, {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({ description: description })
+            let data = null;
+            await postSSE(`${import.meta.env.VITE_API_URL || 'http://localhost:8000/api/v1'}/generate/stream`, { description: description }, (event, payload) => {
+                if (event === 'delta') setStreamText(prev => prev + payload.text);
+                else if (event === 'result') data = payload;
+                else if (event === 'error') throw new Error(payload.seo_title || t('create_listing.generation_failed'));
             });
 
-            if (!response.ok) {
+            if (!data) {
                 throw new Error(t('create_listing.generation_failed'));
             }
 
-            const data = await response.json();
-
             // Transform API response to match component state structure
             const transformedData = {
                 title: data.seo_title,
@@ -76,6 +76,7 @@ const CreateListing = () => {
             console.error("Generation error:", error);
         } finally {
             setIsGenerating(false);
+            setStreamText('');
         }
     };
 
@@ -302,7 +303,15 @@ const CreateListing = () => {
 
             {/* RIGHT PANEL: OUTPUT */}
             <div className="flex-1 bg-gray-50 rounded-2xl border border-gray-200 p-8 flex flex-col h-full overflow-y-auto relative">
-                {!generatedData ? (
+                {!generatedData && isGenerating && streamText ? (
+                    <div className="bg-white p-6 rounded-xl shadow-sm border border-gray-200">
+                        <div className="flex items-center mb-3 text-indigo-600">
+                            <Sparkles className="w-4 h-4 mr-2 animate-pulse" />
+                            <span className="text-xs font-bold uppercase tracking-wider">{t('create_listing.generating')}</span>
+                        </div>
+                        <pre className="text-xs text-gray-500 font-mono whitespace-pre-wrap break-words">{streamText.slice(-1500)}</pre>
+                    </div>
+                ) : !generatedData ? (
                     <div className="absolute inset-0 flex flex-col items-center justify-center text-center p-8 opacity-50">
                         <div className="w-24 h-24 bg-white rounded-full flex items-center justify-center mb-6 shadow-sm">
                             <Sparkles className="w-10 h-10 text-gray-300" />
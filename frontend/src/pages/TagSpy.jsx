@@ -19,7 +19,7 @@ const TagSpy = () => {
         setResults(null);
 
         const controller = new AbortController();
-        const timeoutId = setTimeout(() => controller.abort(), 10000); // 10 second timeout
+        const timeoutId = setTimeout(() => controller.abort(), 60000); // Büyük mağazalar sayfa sayfa taranır
 
         try {
             const response = await fetch('http://localhost:8000/api/v1/spy/analyze', {
@@ -0,0 +1,51 @@
+/**
+ * POST isteği atıp Server-Sent Events yanıtını parça parça okur.
+ * EventSource sadece GET desteklediği için fetch + ReadableStream kullanılır.
+ *
+ * @param {string} url
+ * @param {object} body - JSON olarak gönderilir
+ * @param {(event: string, data: any) => void} onEvent - Her "event/data" bloğu için çağrılır
+ */
+export const postSSE = async (url, body, onEvent) => {
+    const response = await fetch(url, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            'Accept': 'text/event-stream',
+        },
+        body: JSON.stringify(body),
+    });
+
+    if (!response.ok || !response.body) {
+        throw new Error(`HTTP ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    const dispatch = (block) => {
+        let event = 'message';
+        const dataLines = [];
+        for (const line of block.split('\n')) {
+            if (line.startsWith('event:')) event = line.slice(6).trim();
+            else if (line.startsWith('data:')) dataLines.push(line.slice(5).trim());
+        }
+        if (dataLines.length === 0) return;
+        onEvent(event, JSON.parse(dataLines.join('\n')));
+    };
+
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true }).replace(/\r\n/g, '\n');
+
+        let boundary = buffer.indexOf('\n\n');
+        while (boundary !== -1) {
+            dispatch(buffer.slice(0, boundary));
+            buffer = buffer.slice(boundary + 2);
+            boundary = buffer.indexOf('\n\n');
+        }
+    }
+    if (buffer.trim()) dispatch(buffer);
+};
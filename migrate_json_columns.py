@@ -0,0 +1,82 @@
+import json
+from sqlalchemy import text
+from app.db.session import engine
+
+# Virgüllü metin olarak saklanan kolonlar -> JSON liste
+COMMA_COLUMNS = ["tags", "tags_focus", "tags_long_tail", "tags_aesthetic", "tags_creative"]
+# JSON metni olarak saklanan kolonlar -> native JSON (varsayılan değerleriyle)
+JSON_STRING_COLUMNS = {"monthly_popularity": [], "traffic_data": {}}
+
+def convert_comma(value):
+    if value is None or value == "": return []
+    if isinstance(value, list): return value
+    stripped = value.strip()
+    if stripped.startswith("["):
+        # Daha önce dönüştürülmüş satır
+        try: return json.loads(stripped)
+        except json.JSONDecodeError: pass
+    return [tag.strip() for tag in value.split(",")]
+
+def convert_json_string(value, default):
+    if value is None or value == "": return default
+    if isinstance(value, (list, dict)): return value
+    try:
+        return json.loads(value)
+    except json.JSONDecodeError:
+        return default
+
+def is_postgres_jsonb(conn, column):
+    row = conn.execute(text(
+        "SELECT data_type FROM information_schema.columns WHERE table_name = 'listings' AND column_name = :c"
+    ), {"c": column}).first()
+    return row is not None and row[0] == "jsonb"
+
+def migrate():
+    is_postgres = engine.dialect.name == "postgresql"
+    columns = COMMA_COLUMNS + list(JSON_STRING_COLUMNS)
+
+    with engine.connect() as conn:
+        if is_postgres:
+            columns = [c for c in columns if not is_postgres_jsonb(conn, c)]
+            if not columns:
+                print("All columns are already JSONB.")
+
+        if columns:
+            # 1. Satırları geçerli JSON metnine çevir (kolon tipi henüz değişmedi)
+            rows = conn.execute(text(f"SELECT id, {', '.join(columns)} FROM listings")).mappings().all()
+            updates = []
+            for row in rows:
+                params = {"id": row["id"]}
+                for column in columns:
+                    if column in JSON_STRING_COLUMNS:
+                        params[column] = json.dumps(convert_json_string(row[column], JSON_STRING_COLUMNS[column]))
+                    else:
+                        params[column] = json.dumps(convert_comma(row[column]))
+                updates.append(params)
+
+            if updates:
+                assignments = ", ".join(f"{c} = :{c}" for c in columns)
+                conn.execute(text(f"UPDATE listings SET {assignments} WHERE id = :id"), updates)
+            print(f"Converted {len(updates)} rows ({', '.join(columns)}).")
+
+            # 2. Postgres: kolon tipini JSONB yap (SQLite'ta JSON zaten TEXT olarak saklanır)
+            if is_postgres:
+                for column in columns:
+                    conn.execute(text(f"ALTER TABLE listings ALTER COLUMN {column} DROP DEFAULT"))
+                    conn.execute(text(f"ALTER TABLE listings ALTER COLUMN {column} TYPE JSONB USING {column}::jsonb"))
+                    print(f"Column {column} is now JSONB.")
+
+        # 3. Etiket sorguları için GIN indeksi
+        if is_postgres:
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_listings_tags_gin ON listings USING gin (tags)"))
+            print("GIN index ix_listings_tags_gin ready.")
+
+        conn.commit()
+
+if __name__ == "__main__":
+    print("Migrating listings to native JSON columns...")
+    try:
+        migrate()
+        print("Migration complete.")
+    except Exception as e:
+        print(f"Migration error: {e}")
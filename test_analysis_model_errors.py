@@ -0,0 +1,107 @@
+import asyncio
+import io
+import json
+import os
+
+import httpx
+
+# Geçici veritabanı: geliştirme veritabanını kirletmesin (app importlarından önce)
+TEST_DB = "test_analysis_model_errors.db"
+os.environ["DATABASE_URL"] = f"sqlite:///./{TEST_DB}"
+os.environ["GEMINI_API_KEY"] = "test-key"
+
+from PIL import Image
+
+from app.services.analysis_pipeline import AnalysisModelError, run_analysis_pipeline
+from app.core.http_pool import HTTPClientPool, get_http_pool
+from app.db.base import Base
+from app.db.session import async_engine, async_session_maker
+from app.models import AnalysisJob, Listing
+from app.services.job_queue import claim_next_job, enqueue_job, process_job
+
+# Gemini hata yanıtlarında analiz kaydedilmemeli (özellikle input hash); sonraki istek önbellekten boş sonuç almamalı
+buf = io.BytesIO()
+Image.new("RGB", (64, 64), (200, 10, 10)).save(buf, "PNG")
+IMAGE = buf.getvalue()
+GOOD = {"suggested_title": "Red Boho Vase", "tags_pool_20": ["boho vase", "ceramic"], "visual_data": {"is_sharp": True}}
+
+SCENARIOS = [
+    ("503 html", httpx.Response(503, text="<html>Service Unavailable</html>"), True),
+    ("429 json", httpx.Response(429, json={"error": {"code": 429, "message": "quota"}}), True),
+    ("400 json", httpx.Response(400, json={"error": {"code": 400, "message": "bad request"}}), False),
+    ("200 non-json", httpx.Response(200, text="not json"), True),
+    ("200 no candidates", httpx.Response(200, json={"promptFeedback": {"blockReason": "SAFETY"}}), True),
+    ("200 empty analysis", httpx.Response(200, json={"candidates": [{"content": {"parts": [{"text": "{}"}]}}]}), True),
+]
+current = {"response": None}
+
+
+def handler(request: httpx.Request) -> httpx.Response:
+    if "generativelanguage" in str(request.url):
+        return current["response"]
+    return httpx.Response(200, content=IMAGE, headers={"content-type": "image/png"})
+
+
+async def main():
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_session_maker() as db:
+        db.add(Listing(id="L1", title="Boho vase red", image_url="http://img.test/a.png", listing_type="mine"))
+        await db.commit()
+
+    http = HTTPClientPool()
+    http.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    for name, response, retryable in SCENARIOS:
+        current["response"] = response
+        async with async_session_maker() as db:
+            listing = await db.get(Listing, "L1")
+            try:
+                await run_analysis_pipeline(db, http, listing, listing.image_url, listing.title)
+                raise AssertionError(f"{name}: hata bekleniyordu")
+            except AnalysisModelError as e:
+                await db.rollback()
+                assert e.retryable == retryable, name
+                print(f"{name}: {e} (retryable={e.retryable})")
+        async with async_session_maker() as db:
+            listing = await db.get(Listing, "L1")
+            assert not listing.is_analyzed and not listing.analysis_input_hash, name
+
+    # Geçerli yanıt kaydedilir
+    current["response"] = httpx.Response(200, json={"candidates": [{"content": {"parts": [{"text": json.dumps(GOOD)}]}}]})
+    async with async_session_maker() as db:
+        listing = await db.get(Listing, "L1")
+        result = await run_analysis_pipeline(db, http, listing, listing.image_url, listing.title)
+        assert listing.is_analyzed and listing.analysis_input_hash and result.suggested_title == "Red Boho Vase"
+    print("Valid response persisted")
+
+    # Kuyruk: 429/5xx/bozuk yanıt backoff ile tekrar kuyruğa, diğer 4xx doğrudan failed
+    pool = get_http_pool()
+    await pool.client.aclose()
+    pool.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    for name, response, retryable in SCENARIOS:
+        current["response"] = response
+        job = await enqueue_job("L1", "http://img.test/a.png", "Boho vase red", force_refresh=True)
+        claimed = await claim_next_job("test-worker")
+        assert claimed and claimed.id == job.id, name
+        await process_job(claimed, "test-worker")
+        async with async_session_maker() as db:
+            job = await db.get(AnalysisJob, job.id)
+            assert job.status == ("queued" if retryable else "failed"), (name, job.status)
+            assert job.attempts == 1 and "Gemini" in job.error, name
+            if retryable:
+                job.status = "failed"  # Sonraki senaryo bu işi tekrar almasın
+                await db.commit()
+        print(f"job {name}: {'retry scheduled' if retryable else 'failed permanently'}")
+    await pool.aclose()
+
+    await http.aclose()
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    finally:
+        if os.path.exists(TEST_DB):
+            os.remove(TEST_DB)
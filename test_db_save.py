@@ -5,15 +5,23 @@ import os
 # Windows yol hatasını önlemek için bu ayar şart
 sys.path.append(os.getcwd())
 
-from app.db.session import async_session_maker
-from app.models import Shop, Listing, User
-from app.services.mock_etsy import MockEtsyService
+# Geçici veritabanı: geliştirme veritabanını kirletmesin (app importlarından önce)
+TEST_DB = "test_db_save.db"
+os.environ["DATABASE_URL"] = f"sqlite:///./{TEST_DB}"
+
 from sqlalchemy import select
-from datetime import datetime
+
+from app.db.base import Base
+from app.db.session import async_engine, async_session_maker
+from app.models import Listing
+from app.services.mock_etsy import MockEtsyService
+
+MOCK_SHOP_ID = "MOCK_SHOP_1"
+
 
 async def test_save_mock_data():
     print("🛠️ Simülasyon Başlatılıyor...")
-    
+
     try:
         mock_service = MockEtsyService()
         data = mock_service.get_mock_listing()
@@ -21,64 +29,51 @@ async def test_save_mock_data():
         print(f"HATA: Mock servisi başlatılamadı. Detay: {e}")
         return
 
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    listing_id = str(data["listing_id"])
+    # İki tur: ilki kaydeder, ikincisi aynı ürünü tekrar eklememeli
+    for _ in range(2):
+        async with async_session_maker() as db:
+            existing_listing = await db.get(Listing, listing_id)
+
+            if existing_listing:
+                print("ℹ️ Bu ürün zaten veritabanında var, tekrar eklenmedi.")
+            else:
+                print(f"📦 Ürün Kaydediliyor: {data['title'][:30]}...")
+                listing = Listing(
+                    id=listing_id,
+                    title=data["title"],
+                    price=data["price"]["amount"] / data["price"]["divisor"],
+                    image_url=data["images"][0] if data.get("images") else "",
+                    listing_type="mine",
+                    shop_id=MOCK_SHOP_ID,
+                    tags=data["tags"],
+                )
+                db.add(listing)
+                await db.commit()
+                print("✅ BAŞARILI! Sahte veri veritabanına işlendi.")
+
     async with async_session_maker() as db:
-        # 1. Kullanıcı Kontrolü
-        result = await db.execute(select(User).where(User.email == "test@demo.com"))
-        user = result.scalars().first()
-        
-        if not user:
-            print("👤 Test Kullanıcısı Oluşturuluyor...")
-            user = User(email="test@demo.com", hashed_password="fake_hash")
-            db.add(user)
-            await db.commit()
-            await db.refresh(user)
-            
-        # 2. Dükkan Kontrolü
-        result = await db.execute(select(Shop).where(Shop.etsy_shop_id == "MOCK_SHOP_1"))
-        shop = result.scalars().first()
-        
-        if not shop:
-            print("🏪 Test Dükkanı Oluşturuluyor...")
-            shop = Shop(
-                user_id=user.id,
-                etsy_shop_id="MOCK_SHOP_1",
-                shop_name="Demo Vintage Store",
-                access_token="fake_token",
-                refresh_token="fake_refresh",
-                token_expires_at=datetime.utcnow()
-            )
-            db.add(shop)
-            await db.commit()
-            await db.refresh(shop)
-
-        # 3. Ürünü Kaydet
-        result_listing = await db.execute(select(Listing).where(Listing.etsy_listing_id == data["listing_id"]))
-        existing_listing = result_listing.scalars().first()
-
-        if existing_listing:
-            print("ℹ️ Bu ürün zaten veritabanında var, tekrar eklenmedi.")
-        else:
-            print(f"📦 Ürün Kaydediliyor: {data['title'][:30]}...")
-            listing = Listing(
-                shop_id=shop.id,
-                etsy_listing_id=data["listing_id"],
-                title=data["title"],
-                description=data["description"],
-                state=data["state"],
-                url=data["url"],
-                price_amount=data["price"]["amount"],
-                price_divisor=data["price"]["divisor"],
-                tags=",".join(data["tags"]),
-                materials=",".join(data["materials"]),
-                creation_timestamp=123456,
-                last_modified_timestamp=123456
-            )
-            
-            db.add(listing)
-            await db.commit()
-            print("✅ BAŞARILI! Sahte veri veritabanına işlendi.")
+        saved = (await db.execute(select(Listing).where(Listing.shop_id == MOCK_SHOP_ID))).scalars().all()
+        assert len(saved) == 1, f"Beklenen 1 ürün, bulunan {len(saved)}"
+        assert saved[0].price == 45.0 and saved[0].tags == data["tags"]
+        print(f"🔎 Kontrol: {saved[0].id} | {saved[0].price} | {', '.join(saved[0].tags)}")
+
+
+async def main():
+    try:
+        await test_save_mock_data()
+    finally:
+        await async_engine.dispose()
+
 
 if __name__ == "__main__":
     if sys.platform == 'win32':
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
-    asyncio.run(test_save_mock_data())
\ No newline at end of file
+    try:
+        asyncio.run(main())
+    finally:
+        if os.path.exists(TEST_DB):
+            os.remove(TEST_DB)
@@ -0,0 +1,117 @@
+import asyncio
+import os
+import random
+import time
+
+import httpx
+
+# Geçici veritabanı: geliştirme veritabanını kirletmesin (app importlarından önce)
+TEST_DB = "test_etsy_crawler.db"
+os.environ["DATABASE_URL"] = f"sqlite:///./{TEST_DB}"
+
+from sqlalchemy import select, func
+
+from app.core.config import settings
+from app.core.http_pool import HTTPClientPool
+from app.core.rate_limit import TokenBucket
+from app.db.base import Base
+from app.db.session import async_engine, async_session_maker
+from app.models import Listing
+from app.services.etsy_client import EtsyClient
+from app.services.shop_import import import_shop
+
+# Sahte Etsy v3: 5.000 aktif ürünlü mağaza, istek başına gecikme, ara sıra 429 (Retry-After) ve 503.
+# Saniyelik limit aşılırsa 429 döner; crawler'ın token bucket'ı buna hiç takılmamalı.
+LISTING_COUNT = 5000
+LATENCY = 0.05
+RATE_LIMIT = 10
+random.seed(1)
+
+LISTINGS = [
+    {
+        "listing_id": 1_000_000 + i,
+        "title": f"Boho Wall Art Print {i}",
+        "price": {"amount": 1000 + i, "divisor": 100, "currency_code": "USD"},
+        "tags": ["boho", "wall art", f"print {i % 50}"],
+        "views": i % 300,
+        "num_favorers": i % 40,
+        "images": [{"url_570xN": f"https://img.test/{i}.jpg"}],
+    }
+    for i in range(LISTING_COUNT)
+]
+
+stats = {"requests": 0, "throttled": 0, "injected_429": 0, "injected_503": 0}
+window = []
+
+
+async def fake_etsy(request: httpx.Request) -> httpx.Response:
+    stats["requests"] += 1
+    now = time.monotonic()
+    window[:] = [t for t in window if now - t < 1.0]
+    window.append(now)
+    if len(window) > RATE_LIMIT * 1.5:
+        stats["throttled"] += 1
+        return httpx.Response(429, headers={"retry-after": "1"})
+
+    await asyncio.sleep(LATENCY)
+    path = request.url.path
+    if path.endswith("/application/shops"):
+        return httpx.Response(200, json={"count": 1, "results": [{"shop_id": 42, "shop_name": "TestShop"}]})
+
+    roll = random.random()
+    if roll < 0.03:
+        stats["injected_503"] += 1
+        return httpx.Response(503)
+    if roll < 0.05:
+        stats["injected_429"] += 1
+        return httpx.Response(429, headers={"retry-after": "0.5"})
+
+    limit = int(request.url.params.get("limit", 25))
+    offset = int(request.url.params.get("offset", 0))
+    return httpx.Response(200, json={"count": LISTING_COUNT, "results": LISTINGS[offset:offset + limit]},
+                          headers={"x-limit-per-second": str(RATE_LIMIT)})
+
+
+async def main():
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    pool = HTTPClientPool()
+    pool.client = httpx.AsyncClient(transport=httpx.MockTransport(fake_etsy))
+    client = EtsyClient(http=pool, bucket=TokenBucket(settings.ETSY_RATE_PER_SECOND, settings.ETSY_RATE_BURST))
+
+    updates = []
+
+    async def on_progress(progress):
+        updates.append(progress)
+
+    start = time.perf_counter()
+    result = await import_shop("TestShop", client=client, on_progress=on_progress)
+    elapsed = time.perf_counter() - start
+
+    async with async_session_maker() as db:
+        stored = await db.scalar(select(func.count()).select_from(Listing).where(Listing.shop_id == "42"))
+        sample = await db.get(Listing, "1004999")
+
+    print(f"Imported: {result['imported']}/{LISTING_COUNT}, stored: {stored}, progress events: {len(updates)}")
+    print(f"Sample: {sample.title} | {sample.price} | {sample.tags} | {sample.image_url}")
+    print(f"Time: {elapsed:.2f}s, fake Etsy stats: {stats}, bucket: {client.bucket.get_stats()}")
+    assert result["imported"] == stored == LISTING_COUNT
+    assert sample.price == 59.99 and sample.tags == ["boho", "wall art", "print 49"]
+
+    # İkinci içe aktarma: upsert, çift kayıt oluşmaz
+    await import_shop("TestShop", client=client)
+    async with async_session_maker() as db:
+        assert await db.scalar(select(func.count()).select_from(Listing)) == LISTING_COUNT
+    print("Re-import: no duplicates")
+
+    await pool.aclose()
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    finally:
+        if os.path.exists(TEST_DB):
+            os.remove(TEST_DB)
@@ -0,0 +1,80 @@
+import json
+import threading
+from types import SimpleNamespace
+
+from app.core.traffic_engine import TrafficIntelligence, clear_ga4_caches, get_ga4_cache_stats
+
+# GA4'e gitmeden önbelleği test eder: run_report çağrılarını sayan sahte client
+
+
+class FakeGA4Client:
+    instances = 0
+
+    def __init__(self, credentials):
+        FakeGA4Client.instances += 1
+        self.credentials = credentials
+        self.calls = 0
+
+    def run_report(self, request):
+        self.calls += 1
+        rows = [
+            ("Organic Search", 120), ("Organic Social", 40), ("Direct", 30), ("Unassigned", 5), ("Affiliates", 7),
+        ]
+        return SimpleNamespace(rows=[
+            SimpleNamespace(
+                dimension_values=[SimpleNamespace(value=channel)],
+                metric_values=[SimpleNamespace(value="0"), SimpleNamespace(value=str(sessions))],
+            )
+            for channel, sessions in rows
+        ])
+
+
+clients = []
+
+def factory(credentials):
+    client = FakeGA4Client(credentials)
+    clients.append(client)
+    return client
+
+
+def make_settings(property_id="123", project="demo"):
+    return SimpleNamespace(ga4_property_id=property_id, ga4_client_secret=json.dumps({"project_id": project}))
+
+
+clear_ga4_caches()
+settings = make_settings()
+start_stats = get_ga4_cache_stats()["reports"]
+
+# 1. Aynı property için N analiz -> tek GA4 çağrısı
+results = [TrafficIntelligence(lqs_score=70, settings=settings, client_factory=factory).generate_data() for _ in range(50)]
+assert all(r == results[0] for r in results)
+assert results[0]["total_visits"] == 202, results[0]
+assert next(s for s in results[0]["sources"] if s["name"] == "Other")["value"] == 12
+assert FakeGA4Client.instances == 1 and sum(c.calls for c in clients) == 1
+print("Sequential: 50 analyses ->", sum(c.calls for c in clients), "GA4 call")
+
+# 2. Dönen sonucu değiştirmek önbelleği bozmaz
+results[0]["sources"].clear()
+assert TrafficIntelligence(lqs_score=70, settings=settings, client_factory=factory).generate_data()["sources"]
+
+# 3. Eşzamanlı ıskalamalar tek çağrıya düşer
+clear_ga4_caches()
+clients.clear()
+threads = [threading.Thread(target=lambda: TrafficIntelligence(lqs_score=50, settings=settings, client_factory=factory).generate_data()) for _ in range(20)]
+for t in threads: t.start()
+for t in threads: t.join()
+assert sum(c.calls for c in clients) == 1, sum(c.calls for c in clients)
+print("Concurrent: 20 analyses ->", sum(c.calls for c in clients), "GA4 call")
+
+# 4. Farklı property yeni rapor, aynı credentials aynı client
+TrafficIntelligence(lqs_score=50, settings=make_settings(property_id="456"), client_factory=factory).generate_data()
+assert len(clients) == 1 and clients[0].calls == 2
+# Farklı credentials yeni client
+TrafficIntelligence(lqs_score=50, settings=make_settings(property_id="789", project="other"), client_factory=factory).generate_data()
+assert len(clients) == 2
+
+stats = get_ga4_cache_stats()
+print("Cache stats:", stats)
+assert stats["reports"]["misses"] - start_stats["misses"] == 4  # 1 + 1 (temizlendikten sonra) + 2 yeni property
+assert stats["reports"]["hits"] - start_stats["hits"] == 50 + 19
+print("GA4 cache tests passed.")
@@ -0,0 +1,64 @@
+import asyncio
+import base64
+import os
+import shutil
+import tempfile
+
+import httpx
+
+from app.core.http_pool import HTTPClientPool
+from app.services.image_cache import ImageCache
+
+# Disk önbelleği: max_bytes'tan büyük görsel yine okunabilmeli (yazıldığı anda silinmemeli) ve
+# base64 kopyaları dahil diskteki gerçek kullanım sınırı aşmamalı.
+MAX_BYTES = 10_000
+IMAGES = {f"https://img.test/{i}.jpg": os.urandom(3_000) for i in range(6)}
+IMAGES["https://img.test/huge.jpg"] = os.urandom(20_000)
+
+
+def handler(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, content=IMAGES[str(request.url)], headers={"content-type": "image/jpeg"})
+
+
+def disk_bytes(cache: ImageCache) -> int:
+    return sum(os.path.getsize(os.path.join(cache.blob_dir, name)) for name in os.listdir(cache.blob_dir))
+
+
+async def main(root: str):
+    cache = ImageCache(root=root, max_bytes=MAX_BYTES, fresh_seconds=3600)
+    http = HTTPClientPool()
+    http.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    # 1. Büyük görsel: indirme ve türetilmiş kopya bellekten sunulur
+    huge = IMAGES["https://img.test/huge.jpg"]
+    image = await cache.fetch("https://img.test/huge.jpg", http)
+    assert await image.read_bytes() == huge and await image.base64() == base64.b64encode(huge).decode()
+    derived = await cache.put_derived("huge:512", huge, "image/webp")
+    assert await derived.read_bytes() == huge and derived.size == len(huge)
+    print(f"Oversized image served from memory: {cache.get_stats()['oversized']} times")
+
+    # 2. Base64 kopyaları sınıra dahil: takip edilen boyut diskteki gerçek boyutla aynı, sınırın altında
+    for url, content in IMAGES.items():
+        if "huge" in url:
+            continue
+        image = await cache.fetch(url, http)
+        assert await image.base64() == base64.b64encode(content).decode()
+        stats = cache.get_stats()
+        assert stats["bytes"] == disk_bytes(cache) <= MAX_BYTES, (stats, disk_bytes(cache))
+    print(f"Tracked {cache.get_stats()['bytes']} bytes == on disk {disk_bytes(cache)} bytes "
+          f"(cap {MAX_BYTES}, {cache.get_stats()['evictions']} evictions)")
+
+    # 3. Yeniden açılan önbellek base64 kopyalarını da sayar
+    reopened = ImageCache(root=root, max_bytes=MAX_BYTES, fresh_seconds=3600)
+    assert reopened.get_stats()["bytes"] == disk_bytes(reopened)
+    print("Reloaded index counts sidecars")
+
+    await http.aclose()
+
+
+if __name__ == "__main__":
+    root = tempfile.mkdtemp(prefix="image_cache_test_")
+    try:
+        asyncio.run(main(root))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
@@ -0,0 +1,43 @@
+import random
+import time
+
+from app.core.keyword_index import PrefixIndex, count_terms, title_ngrams
+
+# Öneri indeksinin sıralamasını ve gecikmesini kontrol eder
+random.seed(7)
+
+WORDS = ["boho", "wall", "art", "print", "vintage", "ceramic", "vase", "gift", "minimalist", "poster",
+         "custom", "name", "necklace", "gold", "silver", "ring", "botanical", "line", "abstract", "kids"]
+
+rows = []
+for _ in range(20000):
+    tags = [" ".join(random.sample(WORDS, random.randint(1, 3))) for _ in range(13)]
+    title = " ".join(random.choices(WORDS, k=10))
+    rows.append(tags + title_ngrams(title))
+
+start = time.perf_counter()
+counts = count_terms(rows)
+index = PrefixIndex()
+index.build(counts)
+print(f"Terms: {len(index)}, build: {time.perf_counter() - start:.2f}s")
+
+# Sıralama: kaba kuvvet ile aynı olmalı
+mismatches = 0
+for prefix in ["b", "bo", "boho w", "vintage ", "gold r", "zzz"]:
+    expected = sorted((t for t in counts if t.startswith(prefix)), key=lambda t: (-counts[t], len(t), t))[:10]
+    got = [t for t, _ in index.suggest(prefix, 10)]
+    mismatches += got != expected
+print(f"Ranking mismatches: {mismatches}")
+
+# Artımlı güncelleme sonrası yeni terim hemen görünmeli
+index.update({"boho wall art xl": 10**6})
+assert index.suggest("boho wa", 1)[0][0] == "boho wall art xl"
+index.update({"boho wall art xl": -10**6})
+assert index.count("boho wall art xl") == 0
+
+queries = [random.choice(WORDS)[:random.randint(1, 4)] for _ in range(5000)]
+start = time.perf_counter()
+for q in queries:
+    index.suggest(q, 10)
+elapsed = time.perf_counter() - start
+print(f"Lookups: {len(queries)}, avg: {elapsed / len(queries) * 1e6:.1f}µs")
@@ -0,0 +1,185 @@
+import asyncio
+import os
+
+# Geçici veritabanı: geliştirme veritabanını kirletmesin (app importlarından önce)
+TEST_DB = "test_listing_documents.db"
+os.environ["DATABASE_URL"] = f"sqlite:///./{TEST_DB}"
+
+from sqlalchemy import select, update
+
+from app.db.base import Base
+from app.db.session import async_engine, async_session_maker
+from app.models import Listing, ListingSnapshot
+from app.services import suggestion_index, tag_graph
+from app.services.shop_import import import_shop
+from app.services.suggestion_index import (
+    LISTING_DOCUMENT_COLUMNS, build_suggestion_index, get_suggestion_index, listing_terms,
+    record_listing_terms, snapshot_terms,
+)
+from app.services.sync_service import sync_shop
+from app.services.tag_graph import (
+    build_tag_graph, get_tag_graph, listing_tags, record_listing_tags, snapshot_tags,
+)
+
+# Bellek içi öneri indeksi ve etiket grafiği, artımlı güncellemelerden sonra tam rebuild ile aynı
+# sayımları vermeli: import/senkronla gelen ürünler eklenmeli, analizde sadece gerçekten sayılmış
+# terimler/belgeler düşülmeli.
+
+
+class FakeEtsyClient:
+    """find_shop + sayfalı tarama; senkron için updated_timestamp'e göre azalan sıra."""
+
+    def __init__(self, items):
+        self.items = items
+
+    async def find_shop(self, shop_name):
+        return {"shop_id": 42, "shop_name": shop_name}
+
+    async def get_all_active_listings(self, shop_id, on_page=None, **kwargs):
+        await on_page(list(self.items.values()), len(self.items))
+
+    async def get_listings_updated_since(self, shop_id, since, on_page=None, **kwargs):
+        fresh = sorted((i for i in self.items.values() if i["updated_timestamp"] > since),
+                       key=lambda i: i["updated_timestamp"], reverse=True)
+        await on_page(fresh, len(fresh))
+
+
+def etsy_item(listing_id, title, tags, ts):
+    return {"listing_id": listing_id, "title": title, "tags": tags, "updated_timestamp": ts,
+            "price": {"amount": 1500, "divisor": 100}, "images": [{"url_570xN": f"https://img.test/{listing_id}.jpg"}]}
+
+
+async def all_documents():
+    async with async_session_maker() as db:
+        listings = (await db.execute(select(*LISTING_DOCUMENT_COLUMNS))).all()
+        snapshots = (await db.execute(select(ListingSnapshot))).scalars().all()
+    return listings, snapshots
+
+
+async def index_counts():
+    listings, snapshots = await all_documents()
+    index = get_suggestion_index()
+    terms = {t for row in listings for t in listing_terms(row)} | {t for s in snapshots for t in snapshot_terms(s)}
+    return {term: index.count(term) for term in terms}
+
+
+def graph_state(tags):
+    graph = get_tag_graph()
+    pairs = {(a, b): graph.pair_count(a, b) for a in tags for b in tags if a < b}
+    return graph.documents, graph.get_stats()["pairs"], {t: graph.count(t) for t in tags}, pairs
+
+
+async def assert_graph_matches_rebuild(label):
+    listings, snapshots = await all_documents()
+    tags = {t for row in listings for t in listing_tags(row)} | {t for s in snapshots for t in snapshot_tags(s)}
+    tags = {t.lower() for t in tags if t}
+    incremental = graph_state(tags)
+    async with async_session_maker() as db:
+        await build_tag_graph(db)
+    rebuilt = graph_state(tags)
+    assert incremental == rebuilt, f"{label}: {incremental} != {rebuilt}"
+    print(f"{label}: tag graph matches rebuild ({rebuilt[0]} documents, {rebuilt[1]} pairs)")
+
+
+async def assert_matches_rebuild(label):
+    await assert_graph_matches_rebuild(label)
+    incremental, incremental_size = await index_counts(), len(get_suggestion_index())
+    async with async_session_maker() as db:
+        await build_suggestion_index(db)
+    rebuilt = await index_counts()
+    diff = {t: (incremental[t], rebuilt[t]) for t in rebuilt if incremental[t] != rebuilt[t]}
+    # Terim sayısı da aynı olmalı (DB'de artık olmayan terim indekste kalmamalı)
+    assert not diff and incremental_size == len(get_suggestion_index()), f"{label}: {diff}"
+    print(f"{label}: suggestion index matches rebuild ({len(rebuilt)} terms)")
+
+
+async def analyze(listing_id, new_tags, suggested_title):
+    """Analiz hattının kaydettiği şeyin özeti: ürün etiketleri/başlığı değişir, yeni snapshot eklenir."""
+    async with async_session_maker() as db:
+        listing = await db.get(Listing, listing_id)
+        snapshot = ListingSnapshot(listing_id=listing_id, lqs_score=70, suggested_title=suggested_title,
+                                   suggested_tags=",".join(new_tags))
+        listing.tags, listing.suggested_title, listing.is_analyzed = new_tags, suggested_title, True
+        db.add(snapshot)
+        await db.commit()
+        record_listing_terms(listing_id, listing_terms(listing), snapshot_terms(snapshot))
+        record_listing_tags(listing_id, listing_tags(listing), snapshot_tags(snapshot))
+
+
+async def run():
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_session_maker() as db:
+        for i in range(2):
+            db.add(Listing(id=f"seed-{i}", title="Boho Wall Art", image_url="", listing_type="mine", tags=["boho", "wall art"]))
+        await db.commit()
+        await build_suggestion_index(db)
+        await build_tag_graph(db)
+
+    # 0. İki {boho, wall art} belgesiyle kurulan grafiğe {boho, wall art} ürünü içe aktarılır, analiz
+    #    {boho, nursery decor} önerir: belgeler = 2 seed + ürün + snapshot = 4, count(boho) = 4,
+    #    çift(boho, wall art) = 2 (eskiden içe aktarılan belge hiç eklenmeden çıkarılıyordu: 3/3/1)
+    client = FakeEtsyClient({7: etsy_item(7, "Boho Wall Art", ["boho", "wall art"], 900)})
+    await import_shop("testshop", client=client)
+    await analyze("7", ["boho", "nursery decor"], "Boho Nursery Decor")
+    graph = get_tag_graph()
+    assert (graph.documents, graph.count("boho"), graph.pair_count("boho", "wall art")) == (4, 4, 2)
+    await assert_matches_rebuild("after importing and analyzing a listing")
+
+    # 1. İçe aktarma sonrası gelen ürünler indekse eklenir
+    items = {i: etsy_item(i, f"Boho Wall Art Print {i}", ["boho", "wall art", f"print {i}"], 1000 + i) for i in range(1, 4)}
+    client = FakeEtsyClient(items)
+    await import_shop("testshop", client=client)
+    await assert_matches_rebuild("after import")
+
+    # 2. İçe aktarılmış ürünün analizi: Etsy etiketleri düşülür, önerilenler eklenir
+    await analyze("1", ["boho decor", "gallery wall"], "Boho Gallery Wall Print")
+    await assert_matches_rebuild("after analysis of imported listing")
+
+    # 3. Senkron: analiz edilmemiş üründe etiketler, analiz edilmişte başlık değişir; yeni ürün gelir
+    items[2].update(tags=["minimalist", "line art"], updated_timestamp=5000)
+    items[1].update(title="Abstract Canvas Print", updated_timestamp=5001)
+    items[9] = etsy_item(9, "Kids Room Poster", ["kids", "poster"], 5002)
+    await sync_shop("testshop", client=client)
+    await assert_matches_rebuild("after sync")
+
+    # 4. Başka süreç (gunicorn worker'ı) ürünü değiştirdi, bu süreç habersiz; sonra burada analiz edildi.
+    #    Düşülen, DB'deki ara hal değil bu sürecin saydığı haldir; sonuç yine DB ile aynı.
+    async with async_session_maker() as db:
+        await db.execute(update(Listing).where(Listing.id == "3").values(_tags=["elsewhere tag"], title="Other Worker Title"))
+        await db.commit()
+    await analyze("3", ["boho nursery"], "Boho Nursery Art")
+    await assert_matches_rebuild("after out-of-process change")
+    assert get_suggestion_index().count("elsewhere tag") == 0 and get_tag_graph().count("elsewhere tag") == 0
+
+    # 5. Bu süreçte hiç sayılmamış ürün (ör. başka worker'da eklenmiş) analizde hiçbir şey düşürmez,
+    #    sadece yeni hali eklenir
+    suggestion_index._listing_docs.pop("seed-0")
+    tag_graph._listing_docs.pop("seed-0")
+    index, graph = get_suggestion_index(), get_tag_graph()
+    before = {term: index.count(term) for term in ("boho", "wall art", "boho wall art")}
+    graph_before = (graph.documents, graph.count("boho"), graph.count("wall art"))
+    await analyze("seed-0", ["boho"], "")
+    async with async_session_maker() as db:
+        added = listing_terms(await db.get(Listing, "seed-0")) + ["boho"]  # + snapshot etiketi
+    for term, count in before.items():
+        assert index.count(term) == count + added.count(term), term
+    # Yeni ürün belgesi {boho} + snapshot {boho}; eski {boho, wall art} belgesi çıkarılmaz
+    assert (graph.documents, graph.count("boho"), graph.count("wall art")) == \
+        (graph_before[0] + 2, graph_before[1] + 2, graph_before[2])
+    print("uncounted listing: nothing subtracted")
+
+
+async def main():
+    try:
+        await run()
+    finally:
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    finally:
+        if os.path.exists(TEST_DB):
+            os.remove(TEST_DB)
@@ -0,0 +1,121 @@
+import asyncio
+import os
+import random
+from datetime import datetime, timedelta
+
+# Geçici veritabanı: geliştirme veritabanını kirletmesin (app importlarından önce)
+TEST_DB = "test_listing_index.db"
+os.environ["DATABASE_URL"] = f"sqlite:///./{TEST_DB}"
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.api.v1.endpoints.listings import SORT_FIELDS
+from app.db.base import Base
+from app.db.session import async_engine, async_session_maker
+from app.main import app
+from app.models import Listing, ListingSnapshot
+
+# /listings/index: her sıralamada tüm sayfalar eksiksiz/tekrarsız gelmeli, NULL'lar sonda olmalı
+# ve sorgu planı (kolon, id) indeksini kullanmalı (tam tarama + geçici sıralama yok).
+# /listings/{id}/history: aynı created_at'i paylaşan analizler sayfa sınırında atlanmamalı
+random.seed(3)
+BASE_TIME = datetime(2025, 1, 1)
+
+
+def maybe(value):
+    # Analiz edilmemiş ürünlerde last_analyzed_at NULL
+    return None if random.random() < 0.2 else value
+
+
+async def seed():
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_session_maker() as db:
+        for i in range(230):
+            db.add(Listing(
+                id=f"L{i:04d}", title=random.choice(["Boho Vase", "Wall Art", "Mug", "Zebra Print"]),
+                price=float(random.randint(5, 40)), image_url="", listing_type="mine",
+                is_analyzed=False, lqs_score=float(random.randint(0, 10)),
+                last_analyzed_at=maybe(BASE_TIME + timedelta(hours=random.randint(0, 30))),
+            ))
+        # 45 analiz, sadece 4 farklı zaman damgası
+        for i in range(45):
+            db.add(ListingSnapshot(listing_id="L0000", created_at=BASE_TIME + timedelta(hours=i % 4), lqs_score=float(i)))
+        await db.commit()
+
+
+def expected_ids(rows, sort, order):
+    valued = [r for r in rows if r[sort] is not None]
+    nulls = [r for r in rows if r[sort] is None]
+    reverse = order == "desc"
+    valued.sort(key=lambda r: (r[sort], r["id"]), reverse=reverse)
+    nulls.sort(key=lambda r: r["id"], reverse=reverse)
+    return [r["id"] for r in valued + nulls]
+
+
+async def query_plans():
+    plans = {}
+    async with async_engine.connect() as conn:
+        for sort in SORT_FIELDS:
+            for op, direction in (("<", "DESC"), (">", "ASC")):
+                sql = (f"EXPLAIN QUERY PLAN SELECT id FROM listings WHERE {sort} IS NOT NULL AND "
+                       f"({sort}, id) {op} (:v, :id) ORDER BY {sort} {direction}, id {direction} LIMIT 51")
+                plan = " | ".join(row[-1] for row in (await conn.execute(text(sql), {"v": 1, "id": "L0"})).all())
+                tail = (f"EXPLAIN QUERY PLAN SELECT id FROM listings WHERE {sort} IS NULL AND id {op} :id "
+                        f"ORDER BY id {direction} LIMIT 51")
+                plan += " || " + " | ".join(row[-1] for row in (await conn.execute(text(tail), {"id": "L0"})).all())
+                plans[(sort, direction)] = plan
+    return plans
+
+
+async def dispose():
+    await async_engine.dispose()
+
+
+def main():
+    asyncio.run(seed())
+    with TestClient(app) as client:
+        full = client.get("/api/v1/listings/").json()
+        for sort in SORT_FIELDS:
+            for order in ("desc", "asc"):
+                ids, cursor = [], None
+                while True:
+                    params = {"limit": 17, "sort": sort, "order": order, "view": "summary"}
+                    if cursor:
+                        params["cursor"] = cursor
+                    page = client.get("/api/v1/listings/index", params=params).json()
+                    ids += [item["id"] for item in page["items"]]
+                    cursor = page["next_cursor"]
+                    if not page["has_more"]:
+                        break
+                assert ids == expected_ids(full, sort, order), (sort, order)
+        print(f"Pagination OK for {len(SORT_FIELDS)} sorts x 2 orders ({len(full)} listings)")
+
+        everything = client.get("/api/v1/listings/L0000/history", params={"limit": 500}).json()
+        ids, cursor, pages = [], None, 0
+        while True:
+            params = {"limit": 7}
+            if cursor:
+                params["cursor"] = cursor
+            response = client.get("/api/v1/listings/L0000/history", params=params)
+            ids += [item["id"] for item in response.json()]
+            cursor, pages = response.headers.get("X-Next-Cursor"), pages + 1
+            if not cursor:
+                break
+        expected = [r["id"] for r in sorted(everything, key=lambda r: (r["created_at"], r["id"]), reverse=True)]
+        assert len(everything) == 45 and ids == expected, (len(ids), len(everything))
+        print(f"History pagination OK: {len(ids)} snapshots in {pages} pages")
+
+    for (sort, direction), plan in asyncio.run(query_plans()).items():
+        print(f"{sort:17} {direction:4} {plan}")
+        assert f"ix_listings_{sort}_id" in plan and "TEMP B-TREE" not in plan, plan
+    asyncio.run(dispose())
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    finally:
+        if os.path.exists(TEST_DB):
+            os.remove(TEST_DB)
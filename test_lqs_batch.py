@@ -0,0 +1,60 @@
+import random
+import time
+
+from app.core.lqs_engine import LQSInput, calculate_lqs_3_1
+from app.core.lqs_batch import calculate_lqs_batch
+
+# Toplu LQS'in skaler motorla birebir aynı sonucu verdiğini kontrol eder
+random.seed(42)
+WORDS = ["mug", "ceramic", "Coffee", "gift for her", "boho", "wall art", "PRINT", "  lamp ", "vintage ring"]
+
+def random_row():
+    visual = {"has_lifestyle": random.random() < 0.5}
+    if random.random() < 0.8: visual["is_sharp"] = random.random() < 0.7
+    if random.random() < 0.6: visual["simplicity_score"] = random.choice([0, 3, 6.5, 7, 9.3, 10])
+    else: visual["is_centered"] = random.random() < 0.5
+    if random.random() < 0.6: visual["texture_aesthetics"] = random.uniform(0, 10)
+    else: visual["high_contrast"] = random.random() < 0.5
+    if random.random() < 0.9: visual["core_object"] = random.choice(["mug", "Lamp", "", "ring", "art"])
+    title = " ".join(random.choice(WORDS) for _ in range(random.randint(0, 20)))
+    if random.random() < 0.1: title = title.upper()
+    tags = [random.choice(WORDS) for _ in range(random.randint(0, 15))]
+    return title, tags, visual, random.randint(0, 7), random.random() < 0.3
+
+rows = [random_row() for _ in range(20000)]
+
+start = time.perf_counter()
+scalar = [calculate_lqs_3_1(LQSInput(image_url="", title=t, tags=tags, visual_data=v, image_count=ic, has_video=hv))
+          for t, tags, v, ic, hv in rows]
+scalar_time = time.perf_counter() - start
+
+start = time.perf_counter()
+batch = calculate_lqs_batch(
+    titles=[r[0] for r in rows],
+    tag_lists=[r[1] for r in rows],
+    visual_data=[r[2] for r in rows],
+    image_counts=[r[3] for r in rows],
+    has_video=[r[4] for r in rows],
+)
+batch_time = time.perf_counter() - start
+
+mismatches = [i for i, (s, b) in enumerate(zip(scalar, batch)) if s != b]
+print(f"Rows: {len(rows)}")
+print(f"Scalar: {scalar_time:.3f}s, Batch: {batch_time:.3f}s")
+print(f"Mismatches: {len(mismatches)}")
+if mismatches:
+    i = mismatches[0]
+    print(f"First mismatch #{i}:\n  scalar={scalar[i]}\n  batch ={batch[i]}")
+
+# Ağırlıklar tek yerde: lqs_engine'deki bir sabit değişince iki motor da aynı sonucu vermeli
+from app.core import lqs_engine
+original = lqs_engine.ZEITGEIST_VELOCITY, lqs_engine.VIDEO_POINTS
+lqs_engine.ZEITGEIST_VELOCITY, lqs_engine.VIDEO_POINTS = 4.0, 3.0  # Trendsetter kuralı da devreye girer
+sample = rows[:2000]
+scalar = [calculate_lqs_3_1(LQSInput(image_url="", title=t, tags=tags, visual_data=v, image_count=ic, has_video=hv))
+          for t, tags, v, ic, hv in sample]
+batch = calculate_lqs_batch([r[0] for r in sample], [r[1] for r in sample], [r[2] for r in sample],
+                            [r[3] for r in sample], [r[4] for r in sample])
+lqs_engine.ZEITGEIST_VELOCITY, lqs_engine.VIDEO_POINTS = original
+print(f"Shared weights mismatches: {sum(s != b for s, b in zip(scalar, batch))}, "
+      f"trendsetters: {sum(s['is_trendsetter'] for s in scalar)}")
@@ -0,0 +1,44 @@
+import random
+import time
+
+from app.core.pricing import PricingEngine
+from app.core.pricing_batch import calculate_prices_batch
+
+# Toplu fiyatlamanın PricingEngine ile birebir aynı sonucu verdiğini kontrol eder
+random.seed(42)
+
+def random_row():
+    lqs = random.choice([round(random.uniform(0, 100), 1), random.uniform(0, 100), 75.0, 74.9])
+    competitor = random.choice([0.0, 0.0, random.uniform(1, 200), round(random.uniform(1, 60), 2)])
+    cat_min = random.choice([5.0, random.uniform(0, 20)])
+    cat_max = random.choice([100.0, 40.0, random.uniform(20, 500)])
+    r = random.random()
+    if r < 0.2: season = []
+    elif r < 0.8: season = [random.randint(0, 100) for _ in range(random.choice([12, 12, 2, 5]))]
+    else: season = [random.uniform(0, 100) for _ in range(12)]
+    return lqs, competitor, cat_min, cat_max, season
+
+rows = [random_row() for _ in range(50000)]
+
+start = time.perf_counter()
+scalar = [PricingEngine(lqs_score=l, competitor_price=c, category_min=lo, category_max=hi, seasonality_data=s).calculate_prices()
+          for l, c, lo, hi, s in rows]
+scalar_time = time.perf_counter() - start
+
+start = time.perf_counter()
+batch = calculate_prices_batch(
+    lqs_scores=[r[0] for r in rows],
+    competitor_prices=[r[1] for r in rows],
+    category_min=[r[2] for r in rows],
+    category_max=[r[3] for r in rows],
+    seasonality=[r[4] for r in rows],
+)
+batch_time = time.perf_counter() - start
+
+mismatches = [i for i, (s, b) in enumerate(zip(scalar, batch)) if s != b]
+print(f"Rows: {len(rows)}")
+print(f"Scalar: {scalar_time:.3f}s, Batch: {batch_time:.3f}s")
+print(f"Mismatches: {len(mismatches)}")
+if mismatches:
+    i = mismatches[0]
+    print(f"First mismatch #{i}: {rows[i]}\n  scalar={scalar[i]}\n  batch ={batch[i]}")
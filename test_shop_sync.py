@@ -0,0 +1,122 @@
+import asyncio
+import os
+import time
+
+import httpx
+
+# Geçici veritabanı: geliştirme veritabanını kirletmesin (app importlarından önce)
+TEST_DB = "test_shop_sync.db"
+os.environ["DATABASE_URL"] = f"sqlite:///./{TEST_DB}"
+
+from sqlalchemy import select, func, update
+
+from app.core.http_pool import HTTPClientPool
+from app.core.rate_limit import TokenBucket
+from app.db.base import Base
+from app.db.session import async_engine, async_session_maker
+from app.models import AnalysisJob, Listing
+from app.services.etsy_client import EtsyClient
+from app.services.shop_import import import_shop
+from app.services.sync_service import sync_shop
+
+# Sahte Etsy v3: sort_on=updated&sort_order=desc destekli, 3.000 ürünlü mağaza
+LISTING_COUNT = 3000
+BASE_TS = 1_700_000_000
+
+LISTINGS = {
+    1_000_000 + i: {
+        "listing_id": 1_000_000 + i,
+        "title": f"Boho Wall Art Print {i}",
+        "price": {"amount": 1000 + i, "divisor": 100, "currency_code": "USD"},
+        "tags": ["boho", "wall art", f"print {i % 50}"],
+        "updated_timestamp": BASE_TS + i,
+        "images": [{"url_570xN": f"https://img.test/{i}.jpg"}],
+    }
+    for i in range(LISTING_COUNT)
+}
+
+stats = {"requests": 0}
+
+
+async def fake_etsy(request: httpx.Request) -> httpx.Response:
+    stats["requests"] += 1
+    if request.url.path.endswith("/application/shops"):
+        return httpx.Response(200, json={"count": 1, "results": [{"shop_id": 42, "shop_name": "TestShop"}]})
+
+    items = list(LISTINGS.values())
+    if request.url.params.get("sort_on") == "updated":
+        items.sort(key=lambda item: item["updated_timestamp"], reverse=request.url.params.get("sort_order") == "desc")
+    limit = int(request.url.params.get("limit", 25))
+    offset = int(request.url.params.get("offset", 0))
+    return httpx.Response(200, json={"count": len(items), "results": items[offset:offset + limit]})
+
+
+def touch(listing_id: int, ts: int, **changes):
+    LISTINGS[listing_id].update(changes, updated_timestamp=ts)
+
+
+async def main():
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    pool = HTTPClientPool()
+    pool.client = httpx.AsyncClient(transport=httpx.MockTransport(fake_etsy))
+    client = EtsyClient(http=pool, bucket=TokenBucket(1000, 1000))
+
+    await import_shop("TestShop", client=client)
+    # İlk 100 ürün analiz edilmiş olsun (etiket kolonu önerilen etiketleri tutar)
+    async with async_session_maker() as db:
+        await db.execute(update(Listing).where(Listing.id < "1000100").values(is_analyzed=True, _tags=["suggested"]))
+        await db.commit()
+
+    # Değişiklik yok: tek sayfa okunur, hiçbir şey yazılmaz/kuyruğa alınmaz
+    stats["requests"] = 0
+    result = await sync_shop("TestShop", client=client)
+    print(f"No-op sync: {stats['requests']} requests, {result}")
+    assert not result["full_scan"] and result["new"] == result["changed"] == result["reanalyze"] == 0
+
+    now = BASE_TS + LISTING_COUNT + 100
+    touch(1_000_001, now, title="Minimalist Line Art Print")               # analizli, başlık -> yeniden analiz
+    touch(1_000_002, now + 1, images=[{"url_570xN": "https://img.test/new.jpg"}])  # analizli, görsel -> yeniden analiz
+    touch(1_000_003, now + 2, price={"amount": 9900, "divisor": 100})      # analizli, sadece fiyat
+    touch(1_000_004, now + 3, tags=["boho", "gift"])                        # analizli, sadece etiket
+    touch(1_002_000, now + 4, tags=["abstract", "poster"])                  # analizsiz, etiket
+    touch(1_002_001, now + 5)                                               # sadece damga (stok vb.)
+    LISTINGS[1_009_999] = {**LISTINGS[1_000_000], "listing_id": 1_009_999, "title": "Brand New", "updated_timestamp": now + 6}
+
+    stats["requests"] = 0
+    start = time.perf_counter()
+    result = await sync_shop("TestShop", client=client)
+    elapsed = time.perf_counter() - start
+    print(f"Incremental sync: {stats['requests']} requests, {elapsed:.2f}s, "
+          f"{ {k: result[k] for k in ('fetched', 'new', 'changed', 'touched', 'reanalyze')} }")
+    assert stats["requests"] == 2  # mağaza + tek sayfa (tam tarama 31 istek)
+    assert (result["new"], result["changed"], result["touched"], result["reanalyze"]) == (1, 5, 1, 2)
+
+    async with async_session_maker() as db:
+        jobs = sorted((await db.execute(select(AnalysisJob.listing_id))).scalars())
+        analyzed_tags = (await db.get(Listing, "1000004")).tags
+        unanalyzed_tags = (await db.get(Listing, "1002000")).tags
+        price = (await db.get(Listing, "1000003")).price
+        count = await db.scalar(select(func.count()).select_from(Listing))
+    print(f"Queued jobs: {jobs}")
+    assert jobs == ["1000001", "1000002"]
+    assert analyzed_tags == ["suggested"] and unanalyzed_tags == ["abstract", "poster"] and price == 99.0
+    assert count == LISTING_COUNT + 1
+
+    # Tekrar senkron: değişiklik kalmadı, yeni iş açılmaz
+    result = await sync_shop("TestShop", client=client)
+    async with async_session_maker() as db:
+        assert await db.scalar(select(func.count()).select_from(AnalysisJob)) == 2
+    print(f"Repeat sync: changed={result['changed']}, reanalyze={result['reanalyze']}")
+
+    await pool.aclose()
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    finally:
+        if os.path.exists(TEST_DB):
+            os.remove(TEST_DB)
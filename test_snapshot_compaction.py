@@ -0,0 +1,88 @@
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+
+# Geçici veritabanı: geliştirme veritabanını kirletmesin (app importlarından önce)
+TEST_DB = "test_snapshot_compaction.db"
+os.environ["DATABASE_URL"] = f"sqlite:///./{TEST_DB}"
+
+from sqlalchemy import event, func, select
+
+from app.db.base import Base
+from app.db.session import async_engine, async_session_maker
+from app.models import ListingSnapshot, ListingScoreRollup
+from app.services.snapshot_compaction import compact_snapshots
+
+# Postgres timezone'lu değer döndürür (asyncpg: oturum saat dilimi). SQLite naive döndürdüğü için
+# yüklenen rollup'lar +03:00'lü yapılarak aynı durum taklit edilir; tekrar çalıştırma kopya kova üretmemeli.
+ISTANBUL = timezone(timedelta(hours=3))
+
+
+@event.listens_for(ListingScoreRollup, "load")
+def _as_postgres(rollup, _context):
+    if rollup.bucket_start is not None and rollup.bucket_start.tzinfo is None:
+        rollup.bucket_start = rollup.bucket_start.replace(tzinfo=timezone.utc).astimezone(ISTANBUL)
+
+
+async def rollup_summary(db):
+    rows = (await db.execute(select(ListingScoreRollup))).scalars().all()
+    keys = [(r.listing_id, r.granularity, r.bucket_start.astimezone(timezone.utc)) for r in rows]
+    assert len(keys) == len(set(keys)), "kopya kova"
+    return sum(r.snapshot_count for r in rows), len(rows)
+
+
+async def run():
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    now = datetime(2025, 6, 15, 1, 30, tzinfo=ISTANBUL)  # UTC'de hâlâ 14 Haziran
+    async with async_session_maker() as db:
+        for days in [1, 2, 40, 40, 41, 41.9, 200, 201, 300]:
+            for listing_id in ["L1", "L2"]:
+                db.add(ListingSnapshot(listing_id=listing_id, created_at=now - timedelta(days=days),
+                                       lqs_score=50 + int(days) % 7, predicted_price_min=10))
+        await db.commit()
+
+    async with async_session_maker() as db:
+        first = await compact_snapshots(db, keep_full_days=30, keep_latest=2, weekly_after_days=90, now=now)
+        print("1st run:", first)
+        compacted, buckets = await rollup_summary(db)
+        assert compacted == first["snapshots_compacted"] == 14 and first["rollups_created"] == buckets
+
+    # Yeni eski snapshot'lar mevcut kovalara düşer: güncellenmeli, eklenmemeli (uq_rollup_bucket)
+    async with async_session_maker() as db:
+        for listing_id in ["L1", "L2"]:
+            db.add(ListingSnapshot(listing_id=listing_id, created_at=now - timedelta(days=40, hours=2), lqs_score=60))
+        await db.commit()
+    async with async_session_maker() as db:
+        second = await compact_snapshots(db, keep_full_days=30, keep_latest=2, weekly_after_days=90, now=now)
+        print("2nd run:", second)
+        assert second["rollups_created"] == 0 and second["rollups_updated"] == 2
+        assert await rollup_summary(db) == (16, buckets)
+
+    # Günlük kovalar süresi dolunca haftalığa taşınır; haftalık kovalar yine eşleşmeli
+    async with async_session_maker() as db:
+        third = await compact_snapshots(db, keep_full_days=30, keep_latest=2, weekly_after_days=30, now=now)
+        print("3rd run:", third)
+        compacted, _ = await rollup_summary(db)
+        daily = await db.scalar(select(func.count()).where(ListingScoreRollup.granularity == "day"))
+        assert compacted == 16 and daily == 0
+        again = await compact_snapshots(db, keep_full_days=30, keep_latest=2, weekly_after_days=30, now=now)
+        assert again == {"snapshots_compacted": 0, "rollups_created": 0, "rollups_updated": 0, "daily_rolled_to_weekly": 0}
+    print("Timezone-aware compaction is idempotent")
+
+
+
+async def main():
+    try:
+        await run()
+    finally:
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    finally:
+        if os.path.exists(TEST_DB):
+            os.remove(TEST_DB)
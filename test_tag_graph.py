@@ -0,0 +1,57 @@
+import math
+import random
+import time
+
+from app.core.tag_graph import CooccurrenceGraph, cooccurrence_counts
+
+# Etiket birlikte-kullanım grafiğinin skorlarını, artımlı güncellemesini ve gecikmesini kontrol eder
+random.seed(11)
+
+VOCABULARY = [f"tag {i}" for i in range(3000)]
+WEIGHTS = [1 / (rank + 1) for rank in range(len(VOCABULARY))]
+NICHES = [random.sample(VOCABULARY[:300], 6) for _ in range(40)]
+
+documents = []
+for _ in range(30000):
+    # Her belge bir niş çekirdeği + Zipf dağılımlı rastgele etiketler
+    documents.append(random.choice(NICHES)[:random.randint(2, 6)] + random.choices(VOCABULARY, WEIGHTS, k=10))
+
+start = time.perf_counter()
+graph = CooccurrenceGraph()
+graph.build(documents)
+print(f"Build: {time.perf_counter() - start:.2f}s, {graph.get_stats()}")
+
+# Skorlar: kaba hesapla aynı olmalı
+n, tag_counts, pair_counts = cooccurrence_counts(documents)
+mismatches = 0
+for tag in ["tag 0", "tag 5", "tag 120", "tag 2999"]:
+    expected = []
+    for (a, b), together in pair_counts.items():
+        if tag in (a, b) and together >= 2:
+            other = b if a == tag else a
+            expected.append((other, together * n / (tag_counts[tag] * tag_counts[other])))
+    expected = [other for other, _ in sorted(expected, key=lambda item: (item[1], pair_counts[tuple(sorted((tag, item[0])))]), reverse=True)[:15]]
+    got = graph.related(tag, limit=15, min_count=2)
+    mismatches += [item["tag"] for item in got] != expected
+    for item in got:
+        assert math.isclose(item["pmi"], math.log2(item["lift"]), abs_tol=1e-3)
+print(f"Ranking mismatches: {mismatches}")
+assert mismatches == 0 and n == graph.documents
+
+# Artımlı güncelleme: belge çıkarıp ekledikten sonra sayımlar rebuild ile aynı
+removed, added = documents[:500], [["tag 1", "brand new tag", "tag 2"]] * 3
+graph.update(added=added, removed=removed)
+rebuilt = CooccurrenceGraph()
+rebuilt.build(documents[500:] + added)
+assert graph.documents == rebuilt.documents and graph.get_stats()["pairs"] == rebuilt.get_stats()["pairs"]
+assert graph.related("brand new tag", min_count=1) == rebuilt.related("brand new tag", min_count=1)
+assert graph.related("tag 7", limit=50) == rebuilt.related("tag 7", limit=50)
+print("Incremental update matches rebuild")
+
+queries = [random.choice(VOCABULARY[:500]) for _ in range(5000)]
+start = time.perf_counter()
+for q in queries:
+    graph.related(q, limit=20)
+elapsed = time.perf_counter() - start
+print(f"Lookup: {elapsed / len(queries) * 1e6:.1f}µs avg over {len(queries)} queries "
+      f"(most connected tag: {max(len(graph.related('tag 0', limit=10**6, min_count=1)), 0)} neighbours)")
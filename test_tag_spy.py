@@ -1,18 +1,112 @@
-import requests
-import json
-
-url = "http://localhost:8000/api/v1/spy/analyze"
-payload = {"url": "https://etsy.com/shop/TestShop"}
-headers = {"Content-Type": "application/json"}
-
-try:
-    response = requests.post(url, json=payload, headers=headers)
-    print(f"Status Code: {response.status_code}")
-    if response.status_code == 200:
-        print("Response JSON:")
-        print(json.dumps(response.json(), indent=2))
-    else:
-        print("Error Response:")
-        print(response.text)
-except Exception as e:
-    print(f"Request failed: {e}")
+import asyncio
+import random
+import time
+import tracemalloc
+from collections import Counter
+from itertools import combinations
+
+import httpx
+
+from app.core.http_pool import HTTPClientPool
+from app.core.inflight import InFlight
+from app.core.rate_limit import TokenBucket
+from app.services.etsy_client import EtsyClient
+from app.services.tag_spy import TagAggregator, analyze_competitor_shop, normalize_tag, get_tag_spy_stats
+
+# Sahte Etsy v3: 12.000 ürünlü rakip mağaza; etiketler Zipf benzeri dağılımdan (50k farklı etiket)
+LISTING_COUNT = 12000
+VOCABULARY = [f"tag {i}" for i in range(50000)]
+WEIGHTS = [1 / (rank + 1) for rank in range(len(VOCABULARY))]
+TOP_K = 30
+random.seed(7)
+
+LISTINGS = [
+    {"listing_id": i, "tags": list(dict.fromkeys(random.choices(VOCABULARY, WEIGHTS, k=13)))}
+    for i in range(LISTING_COUNT)
+]
+stats = {"requests": 0}
+
+
+async def fake_etsy(request: httpx.Request) -> httpx.Response:
+    stats["requests"] += 1
+    if request.url.path.endswith("/application/shops"):
+        return httpx.Response(200, json={"count": 1, "results": [{"shop_id": 7, "shop_name": "BigShop"}]})
+    await asyncio.sleep(0.01)
+    limit = int(request.url.params.get("limit", 25))
+    offset = int(request.url.params.get("offset", 0))
+    return httpx.Response(200, json={"count": LISTING_COUNT, "results": LISTINGS[offset:offset + limit]})
+
+
+def exact_counts():
+    tags, pairs = Counter(), Counter()
+    for listing in LISTINGS:
+        unique = sorted({normalize_tag(tag) for tag in listing["tags"]})
+        tags.update(unique)
+        pairs.update(combinations(unique, 2))
+    return tags, pairs
+
+
+async def main():
+    # 1) Doğruluk: sınırlı sayaçların top-K'sı kesin sayımla aynı mı?
+    tags, pairs = exact_counts()
+    aggregator = TagAggregator()
+    tracemalloc.start()
+    aggregator.add_page(LISTINGS)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    result = aggregator.result(top_tags=TOP_K, top_pairs=TOP_K)
+
+    exact_top = [count for _, count in tags.most_common(TOP_K)]
+    stream_top = [count for _, count in result["top_tags"]]
+    exact_pairs = [count for _, count in pairs.most_common(TOP_K)]
+    stream_pairs = [count for _, count in result["top_pairs"]]
+    print(f"Distinct tags: {len(tags)}, distinct pairs: {len(pairs)}")
+    print(f"Counters kept: tags={len(aggregator.tags)}, pairs={len(aggregator.pairs)}, "
+          f"error bound={result['max_count_error']}, peak alloc={peak / 1024:.0f} KiB")
+    print(f"Top tags exact: {exact_top[:8]}...\nTop tags streamed: {stream_top[:8]}...")
+    assert result["analyzed_product_count"] == LISTING_COUNT
+    assert all(abs(a - b) <= result["max_count_error"] for a, b in zip(exact_top, stream_top))
+    assert all(abs(a - b) <= result["max_count_error"] for a, b in zip(exact_pairs, stream_pairs))
+    assert len(aggregator.tags) <= 2 * aggregator.tags.capacity and len(aggregator.pairs) <= 2 * aggregator.pairs.capacity
+
+    # 2) Etsy üzerinden tarama + önbellek + eşzamanlı istek birleştirme
+    pool = HTTPClientPool()
+    pool.client = httpx.AsyncClient(transport=httpx.MockTransport(fake_etsy))
+    client = EtsyClient(http=pool, bucket=TokenBucket(1000, 1000))
+
+    start = time.perf_counter()
+    first, second = await asyncio.gather(
+        analyze_competitor_shop("BigShop", client=client),
+        analyze_competitor_shop("bigshop", client=client),
+    )
+    elapsed = time.perf_counter() - start
+    requests_after_scan = stats["requests"]
+    cached = await analyze_competitor_shop("BigShop", client=client)
+    print(f"Scan: {elapsed:.2f}s, {requests_after_scan} requests, cached={cached['cached']}, stats={get_tag_spy_stats()}")
+    assert first["top_tags"] == second["top_tags"] == cached["top_tags"]
+    assert requests_after_scan == 1 + LISTING_COUNT // 100 and stats["requests"] == requests_after_scan
+    assert cached["cached"]
+    assert get_tag_spy_stats()["inflight"] == 0
+
+    # 3) Biten iş, aynı anahtara sonradan kaydedilmiş yeni işin kaydını silmemeli
+    inflight, release = InFlight(), asyncio.Event()
+
+    async def slow():
+        await release.wait()
+        return "old"
+
+    old = asyncio.ensure_future(inflight.run("shop", slow))
+    await asyncio.sleep(0)
+    newer = asyncio.get_running_loop().create_future()
+    inflight._futures["shop"] = newer
+    release.set()
+    assert await old == "old" and inflight._futures.get("shop") is newer
+    newer.set_result("new")
+    assert await inflight.run("shop", slow) == "new"
+    print("In-flight entry only removed by its own future")
+
+    await pool.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
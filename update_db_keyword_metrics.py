@@ -0,0 +1,16 @@
+from sqlalchemy import text
+from app.db.session import engine
+
+def alter_column_type(table_name, column_name, column_type):
+    with engine.connect() as conn:
+        try:
+            conn.execute(text(f"ALTER TABLE {table_name} ALTER COLUMN {column_name} TYPE {column_type}"))
+            conn.commit()
+            print(f"Altered column {column_name} on {table_name} to {column_type}")
+        except Exception as e:
+            # SQLite'ta gerek yok: naive değerler zaten UTC (CURRENT_TIMESTAMP) olarak saklanır
+            print(f"Column {column_name} could not be altered (not needed on SQLite): {e}")
+
+print("Updating database schema for keyword metrics (UTC timestamps)...")
+alter_column_type("keyword_metrics", "computed_at", "TIMESTAMP WITH TIME ZONE USING computed_at AT TIME ZONE 'UTC'")
+print("Database schema updated.")
@@ -0,0 +1,19 @@
+from sqlalchemy import text
+from app.db.session import engine
+
+def create_index(index_name, table_name, columns):
+    with engine.connect() as conn:
+        try:
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} ({columns})"))
+            conn.commit()
+            print(f"Created index {index_name} on {table_name}")
+        except Exception as e:
+            print(f"Index {index_name} error: {e}")
+
+print("Updating database indexes for the listing index endpoint...")
+create_index("ix_listings_last_analyzed_at_id", "listings", "last_analyzed_at, id")
+create_index("ix_listings_lqs_score_id", "listings", "lqs_score, id")
+create_index("ix_listings_price_id", "listings", "price, id")
+create_index("ix_listings_title_id", "listings", "title, id")
+create_index("ix_listings_listing_type", "listings", "listing_type")
+print("Database indexes updated.")
@@ -0,0 +1,28 @@
+from sqlalchemy import text
+from app.db.session import engine
+
+def add_column(table_name, column_name, column_type):
+    with engine.connect() as conn:
+        try:
+            conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_type}"))
+            conn.commit()
+            print(f"Added column {column_name} to {table_name}")
+        except Exception as e:
+            print(f"Column {column_name} might already exist or error: {e}")
+
+def create_index(index_name, table_name, columns):
+    with engine.connect() as conn:
+        try:
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} ({columns})"))
+            conn.commit()
+            print(f"Created index {index_name} on {table_name}")
+        except Exception as e:
+            print(f"Index {index_name} error: {e}")
+
+print("Updating database schema for shop import and sync...")
+add_column("listings", "shop_id", "VARCHAR")
+add_column("listings", "etsy_updated_at", "INTEGER")
+add_column("listings", "source_fingerprint", "VARCHAR DEFAULT ''")
+create_index("ix_listings_shop_id", "listings", "shop_id")
+create_index("ix_listings_shop_id_etsy_updated_at", "listings", "shop_id, etsy_updated_at")
+print("Database schema updated.")
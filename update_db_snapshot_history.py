@@ -0,0 +1,18 @@
+from sqlalchemy import text
+from app.db.base import Base
+from app.db.session import engine
+from app.models import ListingScoreRollup
+
+def create_index(index_name, table_name, columns):
+    with engine.connect() as conn:
+        try:
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} ({columns})"))
+            conn.commit()
+            print(f"Created index {index_name} on {table_name}")
+        except Exception as e:
+            print(f"Index {index_name} error: {e}")
+
+print("Updating database schema for snapshot history...")
+create_index("ix_listing_snapshots_listing_created", "listing_snapshots", "listing_id, created_at")
+Base.metadata.create_all(bind=engine, tables=[ListingScoreRollup.__table__])
+print("Database schema updated.")
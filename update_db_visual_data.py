@@ -0,0 +1,16 @@
+from sqlalchemy import text
+from app.db.session import engine
+
+def add_column(table_name, column_name, column_type):
+    with engine.connect() as conn:
+        try:
+            conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_type}"))
+            conn.commit()
+            print(f"Added column {column_name} to {table_name}")
+        except Exception as e:
+            print(f"Column {column_name} might already exist or error: {e}")
+
+print("Updating database schema for batch LQS rescoring...")
+json_type = "JSONB" if engine.dialect.name == "postgresql" else "JSON"
+add_column("listings", "visual_data", f"{json_type} DEFAULT '{{}}'")
+print("Database schema updated.")